@@ -4,7 +4,8 @@
 Daily cleanup job.
 
 Can be run as a cronjob to clean out old data from the database (only expired
-sessions at the moment).
+sessions at the moment). Run ``django-admin.py cleanup`` directly to control
+the size of the batches expired sessions are deleted in.
 """
 
 from django.core import management
@@ -403,6 +403,19 @@ MIDDLEWARE_CLASSES = (
 #     'django.middleware.gzip.GZipMiddleware',
 )
 
+# Whether to record the time spent in each middleware method. The breakdown is
+# logged for every request to the 'django.middleware' logger at DEBUG level.
+MIDDLEWARE_TIMING = False
+
+# ProfileMiddleware profiles one in every PROFILE_SAMPLE_RATE requests (0 turns
+# sampling off) and writes the stats to PROFILE_STATS_DIR. If None, a
+# "django-profile" directory in the system's temporary directory is used.
+PROFILE_SAMPLE_RATE = 0
+PROFILE_STATS_DIR = None
+
+# The number of seconds an X-Django-Profile header token stays valid.
+PROFILE_TOKEN_MAX_AGE = 60 * 60
+
 ############
 # SESSIONS #
 ############
@@ -416,6 +429,9 @@ SESSION_SAVE_EVERY_REQUEST = False                      # Whether to save the se
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False                 # Whether a user's session cookie expires when the Web browser is closed.
 SESSION_ENGINE = 'django.contrib.sessions.backends.db'  # The module to store session data
 SESSION_FILE_PATH = None                                # Directory to store session files if using the file session module. If None, the backend will use a sensible default.
+SESSION_SERIALIZER = 'django.contrib.sessions.serializers.PickleSerializer' # The class used to serialize session data.
+SESSION_EXPIRY_REFRESH_FRACTION = 1.0                   # Only save an unchanged session when less than this fraction of its age remains.
+SESSION_EXPIRY_WRITE_BEHIND = 0                         # Seconds the cached_db backend may hold expiry updates before writing them to the database. 0 disables it.
 
 #########
 # CACHE #
@@ -427,6 +443,31 @@ CACHE_BACKEND = 'locmem://'
 CACHE_MIDDLEWARE_KEY_PREFIX = ''
 CACHE_MIDDLEWARE_SECONDS = 600
 
+########
+# GZIP #
+########
+
+# The zlib compression level (1-9) used by GZipMiddleware. Lower levels trade
+# bandwidth for CPU time.
+GZIP_COMPRESSION_LEVEL = 6
+
+# Responses shorter than this many bytes are not worth compressing.
+GZIP_MIN_LENGTH = 200
+
+# Content types that are already compressed and are not gzipped again. An
+# entry ending with a slash matches every subtype of that major type.
+GZIP_EXCLUDED_CONTENT_TYPES = (
+    'image/',
+    'audio/',
+    'video/',
+    'application/zip',
+    'application/gzip',
+    'application/x-gzip',
+    'application/x-bzip2',
+    'application/x-rar-compressed',
+    'application/x-7z-compressed',
+)
+
 ####################
 # COMMENTS         #
 ####################
@@ -472,6 +513,31 @@ LOGIN_REDIRECT_URL = '/accounts/profile/'
 # The number of days a password reset link is valid for
 PASSWORD_RESET_TIMEOUT_DAYS = 3
 
+# The password hashers that can check passwords. The first one hashes new
+# passwords, and passwords hashed by the others are hashed again with it when
+# they are checked.
+PASSWORD_HASHERS = (
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptPasswordHasher',
+    'django.contrib.auth.hashers.SHA1PasswordHasher',
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+    'django.contrib.auth.hashers.UnsaltedMD5PasswordHasher',
+    'django.contrib.auth.hashers.CryptPasswordHasher',
+)
+
+# The work factors of the PBKDF2 and bcrypt password hashers.
+PASSWORD_PBKDF2_ITERATIONS = 10000
+PASSWORD_BCRYPT_ROUNDS = 12
+
+# The number of seconds the ModelBackend caches the permissions of a user in
+# the cache. 0 disables it.
+AUTH_PERMISSION_CACHE_TIMEOUT = 0
+
+# The number of seconds the ModelBackend caches the users it loads for
+# request.user. 0 disables it.
+AUTH_USER_CACHE_TIMEOUT = 0
+
 ########
 # CSRF #
 ########
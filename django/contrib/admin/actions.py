@@ -5,7 +5,12 @@ Built-in, globally-available admin actions.
 from django import template
 from django.core.exceptions import PermissionDenied
 from django.contrib.admin import helpers
-from django.contrib.admin.util import get_deleted_objects, model_ngettext
+from django.contrib.admin.util import (get_deleted_objects,
+    get_deleted_summary, model_ngettext)
+from django.db import transaction
+from django.db.models import signals, sql
+from django.db.models.query import CollectedObjects, delete_objects
+from django.dispatch.dispatcher import _make_id
 from django.shortcuts import render_to_response
 from django.utils.encoding import force_unicode
 from django.utils.translation import ugettext_lazy, ugettext as _
@@ -19,6 +24,11 @@ def delete_selected(modeladmin, request, queryset):
     childs (foreignkeys), a "permission denied" message.
 
     Next, it delets all selected objects and redirects back to the change list.
+
+    When more than ``delete_selected_summary_threshold`` objects are
+    selected, the confirmation page only shows how many objects of each model
+    will be deleted, and the objects are deleted in batches of
+    ``delete_selected_batch_size``, with a query to log each batch.
     """
     opts = modeladmin.model._meta
     app_label = opts.app_label
@@ -27,21 +37,34 @@ def delete_selected(modeladmin, request, queryset):
     if not modeladmin.has_delete_permission(request):
         raise PermissionDenied
 
-    # Populate deletable_objects, a data structure of all related objects that
-    # will also be deleted.
-    deletable_objects, perms_needed = get_deleted_objects(queryset, opts, request.user, modeladmin.admin_site, levels_to_root=2)
+    threshold = modeladmin.delete_selected_summary_threshold
+    summarize = threshold is not None and queryset.count() > threshold
+    if summarize:
+        # Count the objects that will be deleted, per model.
+        deleted_summary, perms_needed, summary_complete = get_deleted_summary(
+            queryset, request.user, modeladmin.admin_site)
+        deletable_objects = []
+    else:
+        # Populate deletable_objects, a data structure of all related objects that
+        # will also be deleted.
+        deletable_objects, perms_needed = get_deleted_objects(queryset, opts, request.user, modeladmin.admin_site, levels_to_root=2)
+        deleted_summary, summary_complete = [], True
 
     # The user has already confirmed the deletion.
     # Do the deletion and return a None to display the change list view again.
     if request.POST.get('post'):
         if perms_needed:
             raise PermissionDenied
-        n = queryset.count()
+        if summarize:
+            n = delete_in_batches(modeladmin, request, queryset)
+        else:
+            n = queryset.count()
+            if n:
+                for obj in queryset:
+                    obj_display = force_unicode(obj)
+                    modeladmin.log_deletion(request, obj, obj_display)
+                queryset.delete()
         if n:
-            for obj in queryset:
-                obj_display = force_unicode(obj)
-                modeladmin.log_deletion(request, obj, obj_display)
-            queryset.delete()
             modeladmin.message_user(request, _("Successfully deleted %(count)d %(items)s.") % {
                 "count": n, "items": model_ngettext(modeladmin.opts, n)
             })
@@ -52,6 +75,11 @@ def delete_selected(modeladmin, request, queryset):
         "title": _("Are you sure?"),
         "object_name": force_unicode(opts.verbose_name),
         "deletable_objects": [deletable_objects],
+        "deleted_summary": [(model_ngettext(model, count), count) for model, count in deleted_summary],
+        "summarize": summarize,
+        "summary_complete": summary_complete,
+        "select_across": request.POST.get('select_across') == '1',
+        "selected": request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
         'queryset': queryset,
         "perms_lacking": perms_needed,
         "opts": opts,
@@ -68,3 +96,48 @@ def delete_selected(modeladmin, request, queryset):
     ], context, context_instance=template.RequestContext(request))
 
 delete_selected.short_description = ugettext_lazy("Delete selected %(verbose_name_plural)s")
+
+def delete_in_batches(modeladmin, request, queryset):
+    """
+    Deletes the objects of the queryset in batches of
+    ``modeladmin.delete_selected_batch_size``, logging the deletion of each
+    batch with ``modeladmin.log_deletions()``. Returns the number of objects
+    deleted.
+    """
+    batch_size = modeladmin.delete_selected_batch_size
+    model, using = queryset.model, queryset.db
+    pks = list(queryset.order_by().values_list('pk', flat=True))
+    manager = model._base_manager.using(using)
+    direct = can_delete_directly(model)
+    # Each batch is committed on its own, so that a large deletion doesn't
+    # hold its locks until the end. Every batch is consistent by itself.
+    @transaction.commit_on_success(using=using)
+    def delete_batch(batch_pks):
+        objs = list(manager.filter(pk__in=batch_pks))
+        modeladmin.log_deletions(request, objs)
+        if direct:
+            sql.DeleteQuery(model).delete_batch([obj.pk for obj in objs], using)
+        else:
+            # Cascade from the objects loaded for the log, rather than loading
+            # them again with QuerySet.delete().
+            seen_objs = CollectedObjects()
+            for obj in objs:
+                obj._collect_sub_objects(seen_objs)
+            delete_objects(seen_objs, using)
+    for i in range(0, len(pks), batch_size):
+        delete_batch(pks[i:i + batch_size])
+    return len(pks)
+
+def can_delete_directly(model):
+    """
+    Returns True if deleting objects of the model needn't touch any other row
+    nor send signals, so that they can be deleted by primary key alone.
+    """
+    opts = model._meta
+    if (opts.proxy or opts.parents or opts.many_to_many or
+            opts.get_all_related_objects() or
+            opts.get_all_related_many_to_many_objects()):
+        return False
+    sender = _make_id(model)
+    return not (signals.pre_delete._live_receivers(sender) or
+                signals.post_delete._live_receivers(sender))
@@ -6,6 +6,8 @@ Each filter subclass knows how to display a filter for a field that passes a
 certain test -- e.g. being a DateField or ForeignKey.
 """
 
+from django.contrib.admin.util import queryset_cache_key
+from django.core.cache import cache
 from django.db import models
 from django.utils.encoding import smart_unicode, iri_to_uri
 from django.utils.translation import ugettext as _
@@ -18,6 +20,7 @@ class FilterSpec(object):
     def __init__(self, f, request, params, model, model_admin):
         self.field = f
         self.params = params
+        self.has_more = False
 
     def register(cls, test, factory):
         cls.filter_specs.append((test, factory))
@@ -35,6 +38,48 @@ class FilterSpec(object):
     def choices(self, cl):
         raise NotImplementedError()
 
+    def get_cached_choices(self, request, model_admin, get_choices):
+        """
+        Returns the choices returned by ``get_choices(limit)``, cached for
+        ``model_admin.list_filter_cache_timeout`` seconds and cut to
+        ``model_admin.list_filter_max_choices``, in which case ``has_more``
+        is set.
+        """
+        limit = model_admin.list_filter_max_choices
+        timeout = model_admin.list_filter_cache_timeout
+        key = choices = None
+        if timeout:
+            # The query of the admin may depend on the request, e.g. on the
+            # user, so it's part of the key.
+            key = queryset_cache_key('filter.%s.%s' % (self.field.name, limit),
+                                     model_admin.queryset(request))
+            if key is not None:
+                choices = cache.get(key)
+        if choices is None:
+            choices = list(get_choices(limit))
+            if key is not None:
+                cache.set(key, choices, timeout)
+        if limit is not None and len(choices) > limit:
+            self.has_more = True
+            choices = choices[:limit]
+        return choices
+
+    def more(self, cl):
+        """
+        Returns what the template needs to render a form to filter on any
+        value when ``has_more`` is set, or None.
+        """
+        return None
+
+    def more_form(self, cl, name, value, lookup_url=None):
+        return {
+            'name': name,
+            'id': 'id_filter_%s' % name,
+            'value': value or '',
+            'params': [(k, v) for k, v in cl.params.items() if k != name],
+            'lookup_url': lookup_url,
+        }
+
     def title(self):
         return self.field.verbose_name
 
@@ -61,10 +106,29 @@ class RelatedFilterSpec(FilterSpec):
         rel_name = f.rel.get_related_field().name
         self.lookup_kwarg = '%s__%s__exact' % (f.name, rel_name)
         self.lookup_val = request.GET.get(self.lookup_kwarg, None)
-        self.lookup_choices = f.get_choices(include_blank=False)
+        self.model_admin = model_admin
+        self.lookup_choices = self.get_cached_choices(request, model_admin,
+            lambda limit: self.get_lookup_choices(request, model_admin, limit))
+
+    def get_lookup_choices(self, request, model_admin, limit):
+        """
+        Returns the related objects allowed by ``limit_choices_to`` as (value,
+        label) pairs, with a single query. With
+        ``model_admin.list_filter_related_only``, only the ones that at least
+        one object of the change list refers to are returned.
+        """
+        f = self.field
+        rel_field = f.rel.get_related_field()
+        queryset = f.rel.to._default_manager.complex_filter(f.rel.limit_choices_to)
+        if model_admin.list_filter_related_only:
+            present = model_admin.queryset(request).order_by().values_list(f.name, flat=True).distinct()
+            queryset = queryset.filter(**{'%s__in' % rel_field.name: present})
+        if limit is not None:
+            queryset = queryset[:limit + 1]
+        return [(getattr(obj, rel_field.attname), smart_unicode(obj)) for obj in queryset]
 
     def has_output(self):
-        return len(self.lookup_choices) > 1
+        return self.has_more or len(self.lookup_choices) > 1
 
     def title(self):
         return self.lookup_title
@@ -78,6 +142,19 @@ class RelatedFilterSpec(FilterSpec):
                    'query_string': cl.get_query_string({self.lookup_kwarg: pk_val}),
                    'display': val}
 
+    def more(self, cl):
+        if not self.has_more:
+            return None
+        from django.contrib.admin.views.main import TO_FIELD_VAR
+        rel_model = self.field.rel.to
+        lookup_url = None
+        if rel_model in self.model_admin.admin_site._registry:
+            # Pick the value in the change list of the related model.
+            lookup_url = '../../%s/%s/?%s=%s' % (rel_model._meta.app_label,
+                rel_model._meta.object_name.lower(), TO_FIELD_VAR,
+                self.field.rel.get_related_field().name)
+        return self.more_form(cl, self.lookup_kwarg, self.lookup_val, lookup_url)
+
 FilterSpec.register(lambda f: bool(f.rel), RelatedFilterSpec)
 
 class ChoicesFilterSpec(FilterSpec):
@@ -162,7 +239,15 @@ class AllValuesFilterSpec(FilterSpec):
     def __init__(self, f, request, params, model, model_admin):
         super(AllValuesFilterSpec, self).__init__(f, request, params, model, model_admin)
         self.lookup_val = request.GET.get(f.name, None)
-        self.lookup_choices = model_admin.queryset(request).distinct().order_by(f.name).values(f.name)
+        self.lookup_choices = self.get_cached_choices(request, model_admin,
+            lambda limit: self.get_lookup_choices(request, model_admin, limit))
+
+    def get_lookup_choices(self, request, model_admin, limit):
+        queryset = model_admin.queryset(request).distinct().order_by(self.field.name)
+        queryset = queryset.values_list(self.field.name, flat=True)
+        if limit is not None:
+            queryset = queryset[:limit + 1]
+        return list(queryset)
 
     def title(self):
         return self.field.verbose_name
@@ -172,8 +257,13 @@ class AllValuesFilterSpec(FilterSpec):
                'query_string': cl.get_query_string({}, [self.field.name]),
                'display': _('All')}
         for val in self.lookup_choices:
-            val = smart_unicode(val[self.field.name])
+            val = smart_unicode(val)
             yield {'selected': self.lookup_val == val,
                    'query_string': cl.get_query_string({self.field.name: val}),
                    'display': val}
+
+    def more(self, cl):
+        if not self.has_more:
+            return None
+        return self.more_form(cl, self.field.name, self.lookup_val)
 FilterSpec.register(lambda f: True, AllValuesFilterSpec)
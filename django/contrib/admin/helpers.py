@@ -9,6 +9,7 @@ from django.forms.util import flatatt
 from django.template.defaultfilters import capfirst
 from django.utils.encoding import force_unicode, smart_unicode
 from django.utils.html import escape, conditional_escape
+from django.utils.http import urlencode
 from django.utils.safestring import mark_safe
 from django.utils.translation import ugettext_lazy as _
 
@@ -189,7 +190,8 @@ class InlineAdminFormSet(object):
     """
     A wrapper around an inline formset for use in the admin system.
     """
-    def __init__(self, inline, formset, fieldsets, readonly_fields=None, model_admin=None):
+    def __init__(self, inline, formset, fieldsets, readonly_fields=None,
+                 model_admin=None, pagination=None):
         self.opts = inline
         self.formset = formset
         self.fieldsets = fieldsets
@@ -197,6 +199,7 @@ class InlineAdminFormSet(object):
         if readonly_fields is None:
             readonly_fields = ()
         self.readonly_fields = readonly_fields
+        self.pagination = pagination
 
     def __iter__(self):
         for form, original in zip(self.formset.initial_forms, self.formset.get_queryset()):
@@ -234,6 +237,65 @@ class InlineAdminFormSet(object):
         return media
     media = property(_media)
 
+class InlinePagination(object):
+    """
+    The objects of an inline that the change view edits when the inline's
+    ``per_page`` is set: ``limit`` objects from ``offset``, out of ``count``.
+    The ``<prefix>-offset`` and ``<prefix>-limit`` parameters of the request
+    move to another page and load more objects.
+    """
+    def __init__(self, request, prefix, count, per_page):
+        self.params = dict(request.GET.items())
+        self.prefix = prefix
+        self.count = count
+        self.per_page = per_page
+        self.offset = min(max(self.get_param('offset', 0), 0), max(count - 1, 0))
+        self.limit = max(self.get_param('limit', per_page), 1)
+        self.end = min(self.offset + self.limit, count)
+
+    def get_param(self, name, default):
+        try:
+            return int(self.params.get('%s-%s' % (self.prefix, name), default))
+        except ValueError:
+            return default
+
+    def get_query_string(self, offset, limit=None):
+        params = self.params.copy()
+        params['%s-offset' % self.prefix] = offset
+        if limit is None:
+            params.pop('%s-limit' % self.prefix, None)
+        else:
+            params['%s-limit' % self.prefix] = limit
+        return '?%s' % urlencode(params)
+
+    def _get_start(self):
+        return min(self.offset + 1, self.end)
+    start = property(_get_start)
+
+    def _get_has_previous(self):
+        return self.offset > 0
+    has_previous = property(_get_has_previous)
+
+    def _get_has_next(self):
+        return self.end < self.count
+    has_next = property(_get_has_next)
+
+    def _get_more_count(self):
+        return min(self.per_page, self.count - self.end)
+    more_count = property(_get_more_count)
+
+    def previous_url(self):
+        return self.get_query_string(max(self.offset - self.per_page, 0))
+
+    def next_url(self):
+        return self.get_query_string(self.end)
+
+    def more_url(self):
+        """
+        Returns the query string that shows the next objects too.
+        """
+        return self.get_query_string(self.offset, self.limit + self.per_page)
+
 class InlineAdminForm(AdminForm):
     """
     A wrapper around an inline form for use in the admin system.
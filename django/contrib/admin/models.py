@@ -1,4 +1,6 @@
-from django.db import models
+import datetime
+
+from django.db import connections, models, router, transaction
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth.models import User
 from django.contrib.admin.util import quote
@@ -15,6 +17,29 @@ class LogEntryManager(models.Manager):
         e = self.model(None, None, user_id, content_type_id, smart_unicode(object_id), object_repr[:200], action_flag, change_message)
         e.save()
 
+    def log_actions(self, user_id, content_type_id, objects, action_flag, change_message=''):
+        """
+        Logs the same action on many objects of a content type, with a single
+        statement. ``objects`` is a list of (object_id, object_repr) pairs.
+        No signals are sent for the log entries.
+        """
+        if not objects:
+            return
+        using = router.db_for_write(self.model)
+        connection = connections[using]
+        opts = self.model._meta
+        fields = [f for f in opts.local_fields if not isinstance(f, models.AutoField)]
+        now = datetime.datetime.now()
+        rows = []
+        for object_id, object_repr in objects:
+            e = self.model(None, now, user_id, content_type_id, smart_unicode(object_id), object_repr[:200], action_flag, change_message)
+            rows.append([f.get_db_prep_save(getattr(e, f.attname), connection=connection) for f in fields])
+        qn = connection.ops.quote_name
+        sql = 'INSERT INTO %s (%s) VALUES (%s)' % (qn(opts.db_table),
+            ', '.join([qn(f.column) for f in fields]), ', '.join(['%s'] * len(fields)))
+        connection.cursor().executemany(sql, rows)
+        transaction.commit_unless_managed(using=using)
+
 class LogEntry(models.Model):
     action_time = models.DateTimeField(_('action time'), auto_now=True)
     user = models.ForeignKey(User)
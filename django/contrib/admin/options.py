@@ -1,14 +1,18 @@
 from django import forms, template
-from django.forms.formsets import all_valid
+from django.forms.formsets import all_valid, INITIAL_FORM_COUNT
 from django.forms.models import modelform_factory, modelformset_factory, inlineformset_factory
 from django.forms.models import BaseInlineFormSet
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.admin import widgets
 from django.contrib.admin import helpers
+from django.contrib.admin.search import ContainsSearch
 from django.contrib.admin.util import unquote, flatten_fieldsets, get_deleted_objects, model_format_dict
+from django.contrib.admin.util import queryset_cache_key
 from django.contrib import messages
 from django.views.decorators.csrf import csrf_protect
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.paginator import Paginator
 from django.db import models, transaction
 from django.db.models.fields import BLANK_CHOICE_DASH
 from django.http import Http404, HttpResponse, HttpResponseRedirect
@@ -195,11 +199,21 @@ class ModelAdmin(BaseModelAdmin):
     list_display = ('__str__',)
     list_display_links = ()
     list_filter = ()
+    list_filter_cache_timeout = 0
+    list_filter_max_choices = None
+    list_filter_related_only = False
     list_select_related = False
+    list_select_related_paths = ()
+    list_select_related_learn = False
     list_per_page = 100
     list_editable = ()
+    paginator = Paginator
     search_fields = ()
+    search_backend = ContainsSearch
     date_hierarchy = None
+    date_hierarchy_cache_timeout = 0
+    delete_selected_summary_threshold = 100
+    delete_selected_batch_size = 500
     save_as = False
     save_on_top = False
     ordering = None
@@ -224,6 +238,8 @@ class ModelAdmin(BaseModelAdmin):
         self.model = model
         self.opts = model._meta
         self.admin_site = admin_site
+        # The relations that the change list was found to load one at a time.
+        self._learned_select_related_paths = set()
         self.inline_instances = []
         for inline_class in self.inlines:
             inline_instance = inline_class(self.model, self.admin_site)
@@ -379,6 +395,39 @@ class ModelAdmin(BaseModelAdmin):
         from django.contrib.admin.views.main import ChangeList
         return ChangeList
 
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        """
+        Returns the paginator of the changelist page, an instance of
+        ``self.paginator``.
+        """
+        return self.paginator(queryset, per_page, orphans, allow_empty_first_page)
+
+    def date_hierarchy_dates(self, queryset, field_name, kind):
+        """
+        Returns the dates of the given kind, "year", "month" or "day", that
+        the objects of the queryset have in the given field, for the date
+        hierarchy of the change list. They're cached for
+        ``self.date_hierarchy_cache_timeout`` seconds.
+        """
+        dates = queryset.dates(field_name, kind)
+        key = None
+        if self.date_hierarchy_cache_timeout:
+            key = queryset_cache_key('dates', dates)
+        if key is None:
+            return list(dates)
+        result = cache.get(key)
+        if result is None:
+            result = list(dates)
+            cache.set(key, result, self.date_hierarchy_cache_timeout)
+        return result
+
+    def get_search_backend(self, request):
+        """
+        Returns the backend that searches the changelist, an instance of
+        ``self.search_backend``.
+        """
+        return self.search_backend(self)
+
     def get_object(self, request, object_id):
         """
         Returns an instance matching the primary key provided. ``None``  is
@@ -467,6 +516,27 @@ class ModelAdmin(BaseModelAdmin):
             action_flag     = DELETION
         )
 
+    def log_deletions(self, request, objects):
+        """
+        Log that the given objects will be deleted. Note that this method is
+        called before the deletion.
+
+        The default implementation creates the admin LogEntry objects with a
+        single query, or calls log_deletion() for each object if it's
+        overridden.
+        """
+        if self.log_deletion.im_func is not ModelAdmin.log_deletion.im_func:
+            for obj in objects:
+                self.log_deletion(request, obj, force_unicode(obj))
+            return
+        from django.contrib.admin.models import LogEntry, DELETION
+        LogEntry.objects.log_actions(
+            user_id         = request.user.id,
+            content_type_id = ContentType.objects.get_for_model(self.model).pk,
+            objects         = [(obj.pk, force_unicode(obj)) for obj in objects],
+            action_flag     = DELETION
+        )
+
     def action_checkbox(self, obj):
         """
         A list_display column containing a checkbox widget.
@@ -777,6 +847,8 @@ class ModelAdmin(BaseModelAdmin):
 
         ModelForm = self.get_form(request)
         formsets = []
+        # The inlines evaluate each of their choice querysets once.
+        choice_caches = {}
         if request.method == 'POST':
             form = ModelForm(request.POST, request.FILES)
             if form.is_valid():
@@ -794,7 +866,8 @@ class ModelAdmin(BaseModelAdmin):
                 formset = FormSet(data=request.POST, files=request.FILES,
                                   instance=new_object,
                                   save_as_new=request.POST.has_key("_saveasnew"),
-                                  prefix=prefix, queryset=inline.queryset(request))
+                                  prefix=prefix, queryset=inline.queryset(request),
+                                  choice_caches=choice_caches)
                 formsets.append(formset)
             if all_valid(formsets) and form_validated:
                 self.save_model(request, new_object, form, change=False)
@@ -824,7 +897,8 @@ class ModelAdmin(BaseModelAdmin):
                 if prefixes[prefix] != 1:
                     prefix = "%s-%s" % (prefix, prefixes[prefix])
                 formset = FormSet(instance=self.model(), prefix=prefix,
-                                  queryset=inline.queryset(request))
+                                  queryset=inline.queryset(request),
+                                  choice_caches=choice_caches)
                 formsets.append(formset)
 
         adminForm = helpers.AdminForm(form, list(self.get_fieldsets(request)),
@@ -875,6 +949,9 @@ class ModelAdmin(BaseModelAdmin):
 
         ModelForm = self.get_form(request, obj)
         formsets = []
+        paginations = []
+        # The inlines evaluate each of their choice querysets once.
+        choice_caches = {}
         if request.method == 'POST':
             form = ModelForm(request.POST, request.FILES, instance=obj)
             if form.is_valid():
@@ -890,11 +967,14 @@ class ModelAdmin(BaseModelAdmin):
                 prefixes[prefix] = prefixes.get(prefix, 0) + 1
                 if prefixes[prefix] != 1:
                     prefix = "%s-%s" % (prefix, prefixes[prefix])
+                queryset, pagination = inline.get_formset_queryset(request,
+                    new_object, FormSet, prefix)
                 formset = FormSet(request.POST, request.FILES,
                                   instance=new_object, prefix=prefix,
-                                  queryset=inline.queryset(request))
+                                  queryset=queryset, choice_caches=choice_caches)
 
                 formsets.append(formset)
+                paginations.append(pagination)
 
             if all_valid(formsets) and form_validated:
                 self.save_model(request, new_object, form, change=True)
@@ -914,9 +994,12 @@ class ModelAdmin(BaseModelAdmin):
                 prefixes[prefix] = prefixes.get(prefix, 0) + 1
                 if prefixes[prefix] != 1:
                     prefix = "%s-%s" % (prefix, prefixes[prefix])
+                queryset, pagination = inline.get_formset_queryset(request,
+                    obj, FormSet, prefix)
                 formset = FormSet(instance=obj, prefix=prefix,
-                                  queryset=inline.queryset(request))
+                                  queryset=queryset, choice_caches=choice_caches)
                 formsets.append(formset)
+                paginations.append(pagination)
 
         adminForm = helpers.AdminForm(form, self.get_fieldsets(request, obj),
             self.prepopulated_fields, self.get_readonly_fields(request, obj),
@@ -924,11 +1007,11 @@ class ModelAdmin(BaseModelAdmin):
         media = self.media + adminForm.media
 
         inline_admin_formsets = []
-        for inline, formset in zip(self.inline_instances, formsets):
+        for inline, formset, pagination in zip(self.inline_instances, formsets, paginations):
             fieldsets = list(inline.get_fieldsets(request, obj))
             readonly = list(inline.get_readonly_fields(request, obj))
             inline_admin_formset = helpers.InlineAdminFormSet(inline, formset,
-                fieldsets, readonly, model_admin=self)
+                fieldsets, readonly, model_admin=self, pagination=pagination)
             inline_admin_formsets.append(inline_admin_formset)
             media = media + inline_admin_formset.media
 
@@ -1069,7 +1152,7 @@ class ModelAdmin(BaseModelAdmin):
             action_form = None
 
         selection_note_all = ungettext('%(total_count)s selected',
-            'All %(total_count)s selected', cl.result_count)
+            'All %(total_count)s selected', cl.result_count or 0)
 
         context = {
             'module_name': force_unicode(opts.verbose_name_plural),
@@ -1089,11 +1172,14 @@ class ModelAdmin(BaseModelAdmin):
         }
         context.update(extra_context or {})
         context_instance = template.RequestContext(request, current_app=self.admin_site.name)
-        return render_to_response(self.change_list_template or [
+        response = render_to_response(self.change_list_template or [
             'admin/%s/%s/change_list.html' % (app_label, opts.object_name.lower()),
             'admin/%s/change_list.html' % app_label,
             'admin/change_list.html'
         ], context, context_instance=context_instance)
+        # Now that the rows are rendered, look for the relations they loaded.
+        cl.record_select_related()
+        return response
 
     @csrf_protect_m
     @transaction.commit_on_success
@@ -1218,6 +1304,7 @@ class InlineModelAdmin(BaseModelAdmin):
     verbose_name = None
     verbose_name_plural = None
     can_delete = True
+    per_page = None
 
     def __init__(self, parent_model, admin_site):
         self.admin_site = admin_site
@@ -1269,6 +1356,43 @@ class InlineModelAdmin(BaseModelAdmin):
         defaults.update(kwargs)
         return inlineformset_factory(self.parent_model, self.model, **defaults)
 
+    def get_formset_queryset(self, request, obj, formset, prefix):
+        """
+        Returns the queryset of the objects that the formset of the inline
+        edits in the change view of ``obj``, and its InlinePagination, or
+        None if the inline edits all the objects related to ``obj``.
+        """
+        queryset = self.queryset(request)
+        if not self.per_page:
+            return queryset, None
+        fk = formset.fk
+        related = queryset.filter(**{fk.name: getattr(obj, fk.rel.field_name)})
+        pagination = helpers.InlinePagination(request, prefix, related.count(), self.per_page)
+        pk_name = self.model._meta.pk.name
+        if request.method == 'POST':
+            # Edit the objects that the form was rendered with, even if other
+            # objects were added or deleted since.
+            try:
+                count = int(request.POST.get('%s-%s' % (prefix, INITIAL_FORM_COUNT), 0))
+            except ValueError:
+                count = 0
+            pk_field = self.model._meta.pk
+            pks = []
+            for i in range(min(count, pagination.limit)):
+                pk = request.POST.get('%s-%d-%s' % (prefix, i, pk_name))
+                if not pk:
+                    continue
+                try:
+                    pks.append(pk_field.to_python(pk))
+                except ValidationError:
+                    # A tampered value matches no object.
+                    pass
+        else:
+            if not related.ordered:
+                related = related.order_by(pk_name)
+            pks = list(related.values_list('pk', flat=True)[pagination.offset:pagination.end])
+        return queryset.filter(pk__in=pks), pagination
+
     def get_fieldsets(self, request, obj=None):
         if self.declared_fieldsets:
             return self.declared_fieldsets
@@ -0,0 +1,183 @@
+"""
+Search backends for the admin change list.
+
+A search backend filters the change list with the terms typed in its search
+box. ``ModelAdmin.search_backend`` selects it; the default backend matches
+the terms anywhere in the ``search_fields``, which means a full scan of the
+table on most databases.
+"""
+import operator
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, models
+
+class BaseSearch(object):
+    """
+    Filters the change list with the terms of the search, by ORing a lookup
+    on each of the search fields for each term, and ANDing the terms.
+
+    A prefix on a search field selects its lookup: ``^`` for
+    ``istartswith``, ``=`` for ``iexact`` and ``@`` for ``search``. Other
+    fields use the ``lookup`` of the backend.
+
+    Only the first ``max_terms`` terms are used, if it's set, and terms
+    shorter than ``min_term_length`` are ignored. If ``timeout`` is set, the
+    database cancels the queries of the change list that take longer than
+    that many seconds, where it supports it, and an empty list is shown
+    instead.
+    """
+    lookup = 'icontains'
+    max_terms = None
+    min_term_length = 1
+    timeout = None
+
+    def __init__(self, model_admin):
+        self.model_admin = model_admin
+
+    def get_terms(self, query):
+        """
+        Returns the terms of the search to use.
+        """
+        terms = [bit for bit in query.split() if len(bit) >= self.min_term_length]
+        if self.max_terms is not None:
+            terms = terms[:self.max_terms]
+        return terms
+
+    def construct_search(self, field_name):
+        if field_name.startswith('^'):
+            return "%s__istartswith" % field_name[1:]
+        elif field_name.startswith('='):
+            return "%s__iexact" % field_name[1:]
+        elif field_name.startswith('@'):
+            return "%s__search" % field_name[1:]
+        else:
+            return "%s__%s" % (field_name, self.lookup)
+
+    def filter(self, queryset, search_fields, terms):
+        """
+        Returns the queryset filtered with the given terms.
+        """
+        for bit in terms:
+            or_queries = [models.Q(**{self.construct_search(str(field_name)): bit}) for field_name in search_fields]
+            queryset = queryset.filter(reduce(operator.or_, or_queries))
+        return queryset
+
+    def search(self, queryset, search_fields, query):
+        """
+        Returns the queryset filtered with the search typed by the user.
+        """
+        terms = self.get_terms(query)
+        if not terms:
+            return queryset
+        queryset = self.filter(queryset, search_fields, terms)
+        for field_name in search_fields:
+            if '__' in field_name:
+                queryset = queryset.distinct()
+                break
+        return queryset
+
+    def set_timeout(self, using, timeout):
+        """
+        Makes the given database cancel the statements that take longer than
+        ``timeout`` seconds, or removes the limit if ``timeout`` is None.
+        Returns False if the database doesn't support it.
+        """
+        connection = connections[using]
+        sql = connection.ops.statement_timeout_sql(timeout)
+        if sql is None:
+            return False
+        connection.cursor().execute(sql)
+        return True
+
+    def is_timeout(self, using, exception):
+        """
+        Returns True if the given DatabaseError means that the database
+        cancelled a query because of the timeout.
+        """
+        return connections[using].ops.is_statement_timeout(exception)
+
+class ContainsSearch(BaseSearch):
+    """
+    Matches the terms anywhere in the search fields. This is the default.
+    """
+    lookup = 'icontains'
+
+class PrefixSearch(BaseSearch):
+    """
+    Matches the terms at the start of the search fields only, which an index
+    on them can answer without scanning the table.
+    """
+    lookup = 'istartswith'
+
+def _clean_terms(terms):
+    # Keep the words only, without the operators of the search syntaxes.
+    cleaned = []
+    for term in terms:
+        term = re.sub(r'(?u)\W+', '', term)
+        if term:
+            cleaned.append(term)
+    return cleaned
+
+class MySQLFullTextSearch(BaseSearch):
+    """
+    Uses MySQL full-text search on each search field, which needs a FULLTEXT
+    index on each of them. All the terms must be in a field, as words or word
+    prefixes.
+    """
+    lookup = 'search'
+
+    def filter(self, queryset, search_fields, terms):
+        terms = _clean_terms(terms)
+        if not terms:
+            return queryset.none()
+        query = ' '.join(['+%s*' % term for term in terms])
+        or_queries = [models.Q(**{"%s__search" % field_name.lstrip('^=@'): query})
+                      for field_name in search_fields]
+        return queryset.filter(reduce(operator.or_, or_queries))
+
+class PostgreSQLFullTextSearch(BaseSearch):
+    """
+    Uses PostgreSQL full-text search: all the terms, as words or word
+    prefixes, must be in the search fields. The search fields must be fields
+    of the model itself.
+
+    The fields are matched with ``to_tsvector(config, ...)`` over their
+    concatenation, which an expression index can answer, or with the
+    ``tsvector`` column named ``vector_column`` of the table, maintained by a
+    trigger, if it's set.
+    """
+    config = 'simple'
+    vector_column = None
+
+    def get_vector_sql(self, queryset, search_fields):
+        opts = queryset.model._meta
+        qn = connections[queryset.db].ops.quote_name
+        if self.vector_column:
+            return '%s.%s' % (qn(opts.db_table), qn(self.vector_column)), []
+        columns = []
+        for field_name in search_fields:
+            field_name = field_name.lstrip('^=@')
+            try:
+                field = opts.get_field(field_name)
+            except models.FieldDoesNotExist:
+                raise ImproperlyConfigured("%s can only search the fields of "
+                    "the model, not '%s'." % (self.__class__.__name__, field_name))
+            columns.append("coalesce(%s.%s, '')" % (qn(opts.db_table), qn(field.column)))
+        return "to_tsvector(%%s, %s)" % " || ' ' || ".join(columns), [self.config]
+
+    def filter(self, queryset, search_fields, terms):
+        terms = _clean_terms(terms)
+        if not terms:
+            return queryset.none()
+        vector, params = self.get_vector_sql(queryset, search_fields)
+        query = ' & '.join(['%s:*' % term for term in terms])
+        return queryset.extra(where=['%s @@ to_tsquery(%%s, %%s)' % vector],
+                              params=params + [self.config, query])
+
+    def search(self, queryset, search_fields, query):
+        terms = self.get_terms(query)
+        if not terms:
+            return queryset
+        # No joins, so no duplicates to remove.
+        return self.filter(queryset, search_fields, terms)
@@ -1,7 +1,7 @@
 import datetime
 
 from django.conf import settings
-from django.contrib.admin.util import lookup_field, display_for_field, label_for_field
+from django.contrib.admin.util import display_function_for_field, label_for_field
 from django.contrib.admin.views.main import ALL_VAR, EMPTY_CHANGELIST_VALUE
 from django.contrib.admin.views.main import ORDER_VAR, ORDER_TYPE_VAR, PAGE_VAR, SEARCH_VAR
 from django.core.exceptions import ObjectDoesNotExist
@@ -28,7 +28,7 @@ def paginator_number(cl,i):
     elif i == cl.page_num:
         return mark_safe(u'<span class="this-page">%d</span> ' % (i+1))
     else:
-        return mark_safe(u'<a href="%s"%s>%d</a> ' % (escape(cl.get_query_string({PAGE_VAR: i})), (i == cl.paginator.num_pages-1 and ' class="end"' or ''), i+1))
+        return mark_safe(u'<a href="%s"%s>%d</a> ' % (escape(cl.get_query_string({PAGE_VAR: i})), (i == (cl.paginator.num_pages or 0)-1 and ' class="end"' or ''), i+1))
 paginator_number = register.simple_tag(paginator_number)
 
 def pagination(cl):
@@ -36,6 +36,10 @@ def pagination(cl):
     Generates the series of links to the pages in a paginated list.
     """
     paginator, page_num = cl.paginator, cl.page_num
+    num_pages = paginator.num_pages
+    if num_pages is None:
+        # The paginator doesn't count: link up to the next page.
+        num_pages = page_num + (cl.has_next_page and 2 or 1)
 
     pagination_required = (not cl.show_all or not cl.can_show_all) and cl.multi_page
     if not pagination_required:
@@ -46,8 +50,8 @@ def pagination(cl):
 
         # If there are 10 or fewer pages, display links to every page.
         # Otherwise, do some fancy
-        if paginator.num_pages <= 10:
-            page_range = range(paginator.num_pages)
+        if num_pages <= 10:
+            page_range = range(num_pages)
         else:
             # Insert "smart" pagination links, so that there are always ON_ENDS
             # links at either end of the list of pages, and there are always
@@ -59,18 +63,19 @@ def pagination(cl):
                 page_range.extend(range(page_num - ON_EACH_SIDE, page_num + 1))
             else:
                 page_range.extend(range(0, page_num + 1))
-            if page_num < (paginator.num_pages - ON_EACH_SIDE - ON_ENDS - 1):
+            if page_num < (num_pages - ON_EACH_SIDE - ON_ENDS - 1):
                 page_range.extend(range(page_num + 1, page_num + ON_EACH_SIDE + 1))
                 page_range.append(DOT)
-                page_range.extend(range(paginator.num_pages - ON_ENDS, paginator.num_pages))
+                page_range.extend(range(num_pages - ON_ENDS, num_pages))
             else:
-                page_range.extend(range(page_num + 1, paginator.num_pages))
+                page_range.extend(range(page_num + 1, num_pages))
 
     need_show_all_link = cl.can_show_all and not cl.show_all and cl.multi_page
     return {
         'cl': cl,
         'pagination_required': pagination_required,
         'show_all_url': need_show_all_link and cl.get_query_string({ALL_VAR: ''}),
+        'show_result_count': cl.result_count is not None,
         'page_range': page_range,
         'ALL_VAR': ALL_VAR,
         '1': 1,
@@ -125,69 +130,122 @@ def _boolean_icon(field_val):
     BOOLEAN_MAPPING = {True: 'yes', False: 'no', None: 'unknown'}
     return mark_safe(u'<img src="%simg/admin/icon-%s.gif" alt="%s" />' % (settings.ADMIN_MEDIA_PREFIX, BOOLEAN_MAPPING[field_val], field_val))
 
+def _display_for_value(value, allow_tags, boolean):
+    if boolean:
+        return _boolean_icon(value)
+    # Strip HTML tags in the resulting text, except if the
+    # function has an "allow_tags" attribute set to True.
+    if allow_tags:
+        return mark_safe(smart_unicode(value))
+    return escape(smart_unicode(value))
+
+class ResultColumn(object):
+    """
+    A column of the change list, with the decisions about displaying it that
+    don't depend on the row made once, by result_columns().
+    """
+    def __init__(self, cl, field_name, is_link, is_first):
+        self.field_name = field_name
+        self.is_link = is_link
+        self.table_tag = is_first and 'th' or 'td'
+        self.row_class = ''
+        try:
+            f = cl.model._meta.get_field(field_name)
+        except models.FieldDoesNotExist:
+            # For non-field values, the value is either a method, property or
+            # returned via a callable.
+            if callable(field_name):
+                attr = field_name
+            elif (hasattr(cl.model_admin, field_name) and
+              not field_name == '__str__' and not field_name == '__unicode__'):
+                attr = getattr(cl.model_admin, field_name)
+            else:
+                # An attribute of the object, found on each row.
+                self.display = self.display_attribute
+                return
+            self.attr = attr
+            self.allow_tags = getattr(attr, 'allow_tags', False)
+            self.boolean = getattr(attr, 'boolean', False)
+            self.display = self.display_callable
+        else:
+            self.field = f
+            if isinstance(f.rel, models.ManyToOneRel):
+                self.display_value = escape
+            else:
+                self.display_value = display_function_for_field(f)
+            if isinstance(f, models.DateField) or isinstance(f, models.TimeField):
+                self.row_class = ' class="nowrap"'
+            self.display = self.display_field
+
+    def display_field(self, result):
+        return self.display_value(getattr(result, self.field_name))
+
+    def display_callable(self, result):
+        return _display_for_value(self.attr(result), self.allow_tags, self.boolean)
+
+    def display_attribute(self, result):
+        attr = getattr(result, self.field_name)
+        if callable(attr):
+            value = attr()
+        else:
+            value = attr
+        return _display_for_value(value, getattr(attr, 'allow_tags', False),
+                                  getattr(attr, 'boolean', False))
+
+def result_columns(cl):
+    """
+    Returns the columns of the change list, built once per change list.
+    """
+    columns = getattr(cl, '_result_columns', None)
+    if columns is None:
+        columns = []
+        first = True
+        for field_name in cl.list_display:
+            # If list_display_links not defined, add the link tag to the first field
+            is_link = (first and not cl.list_display_links) or field_name in cl.list_display_links
+            columns.append(ResultColumn(cl, field_name, is_link, is_link and first))
+            if is_link:
+                first = False
+        cl._result_columns = columns
+    return columns
+
 def items_for_result(cl, result, form):
     """
     Generates the actual list of data.
     """
-    first = True
-    pk = cl.lookup_opts.pk.attname
-    for field_name in cl.list_display:
-        row_class = ''
+    for column in result_columns(cl):
         try:
-            f, attr, value = lookup_field(field_name, result, cl.model_admin)
+            result_repr = column.display(result)
         except (AttributeError, ObjectDoesNotExist):
             result_repr = EMPTY_CHANGELIST_VALUE
-        else:
-            if f is None:
-                allow_tags = getattr(attr, 'allow_tags', False)
-                boolean = getattr(attr, 'boolean', False)
-                if boolean:
-                    allow_tags = True
-                    result_repr = _boolean_icon(value)
-                else:
-                    result_repr = smart_unicode(value)
-                # Strip HTML tags in the resulting text, except if the
-                # function has an "allow_tags" attribute set to True.
-                if not allow_tags:
-                    result_repr = escape(result_repr)
-                else:
-                    result_repr = mark_safe(result_repr)
-            else:
-                if value is None:
-                    result_repr = EMPTY_CHANGELIST_VALUE
-                if isinstance(f.rel, models.ManyToOneRel):
-                    result_repr = escape(getattr(result, f.name))
-                else:
-                    result_repr = display_for_field(value, f)
-                if isinstance(f, models.DateField) or isinstance(f, models.TimeField):
-                    row_class = ' class="nowrap"'
         if force_unicode(result_repr) == '':
             result_repr = mark_safe('&nbsp;')
-        # If list_display_links not defined, add the link tag to the first field
-        if (first and not cl.list_display_links) or field_name in cl.list_display_links:
-            table_tag = {True:'th', False:'td'}[first]
-            first = False
+        if column.is_link:
             url = cl.url_for_result(result)
             # Convert the pk to something that can be used in Javascript.
             # Problem cases are long ints (23L) and non-ASCII strings.
-            if cl.to_field:
-                attr = str(cl.to_field)
+            if cl.is_popup:
+                if cl.to_field:
+                    attr = str(cl.to_field)
+                else:
+                    attr = cl.lookup_opts.pk.attname
+                value = result.serializable_value(attr)
+                result_id = repr(force_unicode(value))[1:]
+                onclick = ' onclick="opener.dismissRelatedLookupPopup(window, %s); return false;"' % result_id
             else:
-                attr = pk
-            value = result.serializable_value(attr)
-            result_id = repr(force_unicode(value))[1:]
+                onclick = ''
             yield mark_safe(u'<%s%s><a href="%s"%s>%s</a></%s>' % \
-                (table_tag, row_class, url, (cl.is_popup and ' onclick="opener.dismissRelatedLookupPopup(window, %s); return false;"' % result_id or ''), conditional_escape(result_repr), table_tag))
+                (column.table_tag, column.row_class, url, onclick, conditional_escape(result_repr), column.table_tag))
         else:
             # By default the fields come from ModelAdmin.list_editable, but if we pull
             # the fields out of the form instead of list_editable custom admins
             # can provide fields on a per request basis
-            if form and field_name in form.fields:
-                bf = form[field_name]
+            if form and column.field_name in form.fields:
+                bf = form[column.field_name]
                 result_repr = mark_safe(force_unicode(bf.errors) + force_unicode(bf))
             else:
                 result_repr = conditional_escape(result_repr)
-            yield mark_safe(u'<td%s>%s</td>' % (row_class, result_repr))
+            yield mark_safe(u'<td%s>%s</td>' % (column.row_class, result_repr))
     if form and not form[cl.model._meta.pk.name].is_hidden:
         yield mark_safe(u'<td>%s</td>' % force_unicode(form[cl.model._meta.pk.name]))
 
@@ -218,6 +276,10 @@ result_list = register.inclusion_tag("admin/change_list_results.html")(result_li
 def date_hierarchy(cl):
     """
     Displays the date hierarchy for date drill-down functionality.
+
+    A level with a single choice is skipped: when the objects are all in the
+    same year, the months of that year are shown, and when they're all in the
+    same month too, the days of that month.
     """
     if cl.date_hierarchy:
         field_name = cl.date_hierarchy
@@ -230,6 +292,32 @@ def date_hierarchy(cl):
         day_lookup = cl.params.get(day_field)
 
         link = lambda d: cl.get_query_string(d, [field_generic])
+        dates = lambda queryset, kind: cl.model_admin.date_hierarchy_dates(queryset, field_name, kind)
+
+        def year_choices(years):
+            return [{
+                'link': link({year_field: str(year.year)}),
+                'title': str(year.year),
+            } for year in years]
+
+        def month_choices(months):
+            return [{
+                'link': link({year_field: str(month.year), month_field: month.month}),
+                'title': capfirst(formats.date_format(month, 'YEAR_MONTH_FORMAT'))
+            } for month in months]
+
+        def day_choices(days):
+            return [{
+                'link': link({year_field: str(day.year), month_field: day.month, day_field: day.day}),
+                'title': capfirst(formats.date_format(day, 'MONTH_DAY_FORMAT'))
+            } for day in days]
+
+        def month_or_day_choices(months):
+            # The days of the month, if there's only one.
+            if len(months) == 1:
+                return day_choices(dates(cl.query_set.filter(**{
+                    year_field: months[0].year, month_field: months[0].month}), 'day'))
+            return month_choices(months)
 
         if year_lookup and month_lookup and day_lookup:
             day = datetime.date(int(year_lookup), int(month_lookup), int(day_lookup))
@@ -242,39 +330,40 @@ def date_hierarchy(cl):
                 'choices': [{'title': capfirst(formats.date_format(day, 'MONTH_DAY_FORMAT'))}]
             }
         elif year_lookup and month_lookup:
-            days = cl.query_set.filter(**{year_field: year_lookup, month_field: month_lookup}).dates(field_name, 'day')
+            days = dates(cl.query_set.filter(**{year_field: year_lookup, month_field: month_lookup}), 'day')
             return {
                 'show': True,
                 'back': {
                     'link': link({year_field: year_lookup}),
                     'title': year_lookup
                 },
-                'choices': [{
-                    'link': link({year_field: year_lookup, month_field: month_lookup, day_field: day.day}),
-                    'title': capfirst(formats.date_format(day, 'MONTH_DAY_FORMAT'))
-                } for day in days]
+                'choices': day_choices(days)
             }
         elif year_lookup:
-            months = cl.query_set.filter(**{year_field: year_lookup}).dates(field_name, 'month')
+            months = dates(cl.query_set.filter(**{year_field: year_lookup}), 'month')
             return {
                 'show' : True,
                 'back': {
                     'link' : link({}),
                     'title': _('All dates')
                 },
-                'choices': [{
-                    'link': link({year_field: year_lookup, month_field: month.month}),
-                    'title': capfirst(formats.date_format(month, 'YEAR_MONTH_FORMAT'))
-                } for month in months]
+                'choices': month_or_day_choices(months)
             }
         else:
-            years = cl.query_set.dates(field_name, 'year')
+            # The years are found from the months, which are then at hand if
+            # there's only one year.
+            months = dates(cl.query_set, 'month')
+            years = []
+            for month in months:
+                if not years or years[-1].year != month.year:
+                    years.append(month)
+            if len(years) == 1:
+                choices = month_or_day_choices(months)
+            else:
+                choices = year_choices(years)
             return {
                 'show': True,
-                'choices': [{
-                    'link': link({year_field: str(year.year)}),
-                    'title': str(year.year),
-                } for year in years]
+                'choices': choices
             }
 date_hierarchy = register.inclusion_tag('admin/date_hierarchy.html')(date_hierarchy)
 
@@ -290,7 +379,7 @@ def search_form(cl):
 search_form = register.inclusion_tag('admin/search_form.html')(search_form)
 
 def admin_list_filter(cl, spec):
-    return {'title': spec.title(), 'choices' : list(spec.choices(cl))}
+    return {'title': spec.title(), 'choices' : list(spec.choices(cl)), 'more': spec.more(cl)}
 admin_list_filter = register.inclusion_tag('admin/filter.html')(admin_list_filter)
 
 def admin_actions(context):
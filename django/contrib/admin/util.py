@@ -1,5 +1,6 @@
 from django.db import models
 from django.db.models.related import RelatedObject
+from django.db.models.sql.datastructures import EmptyResultSet
 from django.forms.forms import pretty_name
 from django.utils import formats
 from django.utils.html import escape
@@ -9,6 +10,7 @@ from django.utils.encoding import force_unicode, smart_unicode, smart_str
 from django.utils.translation import ungettext
 from django.core.urlresolvers import reverse, NoReverseMatch
 from django.utils.datastructures import SortedDict
+from django.utils.hashcompat import md5_constructor
 
 def quote(s):
     """
@@ -26,6 +28,23 @@ def quote(s):
             res[i] = '_%02X' % ord(c)
     return ''.join(res)
 
+def queryset_cache_key(prefix, queryset):
+    """
+    Returns a key to cache data computed from the queryset with, made of the
+    prefix, the model and a hash of the SQL and parameters of the queryset.
+    Returns None if the queryset can't match any object.
+    """
+    try:
+        sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+    except EmptyResultSet:
+        return None
+    opts = queryset.model._meta
+    # repr() keeps the parameters apart from the SQL and is ASCII, whatever
+    # they contain.
+    return 'django.contrib.admin.%s.%s.%s.%s' % (prefix, opts.app_label,
+        opts.object_name.lower(),
+        md5_constructor(smart_str(repr((queryset.db, sql, params)))).hexdigest())
+
 def unquote(s):
     """
     Undo the effects of quote(). Based heavily on urllib.unquote().
@@ -119,6 +138,93 @@ def get_deleted_objects(objs, opts, user, admin_site, levels_to_root=4):
 
     return to_delete, perms_needed
 
+def get_deleted_summary(queryset, user, admin_site):
+    """
+    Counts the objects of each model that deleting the objects of
+    ``queryset`` would delete, with a query per model instead of loading
+    them: those that refer to them, those of their generic relations and
+    their multi-table inheritance parents, and so on.
+
+    Returns a list of (model, count) pairs, the model of ``queryset`` first,
+    the names of the models the user isn't allowed to delete, like
+    ``get_deleted_objects``, and whether the counts are exact. They are a
+    lower bound if a cycle of relations, like a ``ForeignKey`` to ``self``,
+    or a generic relation whose object ids can't be compared with the
+    primary keys in SQL, would delete more objects.
+    """
+    querysets = SortedDict()
+    querysets[queryset.model] = queryset.order_by()
+    complete = _collect_related_querysets(querysets[queryset.model], querysets,
+                                          [queryset.model])
+
+    summary = []
+    perms_needed = set()
+    for model, model_queryset in querysets.items():
+        count = model_queryset.count()
+        if not count:
+            continue
+        opts = model._meta
+        if model in admin_site._registry:
+            p = '%s.%s' % (opts.app_label, opts.get_delete_permission())
+            if not user.has_perm(p):
+                perms_needed.add(opts.verbose_name)
+        summary.append((model, count))
+    return summary, perms_needed, complete
+
+_INTEGER_FIELDS = ('AutoField', 'IntegerField', 'BigIntegerField', 'SmallIntegerField',
+                   'PositiveIntegerField', 'PositiveSmallIntegerField')
+
+def _collect_related_querysets(queryset, querysets, path):
+    # Adds the objects that deleting those of the queryset deletes too to the
+    # querysets of their models, and recursively the objects that deleting
+    # them deletes. Returns False if some were left out.
+    from django.contrib.contenttypes.models import ContentType
+    opts = queryset.model._meta
+    manager = lambda model: model._base_manager.using(queryset.db)
+    complete = True
+    related_querysets = []
+    for related in opts.get_all_related_objects():
+        field = related.field
+        if related.model in path:
+            # The child of a multi-table inheritance parent we came from is
+            # the same object; anything else is a cycle.
+            if not field.rel.parent_link:
+                complete = False
+            continue
+        values = queryset.values_list(field.rel.get_related_field().name, flat=True)
+        related_querysets.append(manager(related.model).filter(
+            **{'%s__in' % field.name: values}))
+    for field in opts.many_to_many:
+        if field.rel.through or field.rel.to in path:
+            continue
+        # A GenericRelation.
+        object_id = field.rel.to._meta.get_field(field.object_id_field_name)
+        types = (object_id.get_internal_type(), opts.pk.get_internal_type())
+        if types[0] != types[1] and not (types[0] in _INTEGER_FIELDS and
+                                         types[1] in _INTEGER_FIELDS):
+            complete = False
+            continue
+        ct = ContentType.objects.db_manager(queryset.db).get_for_model(queryset.model)
+        related_querysets.append(manager(field.rel.to).filter(**{
+            field.content_type_field_name: ct,
+            '%s__in' % field.object_id_field_name: queryset.values_list('pk', flat=True),
+        }))
+    for parent, link in opts.parents.items():
+        if link is None or parent in path:
+            continue
+        related_querysets.append(manager(parent).filter(
+            pk__in=queryset.values_list(link.attname, flat=True)))
+
+    for related_queryset in related_querysets:
+        model = related_queryset.model
+        if model in querysets:
+            querysets[model] = querysets[model] | related_queryset
+        else:
+            querysets[model] = related_queryset
+        if not _collect_related_querysets(related_queryset, querysets, path + [model]):
+            complete = False
+    return complete
+
 
 class NestedObjects(object):
     """
@@ -318,22 +424,34 @@ def label_for_field(name, model, model_admin=None, return_attr=False):
 
 
 def display_for_field(value, field):
+    return display_function_for_field(field)(value)
+
+def display_function_for_field(field):
+    """
+    Returns a function that displays a value of the given field, so that
+    the decisions about the field are made once for many values.
+    """
     from django.contrib.admin.templatetags.admin_list import _boolean_icon
     from django.contrib.admin.views.main import EMPTY_CHANGELIST_VALUE
 
     if field.flatchoices:
-        return dict(field.flatchoices).get(value, EMPTY_CHANGELIST_VALUE)
+        choices = dict(field.flatchoices)
+        return lambda value: choices.get(value, EMPTY_CHANGELIST_VALUE)
     # NullBooleanField needs special-case null-handling, so it comes
     # before the general null test.
     elif isinstance(field, models.BooleanField) or isinstance(field, models.NullBooleanField):
-        return _boolean_icon(value)
-    elif value is None:
-        return EMPTY_CHANGELIST_VALUE
+        return _boolean_icon
     elif isinstance(field, models.DateField) or isinstance(field, models.TimeField):
-        return formats.localize(value)
+        display = formats.localize
     elif isinstance(field, models.DecimalField):
-        return formats.number_format(value, field.decimal_places)
+        decimal_places = field.decimal_places
+        display = lambda value: formats.number_format(value, decimal_places)
     elif isinstance(field, models.FloatField):
-        return formats.number_format(value)
+        display = formats.number_format
     else:
-        return smart_unicode(value)
+        display = smart_unicode
+    def display_value(value):
+        if value is None:
+            return EMPTY_CHANGELIST_VALUE
+        return display(value)
+    return display_value
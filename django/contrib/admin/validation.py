@@ -56,6 +56,32 @@ def validate(cls, model):
         for idx, field in enumerate(cls.list_filter):
             get_field(cls, model, opts, 'list_filter[%d]' % idx, field)
 
+    # list_filter_cache_timeout = 0
+    if hasattr(cls, 'list_filter_cache_timeout') and not isinstance(cls.list_filter_cache_timeout, int):
+        raise ImproperlyConfigured("'%s.list_filter_cache_timeout' should be a integer."
+                % cls.__name__)
+
+    # list_filter_max_choices = None
+    if getattr(cls, 'list_filter_max_choices', None) is not None and not isinstance(cls.list_filter_max_choices, int):
+        raise ImproperlyConfigured("'%s.list_filter_max_choices' should be a integer or None."
+                % cls.__name__)
+
+    # list_select_related_paths = ()
+    if hasattr(cls, 'list_select_related_paths'):
+        check_isseq(cls, 'list_select_related_paths', cls.list_select_related_paths)
+        for idx, path in enumerate(cls.list_select_related_paths):
+            path_opts = opts
+            for name in path.replace('.', '__').split('__'):
+                try:
+                    f = path_opts.get_field(name)
+                except models.FieldDoesNotExist:
+                    f = None
+                if f is None or not isinstance(f.rel, models.ManyToOneRel):
+                    raise ImproperlyConfigured("'%s.list_select_related_paths[%d]' "
+                            "refers to '%s', which isn't a path of ForeignKeys "
+                            "from model '%s'." % (cls.__name__, idx, path, model._meta.object_name))
+                path_opts = f.rel.to._meta
+
     # list_per_page = 100
     if hasattr(cls, 'list_per_page') and not isinstance(cls.list_per_page, int):
         raise ImproperlyConfigured("'%s.list_per_page' should be a integer."
@@ -132,10 +158,13 @@ def validate(cls, model):
                             raise ImproperlyConfigured("%s.readonly_fields[%d], %r is not a callable or an attribute of %r or found in the model %r."
                                 % (cls.__name__, idx, field, cls.__name__, model._meta.object_name))
 
+    # list_filter_related_only = False
     # list_select_related = False
+    # list_select_related_learn = False
     # save_as = False
     # save_on_top = False
-    for attr in ('list_select_related', 'save_as', 'save_on_top'):
+    for attr in ('list_filter_related_only', 'list_select_related',
+                 'list_select_related_learn', 'save_as', 'save_on_top'):
         if not isinstance(getattr(cls, attr), bool):
             raise ImproperlyConfigured("'%s.%s' should be a boolean."
                     % (cls.__name__, attr))
@@ -179,6 +208,12 @@ def validate_inline(cls, parent, parent_model):
         raise ImproperlyConfigured("'%s.max_num' should be an integer or None (default)."
                 % cls.__name__)
 
+    # per_page = None
+    per_page = getattr(cls, 'per_page', None)
+    if per_page is not None and (not isinstance(per_page, int) or per_page < 1):
+        raise ImproperlyConfigured("'%s.per_page' should be a positive integer or None (default)."
+                % cls.__name__)
+
     # formset
     if hasattr(cls, 'formset') and not issubclass(cls.formset, BaseModelFormSet):
         raise ImproperlyConfigured("'%s.formset' does not inherit from "
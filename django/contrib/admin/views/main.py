@@ -1,12 +1,16 @@
+import warnings
+
+from django.conf import settings
 from django.contrib.admin.filterspecs import FilterSpec
 from django.contrib.admin.options import IncorrectLookupParameters
 from django.contrib.admin.util import quote
-from django.core.paginator import Paginator, InvalidPage
-from django.db import models
+from django.core.paginator import InvalidPage
+from django.db import models, transaction, DatabaseError
+from django.db.models.query_utils import select_related_descend
+from django.db.models.sql.constants import LOOKUP_SEP
 from django.utils.encoding import force_unicode, smart_str
 from django.utils.translation import ugettext
 from django.utils.http import urlencode
-import operator
 
 # The system will display a "Show all" link on the change list only if the
 # total result count is less than or equal to this setting.
@@ -59,8 +63,31 @@ class ChangeList(object):
 
         self.order_field, self.order_type = self.get_ordering()
         self.query = request.GET.get(SEARCH_VAR, '')
+        self.search_backend = model_admin.get_search_backend(request)
         self.query_set = self.get_query_set()
-        self.get_results(request)
+        self.search_timed_out = False
+        timeout = self.search_fields and self.query and self.search_backend.timeout
+        if timeout and self.search_backend.set_timeout(self.query_set.db, timeout):
+            using = self.query_set.db
+            try:
+                sid = transaction.savepoint(using=using)
+                try:
+                    self.get_results(request)
+                    # Run the query of the page now, under the timeout.
+                    len(self.result_list)
+                except DatabaseError, e:
+                    if not self.search_backend.is_timeout(using, e):
+                        raise
+                    transaction.savepoint_rollback(sid, using=using)
+                    self.search_timed_out = True
+                    self.query_set = self.query_set.none()
+                    self.get_results(request)
+                else:
+                    transaction.savepoint_commit(sid, using=using)
+            finally:
+                self.search_backend.set_timeout(using, None)
+        else:
+            self.get_results(request)
         self.title = (self.is_popup and ugettext('Select %s') % force_unicode(self.opts.verbose_name) or ugettext('Select %s to change') % force_unicode(self.opts.verbose_name))
         self.filter_specs, self.has_filters = self.get_filters(request)
         self.pk_attname = self.lookup_opts.pk.attname
@@ -92,36 +119,53 @@ class ChangeList(object):
         return '?%s' % urlencode(p)
 
     def get_results(self, request):
-        paginator = Paginator(self.query_set, self.list_per_page)
-        # Get the number of objects, with admin filters applied.
+        paginator = self.model_admin.get_paginator(request, self.query_set, self.list_per_page)
+        # Get the number of objects, with admin filters applied. It's None if
+        # the paginator doesn't count them.
         result_count = paginator.count
 
         # Get the total number of objects, with no admin filters applied.
         # Perform a slight optimization: Check to see whether any filters were
         # given. If not, use paginator.hits to calculate the number of objects,
         # because we've already done paginator.hits and the value is cached.
-        if not self.query_set.query.where:
+        if not self.query_set.query.where or result_count is None:
             full_result_count = result_count
         else:
-            full_result_count = self.root_query_set.count()
-
-        can_show_all = result_count <= MAX_SHOW_ALL_ALLOWED
-        multi_page = result_count > self.list_per_page
+            # Counted by the paginator, which may estimate it.
+            full_result_count = self.model_admin.get_paginator(
+                request, self.root_query_set, self.list_per_page).count
 
-        # Get the list of objects to display on this page.
-        if (self.show_all and can_show_all) or not multi_page:
-            result_list = self.query_set._clone()
-        else:
+        if result_count is None:
+            # Without a count, the page tells whether there are others.
+            can_show_all = False
             try:
-                result_list = paginator.page(self.page_num+1).object_list
+                page = paginator.page(self.page_num+1)
+                result_list = page.object_list
+                has_next_page = page.has_next()
             except InvalidPage:
                 result_list = ()
+                has_next_page = False
+            multi_page = self.page_num > 0 or has_next_page
+        else:
+            can_show_all = result_count <= MAX_SHOW_ALL_ALLOWED
+            multi_page = result_count > self.list_per_page
+            has_next_page = self.page_num + 1 < paginator.num_pages
+
+            # Get the list of objects to display on this page.
+            if (self.show_all and can_show_all) or not multi_page:
+                result_list = self.query_set._clone()
+            else:
+                try:
+                    result_list = paginator.page(self.page_num+1).object_list
+                except InvalidPage:
+                    result_list = ()
 
         self.result_count = result_count
         self.full_result_count = full_result_count
         self.result_list = result_list
         self.can_show_all = can_show_all
         self.multi_page = multi_page
+        self.has_next_page = has_next_page
         self.paginator = paginator
 
     def get_ordering(self):
@@ -197,48 +241,128 @@ class ChangeList(object):
         except:
             raise IncorrectLookupParameters
 
-        # Use select_related() if one of the list_display options is a field
-        # with a relationship and the provided queryset doesn't already have
-        # select_related defined.
+        # Use select_related() for the relations that the rows display if the
+        # provided queryset doesn't already have select_related defined.
         if not qs.query.select_related:
             if self.list_select_related:
                 qs = qs.select_related()
             else:
-                for field_name in self.list_display:
-                    try:
-                        f = self.lookup_opts.get_field(field_name)
-                    except models.FieldDoesNotExist:
-                        pass
-                    else:
-                        if isinstance(f.rel, models.ManyToOneRel):
-                            qs = qs.select_related()
-                            break
+                paths = self.get_select_related_paths()
+                if paths is True:
+                    qs = qs.select_related()
+                elif paths:
+                    qs = qs.select_related(*paths)
 
         # Set ordering.
         if self.order_field:
             qs = qs.order_by('%s%s' % ((self.order_type == 'desc' and '-' or ''), self.order_field))
 
         # Apply keyword searches.
-        def construct_search(field_name):
-            if field_name.startswith('^'):
-                return "%s__istartswith" % field_name[1:]
-            elif field_name.startswith('='):
-                return "%s__iexact" % field_name[1:]
-            elif field_name.startswith('@'):
-                return "%s__search" % field_name[1:]
-            else:
-                return "%s__icontains" % field_name
-
         if self.search_fields and self.query:
-            for bit in self.query.split():
-                or_queries = [models.Q(**{construct_search(str(field_name)): bit}) for field_name in self.search_fields]
-                qs = qs.filter(reduce(operator.or_, or_queries))
-            for field_name in self.search_fields:
-                if '__' in field_name:
-                    qs = qs.distinct()
-                    break
+            qs = self.search_backend.search(qs, self.search_fields, self.query)
 
         return qs
 
+    def get_select_related_paths(self):
+        """
+        Returns the relations to load with the rows, as lookup paths: the
+        ForeignKeys of list_display, the paths of
+        ModelAdmin.list_select_related_paths, and, if
+        ModelAdmin.list_select_related_learn is set, the relations that the
+        rows of previous change lists loaded one at a time.
+
+        Without list_select_related_paths, a ForeignKey in list_display
+        selects what select_related() would, as it always did, and returns
+        True if nothing was learned to add to that.
+        """
+        paths = set([path.replace('.', LOOKUP_SEP)
+                     for path in self.model_admin.list_select_related_paths])
+        direct = []
+        for field_name in self.list_display:
+            try:
+                f = self.lookup_opts.get_field(field_name)
+            except models.FieldDoesNotExist:
+                pass
+            else:
+                if isinstance(f.rel, models.ManyToOneRel):
+                    direct.append(field_name)
+        learned = self.model_admin._learned_select_related_paths
+        if direct and not paths:
+            if not learned:
+                return True
+            paths.update(_default_select_related_paths(self.lookup_opts))
+        paths.update(learned)
+        paths.update(direct)
+        return sorted(paths)
+
+    def record_select_related(self):
+        """
+        Finds the relations that displaying the rows loaded one query per
+        row, once they have been rendered. Warns about them when DEBUG is
+        True, and remembers them for the next change lists if
+        ModelAdmin.list_select_related_learn is set, unless the
+        ModelAdmin.queryset() chose what to select itself.
+        """
+        learn = (self.model_admin.list_select_related_learn and
+                 not self.root_query_set.query.select_related)
+        if not (learn or settings.DEBUG):
+            return
+        selected = self.query_set.query.select_related
+        if selected is True:
+            covered = set(_default_select_related_paths(self.lookup_opts))
+        else:
+            covered = set(_select_related_paths(selected or {}))
+        results = list(self.result_list)
+        loaded = set()
+        for result in results:
+            loaded.update(_loaded_relations(result))
+        missing = loaded - covered
+        if not missing:
+            return
+        if learn:
+            self.model_admin._learned_select_related_paths.update(missing)
+        if settings.DEBUG and len(results) > 1:
+            warnings.warn("The change list of %s made a query per row to load "
+                "%s. Add %s to %s.list_select_related_paths." % (
+                    self.opts.verbose_name_plural, ', '.join(sorted(missing)),
+                    ', '.join([repr(path.replace(LOOKUP_SEP, '.')) for path in sorted(missing)]),
+                    self.model_admin.__class__.__name__), RuntimeWarning)
+
     def url_for_result(self, result):
         return "%s/" % quote(getattr(result, self.pk_attname))
+
+def _select_related_paths(tree, prefix=''):
+    # The paths of the select_related() structure of a query.
+    for name, subtree in tree.items():
+        yield prefix + name
+        for path in _select_related_paths(subtree, prefix + name + LOOKUP_SEP):
+            yield path
+
+def _default_select_related_paths(opts, prefix='', depth=5):
+    # The paths that select_related() without arguments follows: the
+    # non-null ForeignKeys, as deep as its default max_depth.
+    paths = []
+    if depth == 0:
+        return paths
+    for f in opts.fields:
+        if select_related_descend(f, False, None):
+            path = prefix + f.name
+            paths.append(path)
+            paths.extend(_default_select_related_paths(f.rel.to._meta,
+                                                       path + LOOKUP_SEP, depth - 1))
+    return paths
+
+def _loaded_relations(obj, prefix='', depth=5):
+    # The paths of the ForeignKeys of the object, and of its related objects,
+    # whose related object is loaded.
+    paths = []
+    if depth == 0:
+        return paths
+    for f in obj._meta.fields:
+        if isinstance(f.rel, models.ManyToOneRel):
+            related = getattr(obj, f.get_cache_name(), None)
+            if related is not None:
+                path = prefix + f.name
+                paths.append(path)
+                paths.extend(_loaded_relations(related, path + LOOKUP_SEP, depth - 1))
+    return paths
@@ -1,5 +1,9 @@
+from django.conf import settings
+from django.core.cache import cache
 from django.db import connection
 from django.contrib.auth.models import User, Permission
+from django.contrib.auth.models import get_permission_cache_key, get_user_cache_key
+from django.contrib.auth.models import user_from_snapshot, user_to_snapshot
 
 
 class ModelBackend(object):
@@ -35,8 +39,19 @@ class ModelBackend(object):
         if user_obj.is_anonymous():
             return set()
         if not hasattr(user_obj, '_perm_cache'):
+            timeout = settings.AUTH_PERMISSION_CACHE_TIMEOUT
+            if timeout:
+                # Get the key before reading the permissions, so that changes
+                # made meanwhile invalidate what is cached.
+                cache_key = get_permission_cache_key(user_obj.pk)
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    user_obj._perm_cache, user_obj._group_perm_cache = cached
+                    return user_obj._perm_cache
             user_obj._perm_cache = set([u"%s.%s" % (p.content_type.app_label, p.codename) for p in user_obj.user_permissions.select_related()])
             user_obj._perm_cache.update(self.get_group_permissions(user_obj))
+            if timeout:
+                cache.set(cache_key, (user_obj._perm_cache, user_obj._group_perm_cache), timeout)
         return user_obj._perm_cache
 
     def has_perm(self, user_obj, perm):
@@ -52,10 +67,18 @@ class ModelBackend(object):
         return False
 
     def get_user(self, user_id):
+        timeout = settings.AUTH_USER_CACHE_TIMEOUT
+        if timeout:
+            user = user_from_snapshot(cache.get(get_user_cache_key(user_id)))
+            if user is not None:
+                return user
         try:
-            return User.objects.get(pk=user_id)
+            user = User.objects.get(pk=user_id)
         except User.DoesNotExist:
             return None
+        if timeout:
+            cache.set(get_user_cache_key(user_id), user_to_snapshot(user), timeout)
+        return user
 
 
 class RemoteUserBackend(ModelBackend):
@@ -0,0 +1,303 @@
+"""
+Password hashers.
+
+Passwords are stored as "<algorithm>$<data>", where the format of the data is
+up to the hasher of that algorithm. The hashers that can be used are listed
+in the PASSWORD_HASHERS setting; the first one hashes new passwords.
+"""
+import base64
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.crypto import constant_time_compare, get_random_string, pbkdf2
+from django.utils.encoding import smart_str
+from django.utils.hashcompat import md5_constructor, sha_constructor
+from django.utils.importlib import import_module
+
+try:
+    from hashlib import sha256
+except ImportError:
+    # Python 2.4
+    sha256 = None
+
+UNUSABLE_PASSWORD = '!' # This will never be a valid hash
+
+_hashers = {}
+
+def get_hashers():
+    """
+    Returns the instances of the PASSWORD_HASHERS, in order.
+    """
+    paths = tuple(settings.PASSWORD_HASHERS)
+    try:
+        return _hashers[paths]
+    except KeyError:
+        pass
+    hashers = []
+    for path in paths:
+        try:
+            module_name, class_name = path.rsplit('.', 1)
+            hasher_class = getattr(import_module(module_name), class_name)
+        except (ValueError, ImportError, AttributeError), e:
+            raise ImproperlyConfigured('Error importing password hasher %s: "%s"' % (path, e))
+        hasher = hasher_class()
+        if not getattr(hasher, 'algorithm', None):
+            raise ImproperlyConfigured('Password hasher %s does not define an algorithm name.' % path)
+        hashers.append(hasher)
+    if not hashers:
+        raise ImproperlyConfigured('The PASSWORD_HASHERS setting must not be empty.')
+    _hashers[paths] = hashers
+    return hashers
+
+def get_hasher(algorithm='default'):
+    """
+    Returns the hasher of the given algorithm, or the preferred hasher for
+    'default': the first one that can be used on this system. Raises
+    ValueError if no hasher in PASSWORD_HASHERS handles the algorithm.
+    """
+    hashers = get_hashers()
+    if algorithm == 'default':
+        for hasher in hashers:
+            if hasher.is_available():
+                return hasher
+        return hashers[0]
+    for hasher in hashers:
+        if hasher.algorithm == algorithm:
+            return hasher
+    raise ValueError("Unknown password hashing algorithm '%s'. Did you specify "
+                     "it in the PASSWORD_HASHERS setting?" % algorithm)
+
+def identify_hasher(encoded):
+    """
+    Returns the hasher that produced the given encoded password.
+    """
+    if len(encoded) == 32 and '$' not in encoded:
+        # Passwords from before salts were added.
+        return get_hasher('unsalted_md5')
+    return get_hasher(encoded.split('$', 1)[0])
+
+def is_password_usable(encoded):
+    return encoded is not None and encoded != UNUSABLE_PASSWORD
+
+def make_password(password, salt=None, hasher='default'):
+    """
+    Returns the password hashed by the given hasher (or algorithm name), or
+    an unusable password if it is None.
+    """
+    if password is None:
+        return UNUSABLE_PASSWORD
+    if isinstance(hasher, basestring):
+        hasher = get_hasher(hasher)
+    password = smart_str(password)
+    if salt is None:
+        salt = hasher.salt()
+    return hasher.encode(password, smart_str(salt))
+
+def check_password(password, encoded, setter=None):
+    """
+    Returns True if the password matches the encoded one. If it does, but
+    was hashed with another algorithm than the preferred one or with other
+    parameters, ``setter(password)`` is called so that it can be hashed again.
+    """
+    if password is None or not is_password_usable(encoded):
+        return False
+    # Passwords loaded from the database are unicode.
+    encoded = smart_str(encoded)
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    if not hasher.is_available():
+        return False
+    is_correct = hasher.verify(smart_str(password), encoded)
+    if is_correct and setter is not None:
+        if hasher is not get_hasher() or hasher.must_update(encoded):
+            setter(password)
+    return is_correct
+
+
+class BasePasswordHasher(object):
+    """
+    Abstract base class for password hashers.
+
+    Subclasses must define ``algorithm``, which prefixes the passwords they
+    hash, and implement ``encode()`` and ``verify()``.
+    """
+    algorithm = None
+
+    def is_available(self):
+        """
+        Returns False if this hasher can't be used on this system, for
+        instance because of the Python version.
+        """
+        return True
+
+    def salt(self):
+        """
+        Returns a new random salt.
+        """
+        return get_random_string()
+
+    def encode(self, password, salt):
+        """
+        Returns the password hashed with the given salt, in the
+        "<algorithm>$<data>" format.
+        """
+        raise NotImplementedError
+
+    def verify(self, password, encoded):
+        """
+        Returns True if the password matches the encoded one.
+        """
+        raise NotImplementedError
+
+    def must_update(self, encoded):
+        """
+        Returns True if the encoded password should be hashed again, because
+        it was hashed with other parameters than the current ones.
+        """
+        return False
+
+
+class PBKDF2PasswordHasher(BasePasswordHasher):
+    """
+    PBKDF2 with SHA256 and the number of iterations in the
+    PASSWORD_PBKDF2_ITERATIONS setting. Requires Python 2.5 or later; on
+    Python 2.4, the next hasher in PASSWORD_HASHERS hashes new passwords.
+
+    The iterations are stored in each password, so they can be raised
+    without breaking existing passwords, which are hashed again the next
+    time they are checked.
+    """
+    algorithm = 'pbkdf2_sha256'
+    digest = sha256
+
+    def _get_iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+    iterations = property(_get_iterations)
+
+    def is_available(self):
+        return self.digest is not None
+
+    def encode(self, password, salt, iterations=None):
+        if self.digest is None:
+            raise ValueError("The %s password algorithm requires Python 2.5 "
+                             "or later." % self.algorithm)
+        if iterations is None:
+            iterations = self.iterations
+        hash = pbkdf2(password, salt, iterations, digest=self.digest)
+        hash = base64.b64encode(hash).strip()
+        return '%s$%d$%s$%s' % (self.algorithm, iterations, salt, hash)
+
+    def verify(self, password, encoded):
+        algorithm, iterations, salt, hash = encoded.split('$', 3)
+        return constant_time_compare(encoded,
+                                     self.encode(password, salt, int(iterations)))
+
+    def must_update(self, encoded):
+        return int(encoded.split('$', 2)[1]) != self.iterations
+
+
+class PBKDF2SHA1PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2 with SHA1, for Python 2.4.
+    """
+    algorithm = 'pbkdf2_sha1'
+    digest = sha_constructor
+
+
+class BCryptPasswordHasher(BasePasswordHasher):
+    """
+    bcrypt, with 2 ** PASSWORD_BCRYPT_ROUNDS rounds. Requires the
+    py-bcrypt library.
+    """
+    algorithm = 'bcrypt'
+
+    def _load_library(self):
+        try:
+            import bcrypt
+        except ImportError:
+            raise ValueError("The bcrypt password algorithm requires the "
+                             "py-bcrypt library.")
+        return bcrypt
+
+    def salt(self):
+        return self._load_library().gensalt(settings.PASSWORD_BCRYPT_ROUNDS)
+
+    def encode(self, password, salt):
+        return '%s$%s' % (self.algorithm, self._load_library().hashpw(password, salt))
+
+    def verify(self, password, encoded):
+        data = encoded.split('$', 1)[1]
+        return constant_time_compare(data, self._load_library().hashpw(password, data))
+
+    def must_update(self, encoded):
+        # The data looks like "$2a$12$<salt and hash>".
+        return int(encoded.split('$')[3]) != settings.PASSWORD_BCRYPT_ROUNDS
+
+
+class SHA1PasswordHasher(BasePasswordHasher):
+    """
+    A single round of salted SHA1, which is what Django used until 1.2.
+    """
+    algorithm = 'sha1'
+
+    def salt(self):
+        return get_random_string(5)
+
+    def encode(self, password, salt):
+        return '%s$%s$%s' % (self.algorithm, salt,
+                             sha_constructor(salt + password).hexdigest())
+
+    def verify(self, password, encoded):
+        algorithm, salt, hash = encoded.split('$', 2)
+        return constant_time_compare(encoded, self.encode(password, salt))
+
+
+class MD5PasswordHasher(SHA1PasswordHasher):
+    """
+    A single round of salted MD5.
+    """
+    algorithm = 'md5'
+
+    def encode(self, password, salt):
+        return '%s$%s$%s' % (self.algorithm, salt,
+                             md5_constructor(salt + password).hexdigest())
+
+
+class UnsaltedMD5PasswordHasher(BasePasswordHasher):
+    """
+    Unsalted MD5, stored without an algorithm prefix by very old versions of
+    Django. Only useful to check such passwords.
+    """
+    algorithm = 'unsalted_md5'
+
+    def salt(self):
+        return ''
+
+    def encode(self, password, salt):
+        return md5_constructor(password).hexdigest()
+
+    def verify(self, password, encoded):
+        return constant_time_compare(encoded, self.encode(password, ''))
+
+
+class CryptPasswordHasher(BasePasswordHasher):
+    """
+    The Unix crypt(3) function, where available.
+    """
+    algorithm = 'crypt'
+
+    def salt(self):
+        return get_random_string(2)
+
+    def encode(self, password, salt):
+        try:
+            import crypt
+        except ImportError:
+            raise ValueError('"crypt" password algorithm not supported in this environment')
+        return '%s$%s$%s' % (self.algorithm, salt, crypt.crypt(password, salt))
+
+    def verify(self, password, encoded):
+        algorithm, salt, hash = encoded.split('$', 2)
+        return constant_time_compare(encoded, self.encode(password, salt))
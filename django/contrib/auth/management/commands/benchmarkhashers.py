@@ -0,0 +1,68 @@
+import math
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.hashers import BCryptPasswordHasher, get_hashers, make_password
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--target', action='store', dest='target', type='float', default=250,
+            help='The time a password check should take, in milliseconds. Work factors '
+                 'reaching it are suggested for the PBKDF2 and bcrypt hashers. Defaults to 250.'),
+        make_option('--samples', action='store', dest='samples', type='int', default=5,
+            help='The number of password checks to time for each hasher. Defaults to 5.'),
+    )
+    help = ("Measures how long checking a password takes with each of the "
+            "PASSWORD_HASHERS on this machine.")
+    args = '[algorithm ...]'
+
+    requires_model_validation = False
+
+    def handle(self, *algorithms, **options):
+        target = options.get('target', 250) / 1000.0
+        samples = options.get('samples', 5)
+        if samples < 1:
+            raise CommandError("--samples must be at least 1.")
+        hashers = [h for h in get_hashers() if not algorithms or h.algorithm in algorithms]
+        if not hashers:
+            raise CommandError("None of the PASSWORD_HASHERS implement %s." % ', '.join(algorithms))
+
+        for hasher in hashers:
+            try:
+                encoded = make_password('password', hasher=hasher)
+            except ValueError, e:
+                self.stdout.write("%-16s unavailable: %s\n" % (hasher.algorithm, e))
+                continue
+            timings = []
+            for i in range(samples):
+                start = time.time()
+                hasher.verify('password', encoded)
+                timings.append(time.time() - start)
+            # The fastest run is the least disturbed by other processes.
+            elapsed = max(min(timings), 1e-6)
+            self.stdout.write("%-16s %9.2f ms per check, %8.1f checks per second per process\n"
+                              % (hasher.algorithm, elapsed * 1000, 1 / elapsed))
+            suggestion = self.suggest(hasher, elapsed, target)
+            if suggestion:
+                self.stdout.write("%16s %s\n" % ('', suggestion))
+
+    def suggest(self, hasher, elapsed, target):
+        """
+        Returns a suggestion of the work factor that makes a check of the
+        given hasher take about the target time, if it has one.
+        """
+        if isinstance(hasher, BCryptPasswordHasher):
+            from django.conf import settings
+            rounds = settings.PASSWORD_BCRYPT_ROUNDS
+            # Each round doubles the cost.
+            suggested = rounds + int(math.floor(math.log(target / elapsed, 2)))
+            return "PASSWORD_BCRYPT_ROUNDS = %d (currently %d)" % (max(suggested, 4), rounds)
+        iterations = getattr(hasher, 'iterations', None)
+        if iterations:
+            suggested = int(iterations * target / elapsed)
+            # Round to two significant digits.
+            magnitude = 10 ** max(len(str(suggested)) - 2, 0)
+            suggested = max(suggested // magnitude * magnitude, 1000)
+            return "PASSWORD_PBKDF2_ITERATIONS = %d (currently %d)" % (suggested, iterations)
+        return None
@@ -1,18 +1,20 @@
 import datetime
+import time
 import urllib
 
 from django.contrib import auth
 from django.core.exceptions import ImproperlyConfigured
 from django.db import models
+from django.db.models import signals
 from django.db.models.manager import EmptyManager
 from django.contrib.contenttypes.models import ContentType
 from django.utils.encoding import smart_str
 from django.utils.hashcompat import md5_constructor, sha_constructor
 from django.utils.translation import ugettext_lazy as _
+from django.contrib.auth.hashers import (check_password as _check_password,
+    is_password_usable, make_password, UNUSABLE_PASSWORD)
 
 
-UNUSABLE_PASSWORD = '!' # This will never be a valid hash
-
 def get_hexdigest(algorithm, salt, raw_password):
     """
     Returns a string of the hexdigest of the given plaintext password and salt
@@ -37,8 +39,7 @@ def check_password(raw_password, enc_password):
     Returns a boolean of whether the raw_password was correct. Handles
     encryption formats behind the scenes.
     """
-    algo, salt, hsh = enc_password.split('$')
-    return hsh == get_hexdigest(algo, salt, raw_password)
+    return _check_password(raw_password, enc_password)
 
 class SiteProfileNotAvailable(Exception):
     pass
@@ -211,6 +212,16 @@ class User(models.Model):
     def __unicode__(self):
         return self.username
 
+    def __getattr__(self, name):
+        # Only called for missing attributes. Users rebuilt from the user
+        # cache by user_from_snapshot() lack their password until it's used.
+        if name != 'password' or self.pk is None:
+            raise AttributeError(name)
+        password = User._base_manager.using(self._state.db).filter(
+            pk=self.pk).values_list('password', flat=True).get()
+        self.password = password
+        return password
+
     def get_absolute_url(self):
         return "/users/%s/" % urllib.quote(smart_str(self.username))
 
@@ -234,41 +245,25 @@ class User(models.Model):
         return full_name.strip()
 
     def set_password(self, raw_password):
-        if raw_password is None:
-            self.set_unusable_password()
-        else:
-            import random
-            algo = 'sha1'
-            salt = get_hexdigest(algo, str(random.random()), str(random.random()))[:5]
-            hsh = get_hexdigest(algo, salt, raw_password)
-            self.password = '%s$%s$%s' % (algo, salt, hsh)
+        self.password = make_password(raw_password)
 
     def check_password(self, raw_password):
         """
         Returns a boolean of whether the raw_password was correct. Handles
         encryption formats behind the scenes.
         """
-        # Backwards-compatibility check. Older passwords won't include the
-        # algorithm or salt.
-        if '$' not in self.password:
-            is_correct = (self.password == get_hexdigest('md5', '', raw_password))
-            if is_correct:
-                # Convert the password to the new, more secure format.
-                self.set_password(raw_password)
-                self.save()
-            return is_correct
-        return check_password(raw_password, self.password)
+        def setter(raw_password):
+            # Convert the password to the preferred hasher and parameters.
+            self.set_password(raw_password)
+            self.save()
+        return _check_password(raw_password, self.password, setter)
 
     def set_unusable_password(self):
         # Sets a value that will never be a valid hash
         self.password = UNUSABLE_PASSWORD
 
     def has_usable_password(self):
-        if self.password is None \
-            or self.password == UNUSABLE_PASSWORD:
-            return False
-        else:
-            return True
+        return is_password_usable(self.password)
 
     def get_group_permissions(self, obj=None):
         """
@@ -472,3 +467,115 @@ class AnonymousUser(object):
 
     def is_authenticated(self):
         return False
+
+
+# Cached permissions. Each user's permission set is cached under a key that
+# includes two version numbers: one for all users and one for the user. The
+# signal handlers below change the versions when permissions change, so that
+# stale sets are never read again and simply expire.
+
+PERMISSION_VERSION_KEY = 'auth.permissions.version'
+
+def _new_permission_version():
+    # Unique across processes and after eviction, unlike a counter restarted
+    # from zero, so a stale cache entry can't be read again.
+    return '%x' % int(time.time() * 1000000)
+
+def get_permission_cache_key(user_id):
+    """
+    Returns the cache key of the permissions of the user with the given id.
+    """
+    from django.core.cache import cache
+    user_version_key = '%s.%s' % (PERMISSION_VERSION_KEY, user_id)
+    versions = cache.get_many([PERMISSION_VERSION_KEY, user_version_key])
+    for key in (PERMISSION_VERSION_KEY, user_version_key):
+        if key not in versions:
+            cache.add(key, _new_permission_version())
+            versions[key] = cache.get(key)
+    return 'auth.permissions.%s.%s.%s' % (user_id,
+        versions[PERMISSION_VERSION_KEY], versions[user_version_key])
+
+def invalidate_permission_cache(user_ids=None):
+    """
+    Invalidates the cached permissions of the users with the given ids, or
+    of all users.
+    """
+    from django.conf import settings
+    if not settings.AUTH_PERMISSION_CACHE_TIMEOUT:
+        return
+    from django.core.cache import cache
+    if user_ids is None:
+        keys = [PERMISSION_VERSION_KEY]
+    else:
+        keys = ['%s.%s' % (PERMISSION_VERSION_KEY, pk) for pk in user_ids]
+    version = _new_permission_version()
+    cache.set_many(dict([(key, version) for key in keys]))
+
+def _user_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        # user.groups or user.user_permissions
+        invalidate_permission_cache([instance.pk])
+    elif pk_set is not None and sender is User.groups.through:
+        # group.user_set.add() and remove()
+        invalidate_permission_cache(pk_set)
+    else:
+        # group.user_set.clear(), or changes to permission.user_set
+        invalidate_permission_cache()
+
+def _group_permissions_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        invalidate_permission_cache()
+
+def _permissions_changed(sender, **kwargs):
+    invalidate_permission_cache()
+
+# Cached users. ModelBackend.get_user() caches a snapshot of the users it
+# loads: the database alias and the values of their fields, except the
+# password, which is loaded from the database when it's first accessed.
+
+def get_user_cache_key(user_id):
+    """
+    Returns the cache key of the snapshot of the user with the given id.
+    """
+    return 'auth.user.%s' % user_id
+
+def _snapshot_fields():
+    return [f for f in User._meta.fields if f.attname != 'password']
+
+def user_to_snapshot(user):
+    return (user._state.db, tuple([getattr(user, f.attname) for f in _snapshot_fields()]))
+
+def user_from_snapshot(snapshot):
+    """
+    Returns the User saved with user_to_snapshot(), or None if the snapshot
+    doesn't match the current User model.
+    """
+    try:
+        db, values = snapshot
+    except (TypeError, ValueError):
+        return None
+    fields = _snapshot_fields()
+    if len(values) != len(fields):
+        return None
+    user = User(**dict([(f.attname, value) for f, value in zip(fields, values)]))
+    user._state.db = db
+    # User.__getattr__() loads the password when it's needed.
+    del user.password
+    return user
+
+def _user_changed(sender, instance, **kwargs):
+    from django.conf import settings
+    if settings.AUTH_USER_CACHE_TIMEOUT:
+        from django.core.cache import cache
+        cache.delete(get_user_cache_key(instance.pk))
+
+signals.post_save.connect(_user_changed, sender=User)
+signals.post_delete.connect(_user_changed, sender=User)
+signals.m2m_changed.connect(_user_permissions_changed, sender=User.groups.through)
+signals.m2m_changed.connect(_user_permissions_changed, sender=User.user_permissions.through)
+signals.m2m_changed.connect(_group_permissions_changed, sender=Group.permissions.through)
+signals.post_save.connect(_permissions_changed, sender=Permission)
+signals.post_delete.connect(_permissions_changed, sender=Permission)
+signals.post_delete.connect(_permissions_changed, sender=Group)
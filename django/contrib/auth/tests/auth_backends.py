@@ -1,8 +1,11 @@
 import warnings
 
 from django.conf import settings
-from django.contrib.auth.models import User, Group, Permission, AnonymousUser
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import (User, Group, Permission, AnonymousUser,
+    get_user_cache_key)
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.test import TestCase
 
 
@@ -90,6 +93,111 @@ class BackendTest(TestCase):
         self.assertEqual(user.get_all_permissions(), set(['auth.test']))
 
 
+class CachedPermissionsBackendTest(BackendTest):
+    """
+    Runs the ModelBackend tests with the shared permission cache enabled.
+    """
+    def setUp(self):
+        super(CachedPermissionsBackendTest, self).setUp()
+        self.old_timeout = settings.AUTH_PERMISSION_CACHE_TIMEOUT
+        settings.AUTH_PERMISSION_CACHE_TIMEOUT = 60
+        cache.clear()
+
+    def tearDown(self):
+        settings.AUTH_PERMISSION_CACHE_TIMEOUT = self.old_timeout
+        cache.clear()
+        super(CachedPermissionsBackendTest, self).tearDown()
+
+    def test_cached_permissions(self):
+        content_type = ContentType.objects.get_for_model(Group)
+        perm = Permission.objects.create(name='test', content_type=content_type, codename='test')
+        group = Group.objects.create(name='test_group')
+        user = User.objects.get(username='test')
+        user.user_permissions.add(perm)
+        self.assertEqual(user.get_all_permissions(), set([u'auth.test']))
+
+        user = User.objects.get(username='test')
+        self.assertNumQueries(0, user.has_perm, 'auth.test')
+        self.assertEqual(user.get_group_permissions(), set())
+
+        # Adding the user to a group from either side invalidates the cache.
+        group_perm = Permission.objects.create(name='test2', content_type=content_type, codename='test2')
+        group.permissions.add(group_perm)
+        group.user_set.add(user)
+        user = User.objects.get(username='test')
+        self.assertEqual(user.get_all_permissions(), set([u'auth.test', u'auth.test2']))
+
+        # So does changing the permissions of a group.
+        group.permissions.clear()
+        user = User.objects.get(username='test')
+        self.assertEqual(user.get_all_permissions(), set([u'auth.test']))
+        user.user_permissions.remove(perm)
+        user = User.objects.get(username='test')
+        self.assertEqual(user.get_all_permissions(), set())
+
+
+class CachedUserBackendTest(TestCase):
+
+    def setUp(self):
+        self.old_timeout = settings.AUTH_USER_CACHE_TIMEOUT
+        settings.AUTH_USER_CACHE_TIMEOUT = 60
+        cache.clear()
+        self.user = User.objects.create_user('test', 'test@example.com', 'test')
+        self.backend = ModelBackend()
+
+    def tearDown(self):
+        settings.AUTH_USER_CACHE_TIMEOUT = self.old_timeout
+        cache.clear()
+
+    def test_get_user(self):
+        self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+        self.assertNumQueries(0, self.backend.get_user, self.user.pk)
+        user = self.backend.get_user(self.user.pk)
+        self.assertEqual(user, self.user)
+        self.assertEqual(user.email, 'test@example.com')
+        self.assertEqual(user.date_joined, self.user.date_joined)
+        self.assertTrue(user.check_password('test'))
+        self.assertEqual(user._state.db, self.user._state.db)
+
+        # Saving the user invalidates the cached snapshot.
+        user = self.backend.get_user(self.user.pk)
+        user.first_name = 'Test'
+        user.save()
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual(self.backend.get_user(self.user.pk).first_name, 'Test')
+        self.assertTrue(user.check_password('test'))
+        self.user.email = 'changed@example.com'
+        self.user.save()
+        self.assertEqual(self.backend.get_user(self.user.pk).email, 'changed@example.com')
+        self.user.delete()
+        self.assertEqual(self.backend.get_user(user.pk), None)
+
+    def test_password_not_cached(self):
+        self.backend.get_user(self.user.pk)
+        db, values = cache.get(get_user_cache_key(self.user.pk))
+        self.assertFalse(self.user.password in values)
+        user = self.backend.get_user(self.user.pk)
+        self.assertEqual(user, self.user)
+        # The password is loaded, once, when it's first used.
+        self.assertNumQueries(1, user.check_password, 'test')
+        self.assertNumQueries(0, user.check_password, 'test')
+        self.assertEqual(user.password, self.user.password)
+        # Saving a user rebuilt from the cache keeps its password.
+        user = self.backend.get_user(self.user.pk)
+        user.first_name = 'Test'
+        user.save()
+        self.assertTrue(User.objects.get(pk=self.user.pk).check_password('test'))
+
+    def test_update_needs_invalidation(self):
+        self.backend.get_user(self.user.pk)
+        # QuerySet.update() doesn't send signals, so the snapshot is stale...
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertTrue(self.backend.get_user(self.user.pk).is_active)
+        # ... until it's removed explicitly.
+        cache.delete(get_user_cache_key(self.user.pk))
+        self.assertFalse(self.backend.get_user(self.user.pk).is_active)
+
+
 class TestObj(object):
     pass
 
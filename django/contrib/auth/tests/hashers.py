@@ -0,0 +1,131 @@
+from StringIO import StringIO
+
+from django.conf import settings
+from django.contrib.auth.hashers import (check_password, get_hasher,
+    identify_hasher, is_password_usable, make_password, PBKDF2PasswordHasher,
+    UNUSABLE_PASSWORD)
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import unittest
+from django.utils.crypto import pbkdf2
+from django.utils.hashcompat import md5_constructor
+
+try:
+    import bcrypt
+except ImportError:
+    bcrypt = None
+
+try:
+    import crypt
+except ImportError:
+    crypt = None
+
+
+class PBKDF2Test(unittest.TestCase):
+
+    def test_rfc6070_vectors(self):
+        # Test vectors from RFC 6070, for PBKDF2 with HMAC-SHA1.
+        vectors = [
+            ('password', 'salt', 1, 20, '0c60c80f961f0e71f3a9b524af6012062fe037a6'),
+            ('password', 'salt', 2, 20, 'ea6c014dc72d6f8ccd1ed92ace1d41f0d8de8957'),
+            ('password', 'salt', 4096, 20, '4b007901b765489abead49d926f721d065a429c1'),
+            ('passwordPASSWORDpassword', 'saltSALTsaltSALTsaltSALTsaltSALTsalt',
+             4096, 25, '3d2eec4fe41c849b80c8d83662c0e44a8b291a964cf2f07038'),
+            ('pass\0word', 'sa\0lt', 4096, 16, '56fa6aa75548099dcc37d7f03425e0c3'),
+        ]
+        for password, salt, iterations, dklen, expected in vectors:
+            self.assertEqual(pbkdf2(password, salt, iterations, dklen).encode('hex'), expected)
+
+
+class PasswordHashersTest(TestCase):
+
+    def setUp(self):
+        self.old_iterations = settings.PASSWORD_PBKDF2_ITERATIONS
+        settings.PASSWORD_PBKDF2_ITERATIONS = 100
+
+    def tearDown(self):
+        settings.PASSWORD_PBKDF2_ITERATIONS = self.old_iterations
+
+    def test_pbkdf2(self):
+        encoded = make_password('letmein', 'seasalt', 'pbkdf2_sha256')
+        self.assertEqual(encoded, 'pbkdf2_sha256$100$seasalt$DLjGWLbfTwCIsRTfze0mtQmJhwLwZfK6wmYlXbSsOMk=')
+        self.assertTrue(check_password(u'letmein', encoded))
+        self.assertFalse(check_password('letmeinz', encoded))
+        self.assertTrue(check_password('letmein', make_password('letmein', hasher='pbkdf2_sha1')))
+
+    def test_legacy_hashers(self):
+        for algorithm in ('sha1', 'md5'):
+            encoded = make_password('letmein', 'seasalt', algorithm)
+            self.assertTrue(encoded.startswith(algorithm + '$seasalt$'))
+            self.assertTrue(check_password('letmein', encoded))
+            self.assertFalse(check_password('letmeinz', encoded))
+        encoded = md5_constructor('letmein').hexdigest()
+        self.assertEqual(identify_hasher(encoded).algorithm, 'unsalted_md5')
+        self.assertTrue(check_password('letmein', encoded))
+        self.assertFalse(check_password('letmeinz', encoded))
+
+    @unittest.skipUnless(crypt, "no crypt module to generate password.")
+    def test_crypt(self):
+        encoded = make_password('letmein', 'ab', 'crypt')
+        self.assertTrue(check_password('letmein', encoded))
+        self.assertFalse(check_password('letmeinz', encoded))
+
+    @unittest.skipUnless(bcrypt, "py-bcrypt not installed")
+    def test_bcrypt(self):
+        encoded = make_password('letmein', hasher='bcrypt')
+        self.assertTrue(encoded.startswith('bcrypt$'))
+        self.assertTrue(check_password('letmein', encoded))
+        self.assertFalse(check_password('letmeinz', encoded))
+
+    def test_unusable(self):
+        self.assertEqual(make_password(None), UNUSABLE_PASSWORD)
+        self.assertFalse(is_password_usable(UNUSABLE_PASSWORD))
+        self.assertFalse(check_password(None, make_password('letmein')))
+        self.assertFalse(check_password('', UNUSABLE_PASSWORD))
+        # Unknown algorithms don't match anything.
+        self.assertFalse(check_password('letmein', 'rot13$salt$yrgzrva'))
+        self.assertRaises(ValueError, get_hasher, 'rot13')
+
+    def test_upgrade(self):
+        user = User.objects.create_user('upgrade', 'upgrade@example.com')
+        user.password = make_password('letmein', hasher='sha1')
+        user.save()
+        self.assertFalse(User.objects.get(pk=user.pk).check_password('wrong'))
+        self.assertTrue(User.objects.get(pk=user.pk).password.startswith('sha1$'))
+        self.assertTrue(user.check_password('letmein'))
+        self.assertTrue(User.objects.get(pk=user.pk).password.startswith('pbkdf2_sha256$100$'))
+
+        # Passwords are hashed again when the iterations change.
+        settings.PASSWORD_PBKDF2_ITERATIONS = 200
+        user = User.objects.get(pk=user.pk)
+        self.assertTrue(user.check_password('letmein'))
+        self.assertTrue(User.objects.get(pk=user.pk).password.startswith('pbkdf2_sha256$200$'))
+
+    def test_sha256_unavailable(self):
+        # Python 2.4's hashlib-less standard library has no SHA256.
+        old_digest = PBKDF2PasswordHasher.digest
+        PBKDF2PasswordHasher.digest = None
+        try:
+            self.assertEqual(get_hasher().algorithm, 'pbkdf2_sha1')
+            user = User.objects.create_user('py24', 'py24@example.com', 'letmein')
+            self.assertTrue(user.password.startswith('pbkdf2_sha1$100$'))
+            self.assertTrue(user.check_password('letmein'))
+
+            user.password = make_password('letmein', hasher='sha1')
+            self.assertTrue(user.check_password('letmein'))
+            self.assertTrue(User.objects.get(pk=user.pk).password.startswith('pbkdf2_sha1$'))
+
+            self.assertFalse(check_password('letmein',
+                'pbkdf2_sha256$100$seasalt$DLjGWLbfTwCIsRTfze0mtQmJhwLwZfK6wmYlXbSsOMk='))
+        finally:
+            PBKDF2PasswordHasher.digest = old_digest
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmarkhashers', 'pbkdf2_sha256', 'sha1', samples=1, target=10, stdout=out)
+        output = out.getvalue()
+        self.assertTrue('pbkdf2_sha256' in output)
+        self.assertTrue('PASSWORD_PBKDF2_ITERATIONS = ' in output)
+        self.assertTrue('sha1' in output)
+        self.assertFalse('md5' in output)
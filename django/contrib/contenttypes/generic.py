@@ -81,6 +81,41 @@ class GenericForeignKey(object):
             setattr(instance, self.cache_attr, rel_obj)
             return rel_obj
 
+    def bulk_load(self, instances):
+        """
+        Fetches the objects this generic foreign key points to for all the
+        given instances, with one query per content type rather than one per
+        instance, and caches them on the instances.
+        """
+        f = self.model._meta.get_field(self.ct_field)
+        # Group the instances by database and content type.
+        groups = {}
+        for instance in instances:
+            ct_id = getattr(instance, f.get_attname(), None)
+            if ct_id:
+                groups.setdefault((instance._state.db, ct_id), []).append(instance)
+            else:
+                setattr(instance, self.cache_attr, None)
+        for (using, ct_id), group in groups.items():
+            ct = self.get_content_type(id=ct_id, using=using)
+            model = ct.model_class()
+            if model is None:
+                # The model isn't installed anymore.
+                for instance in group:
+                    setattr(instance, self.cache_attr, None)
+                continue
+            pk = model._meta.pk
+            objects = model._default_manager.using(ct._state.db).in_bulk(
+                list(set([getattr(instance, self.fk_field) for instance in group])))
+            for instance in group:
+                try:
+                    # The object id field may have another type than the
+                    # primary key, e.g. a TextField.
+                    key = pk.to_python(getattr(instance, self.fk_field))
+                except Exception:
+                    key = None
+                setattr(instance, self.cache_attr, objects.get(key))
+
     def __set__(self, instance, value):
         if instance is None:
             raise AttributeError(u"%s must be accessed via instance" % self.related.opts.object_name)
@@ -95,6 +130,21 @@ class GenericForeignKey(object):
         setattr(instance, self.fk_field, fk)
         setattr(instance, self.cache_attr, value)
 
+def load_generic_foreign_keys(instances, *names):
+    """
+    Fetches the objects the generic foreign keys of the given instances (or
+    QuerySet) point to, with one query per content type, and returns the
+    instances as a list. All the generic foreign keys of the model are loaded
+    unless some names are given.
+    """
+    instances = list(instances)
+    if instances:
+        opts = instances[0]._meta
+        for field in opts.virtual_fields:
+            if isinstance(field, GenericForeignKey) and (not names or field.name in names):
+                field.bulk_load(instances)
+    return instances
+
 class GenericRelation(RelatedField, Field):
     """Provides an accessor to generic related objects (e.g. comments)"""
 
@@ -295,7 +345,7 @@ class BaseGenericInlineFormSet(BaseModelFormSet):
     """
 
     def __init__(self, data=None, files=None, instance=None, save_as_new=None,
-                 prefix=None, queryset=None):
+                 prefix=None, queryset=None, choice_caches=None):
         # Avoid a circular import.
         from django.contrib.contenttypes.models import ContentType
         opts = self.model._meta
@@ -315,7 +365,7 @@ class BaseGenericInlineFormSet(BaseModelFormSet):
             })
         super(BaseGenericInlineFormSet, self).__init__(
             queryset=qs, data=data, files=files,
-            prefix=prefix
+            prefix=prefix, choice_caches=choice_caches
         )
 
     #@classmethod
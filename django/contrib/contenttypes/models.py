@@ -7,6 +7,8 @@ class ContentTypeManager(models.Manager):
     # Cache to avoid re-looking up ContentType objects all over the place.
     # This cache is shared by all the get_for_* methods.
     _cache = {}
+    # The databases whose content types have all been loaded into the cache.
+    _preloaded = set()
 
     def get_by_natural_key(self, app_label, model):
         try:
@@ -15,39 +17,103 @@ class ContentTypeManager(models.Manager):
             ct = self.get(app_label=app_label, model=model)
         return ct
 
+    def _get_opts(self, model):
+        # Proxy models share the content type of their concrete model.
+        opts = model._meta
+        while opts.proxy:
+            model = opts.proxy_for_model
+            opts = model._meta
+        return opts
+
+    def _get_from_cache(self, key):
+        """
+        Returns the cached ContentType for the given key. The first miss for a
+        database loads all of its content types at once.
+        """
+        try:
+            return self.__class__._cache[self.db][key]
+        except KeyError:
+            if self.db in self.__class__._preloaded:
+                raise
+        self.preload()
+        return self.__class__._cache[self.db][key]
+
+    def preload(self):
+        """
+        Loads all the ContentType objects of the database into the cache with
+        a single query. This happens by itself the first time one of them
+        isn't found in the cache, but can also be done at startup.
+        """
+        for ct in self.all():
+            self._add_to_cache(self.db, ct)
+        self.__class__._preloaded.add(self.db)
+
     def get_for_model(self, model):
         """
         Returns the ContentType object for a given model, creating the
         ContentType if necessary. Lookups are cached so that subsequent lookups
         for the same model don't hit the database.
         """
-        opts = model._meta
-        while opts.proxy:
-            model = opts.proxy_for_model
-            opts = model._meta
+        opts = self._get_opts(model)
         key = (opts.app_label, opts.object_name.lower())
         try:
-            ct = self.__class__._cache[self.db][key]
+            ct = self._get_from_cache(key)
         except KeyError:
-            # Load or create the ContentType entry. The smart_unicode() is
-            # needed around opts.verbose_name_raw because name_raw might be a
-            # django.utils.functional.__proxy__ object.
-            ct, created = self.get_or_create(
-                app_label = opts.app_label,
-                model = opts.object_name.lower(),
-                defaults = {'name': smart_unicode(opts.verbose_name_raw)},
-            )
-            self._add_to_cache(self.db, ct)
+            ct = self._get_or_create_for_opts(opts)
+        return ct
 
+    def _get_or_create_for_opts(self, opts):
+        # Load or create the ContentType entry. The smart_unicode() is
+        # needed around opts.verbose_name_raw because name_raw might be a
+        # django.utils.functional.__proxy__ object.
+        ct, created = self.get_or_create(
+            app_label = opts.app_label,
+            model = opts.object_name.lower(),
+            defaults = {'name': smart_unicode(opts.verbose_name_raw)},
+        )
+        self._add_to_cache(self.db, ct)
         return ct
 
+    def get_for_models(self, *models):
+        """
+        Returns a dictionary mapping each of the given models to its
+        ContentType, like get_for_model() does for one. The ones that aren't
+        cached are fetched with a single query.
+        """
+        results = {}
+        needed = {}
+        for model in models:
+            opts = self._get_opts(model)
+            key = (opts.app_label, opts.object_name.lower())
+            try:
+                results[model] = self.__class__._cache[self.db][key]
+            except KeyError:
+                needed.setdefault(key, []).append(model)
+        if needed:
+            cts = self.filter(
+                app_label__in=set([app_label for app_label, model in needed]),
+                model__in=set([model for app_label, model in needed]),
+            )
+            for ct in cts:
+                # The query can match other pairs of app label and model.
+                for model in needed.pop((ct.app_label, ct.model), []):
+                    results[model] = ct
+                self._add_to_cache(self.db, ct)
+            # Whatever is left doesn't exist yet. Create it without going
+            # through get_for_model(), which would load every content type.
+            for model_list in needed.values():
+                ct = self._get_or_create_for_opts(self._get_opts(model_list[0]))
+                for model in model_list:
+                    results[model] = ct
+        return results
+
     def get_for_id(self, id):
         """
         Lookup a ContentType by ID. Uses the same shared cache as get_for_model
         (though ContentTypes are obviously not created on-the-fly by get_by_id).
         """
         try:
-            ct = self.__class__._cache[self.db][id]
+            ct = self._get_from_cache(id)
         except KeyError:
             # This could raise a DoesNotExist; that's correct behavior and will
             # make sure that only correct ctypes get stored in the cache dict.
@@ -63,11 +129,13 @@ class ContentTypeManager(models.Manager):
         this gets called).
         """
         self.__class__._cache.clear()
+        self.__class__._preloaded.clear()
 
     def _add_to_cache(self, using, ct):
         """Insert a ContentType into the cache."""
-        model = ct.model_class()
-        key = (model._meta.app_label, model._meta.object_name.lower())
+        # Not keyed on ct.model_class(), which is None for the content types
+        # of models that are no longer installed.
+        key = (ct.app_label, ct.model)
         self.__class__._cache.setdefault(using, {})[key] = ct
         self.__class__._cache.setdefault(using, {})[ct.id] = ct
 
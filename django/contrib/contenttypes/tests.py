@@ -46,6 +46,53 @@ class ContentTypesTests(TestCase):
         len(db.connection.queries)
         self.assertEqual(2, len(db.connection.queries))
 
+    def test_preload(self):
+        """
+        The first cache miss loads all content types, so that lookups for
+        other models don't hit the database.
+        """
+        from django.contrib.auth.models import User, Group
+        ContentType.objects.get_for_model(User)
+        self.assertEqual(1, len(db.connection.queries))
+        group_ct = ContentType.objects.get_for_model(Group)
+        ContentType.objects.get_for_id(group_ct.id)
+        self.assertEqual(1, len(db.connection.queries))
+
+        ContentType.objects.clear_cache()
+        ContentType.objects.preload()
+        self.assertEqual(2, len(db.connection.queries))
+        self.assertEqual(ContentType.objects.get_for_model(Group), group_ct)
+        self.assertEqual(2, len(db.connection.queries))
+
+    def test_get_for_models(self):
+        from django.contrib.auth.models import User, Group, Permission
+        # Unlike get_for_model(), get_for_models() only caches the content
+        # types it's asked for.
+        ContentType.objects.get_for_models(ContentType)
+        db.reset_queries()
+        cts = ContentType.objects.get_for_models(ContentType, User, Group, Permission)
+        self.assertEqual(1, len(db.connection.queries))
+        self.assertEqual(cts, {
+            ContentType: ContentType.objects.get_for_model(ContentType),
+            User: ContentType.objects.get_for_model(User),
+            Group: ContentType.objects.get_for_model(Group),
+            Permission: ContentType.objects.get_for_model(Permission),
+        })
+        # Everything is cached now.
+        self.assertEqual(1, len(db.connection.queries))
+        ContentType.objects.get_for_models(User, Group)
+        self.assertEqual(1, len(db.connection.queries))
+
+        # Missing content types are created, without loading all the others.
+        ContentType.objects.filter(app_label='auth', model='group').delete()
+        ContentType.objects.clear_cache()
+        db.reset_queries()
+        cts = ContentType.objects.get_for_models(User, Group)
+        # One query for both models, then get_or_create() for the group.
+        self.assertEqual(3, len(db.connection.queries))
+        self.assertEqual(cts[Group].model, 'group')
+        self.assertEqual(cts[Group], ContentType.objects.get(app_label='auth', model='group'))
+
     def test_shortcut_view(self):
         """
         Check that the shortcut view (used for the admin "view on site"
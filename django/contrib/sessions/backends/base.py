@@ -10,6 +10,7 @@ except ImportError:
     import pickle
 
 from django.conf import settings
+from django.contrib.sessions.serializers import get_serializer
 from django.core.exceptions import SuspiciousOperation
 from django.utils.hashcompat import md5_constructor
 from django.utils.crypto import constant_time_compare, salted_hmac
@@ -39,6 +40,10 @@ class SessionBase(object):
         self._session_key = session_key
         self.accessed = False
         self.modified = False
+        # The encoded data and expiry date known to be in the store for this
+        # session key.
+        self._stored_data = None
+        self._stored_expiry = None
 
     def __contains__(self, key):
         return key in self._session
@@ -88,25 +93,22 @@ class SessionBase(object):
         key_salt = "django.contrib.sessions" + self.__class__.__name__
         return salted_hmac(key_salt, value).hexdigest()
 
+    def _get_serializer(self):
+        return get_serializer()
+    serializer = property(_get_serializer)
+
     def encode(self, session_dict):
-        "Returns the given session dictionary pickled and encoded as a string."
-        pickled = pickle.dumps(session_dict, pickle.HIGHEST_PROTOCOL)
-        hash = self._hash(pickled)
-        return base64.encodestring(hash + ":" + pickled)
+        "Returns the given session dictionary serialized and encoded as a string."
+        serialized = self.serializer.dumps(session_dict)
+        hash = self._hash(serialized)
+        return base64.b64encode(hash + ":" + serialized)
 
     def decode(self, session_data):
         encoded_data = base64.decodestring(session_data)
-        try:
-            # could produce ValueError if there is no ':'
-            hash, pickled = encoded_data.split(':', 1)
-            expected_hash = self._hash(pickled)
-            if not constant_time_compare(hash, expected_hash):
-                raise SuspiciousOperation("Session data corrupted")
-            else:
-                return pickle.loads(pickled)
-        except Exception:
-            # ValueError, SuspiciousOperation, unpickling exceptions
-            # Fall back to Django 1.2 method
+        hash, serialized = encoded_data[:40], encoded_data[41:]
+        if encoded_data[40:41] != ':' or not hash.isalnum():
+            # Not signed with a salted HMAC, so possibly data stored by
+            # Django 1.2.
             # PendingDeprecationWarning <- here to remind us to
             # remove this fallback in Django 1.5
             try:
@@ -115,6 +117,16 @@ class SessionBase(object):
                 # Unpickling can cause a variety of exceptions. If something happens,
                 # just return an empty dictionary (an empty session).
                 return {}
+        if not constant_time_compare(hash, self._hash(serialized)):
+            # Corrupted or tampered with: don't even try to unserialize it.
+            return {}
+        try:
+            session_dict = self.serializer.loads(serialized)
+        except Exception:
+            # Data written with another SESSION_SERIALIZER, for example.
+            return {}
+        self._stored_data = session_data
+        return session_dict
 
     def _decode_old(self, session_data):
         encoded_data = base64.decodestring(session_data)
@@ -151,6 +163,42 @@ class SessionBase(object):
         self.accessed = True
         self.modified = True
 
+    def _encode_for_save(self, session_dict, must_create=False):
+        """
+        Returns the given session dictionary encoded for saving, or None if
+        saving it would not change the store: it encodes to the data that was
+        loaded or last saved, and the stored expiry doesn't need to move
+        forward.
+        """
+        session_data = self.encode(session_dict)
+        if (not must_create and session_data == self._stored_data and
+                not self._needs_expiry_refresh()):
+            return None
+        return session_data
+
+    def _data_unchanged(self, session_dict):
+        # Comparing the encoded data avoids unserializing the stored data. A
+        # serializer whose output depends on more than the dictionary's
+        # contents only causes unneeded saves.
+        return (self._stored_data is not None and
+                self.encode(session_dict) == self._stored_data)
+
+    def _needs_expiry_refresh(self):
+        """
+        Returns True if the stored expiry date should move forward, which is
+        when less than SESSION_EXPIRY_REFRESH_FRACTION of the session's age
+        remains before it.
+        """
+        if isinstance(self.get('_session_expiry'), datetime):
+            # A fixed expiry date is the same on every save.
+            return False
+        fraction = settings.SESSION_EXPIRY_REFRESH_FRACTION
+        if fraction >= 1 or self._stored_expiry is None:
+            return True
+        remaining = self._stored_expiry - datetime.now()
+        remaining = remaining.days * 86400 + remaining.seconds
+        return remaining < self.get_expiry_age() * fraction
+
     def _get_new_session_key(self):
         "Returns session key that isn't being used."
         # The random module is seeded when this Apache child is created.
@@ -308,3 +356,12 @@ class SessionBase(object):
         Loads the session data and returns a dictionary.
         """
         raise NotImplementedError
+
+    def clear_expired(cls, batch_size=1000, pause=0):
+        """
+        Removes expired sessions from the session store, working through at
+        most ``batch_size`` sessions at a time and sleeping ``pause`` seconds
+        in between. Returns the number of sessions removed.
+        """
+        raise NotImplementedError
+    clear_expired = classmethod(clear_expired)
@@ -1,10 +1,81 @@
 """
 Cached, database-backed sessions.
 """
+import atexit
+import datetime
+import time
+try:
+    import threading
+except ImportError:
+    import dummy_threading as threading
 
 from django.conf import settings
 from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.contrib.sessions.models import Session
 from django.core.cache import cache
+from django.db import router
+
+# The number of queued expiry dates that are written to the database
+# straight away, however recently they were queued.
+MAX_PENDING_EXPIRY = 1000
+
+# Expiry dates waiting to be written to the database in write-behind mode,
+# keyed by session key, and when the oldest of them was queued.
+_pending_expiry = {}
+_pending_lock = threading.Lock()
+_pending_since = None
+
+def queue_expiry_update(session_key, expire_date):
+    """
+    Queues a new expiry date for the given session. The queue is written to
+    the database, by the calling thread, once its oldest date has waited for
+    SESSION_EXPIRY_WRITE_BEHIND seconds or once it holds MAX_PENDING_EXPIRY
+    dates.
+    """
+    global _pending_since
+    now = time.time()
+    _pending_lock.acquire()
+    try:
+        if not _pending_expiry:
+            _pending_since = now
+        _pending_expiry[session_key] = expire_date
+        due = (len(_pending_expiry) >= MAX_PENDING_EXPIRY or
+               now - _pending_since >= settings.SESSION_EXPIRY_WRITE_BEHIND)
+    finally:
+        _pending_lock.release()
+    if due:
+        flush_expiry_updates()
+
+def flush_expiry_updates():
+    """
+    Writes the queued expiry dates to the database. Dates are rounded up to
+    the minute, so that sessions expiring in the same minute are updated with
+    a single query.
+    """
+    _pending_lock.acquire()
+    try:
+        pending = _pending_expiry.items()
+        _pending_expiry.clear()
+    finally:
+        _pending_lock.release()
+    by_date = {}
+    for session_key, expire_date in pending:
+        expire_date = (expire_date.replace(second=0, microsecond=0) +
+                       datetime.timedelta(minutes=1))
+        by_date.setdefault(expire_date, []).append(session_key)
+    if not by_date:
+        return
+    using = router.db_for_write(Session)
+    for expire_date, session_keys in by_date.items():
+        # Keep the IN clause within the limits of every database.
+        for i in range(0, len(session_keys), 500):
+            Session.objects.using(using).filter(
+                session_key__in=session_keys[i:i + 500]
+            ).update(expire_date=expire_date)
+
+# Write what's left when the process exits, in case it stopped saving
+# sessions before the queue was due.
+atexit.register(flush_expiry_updates)
 
 class SessionStore(DBStore):
     """
@@ -16,22 +87,53 @@ class SessionStore(DBStore):
 
     def load(self):
         data = cache.get(self.session_key, None)
-        if data is None:
-            data = super(SessionStore, self).load()
-            cache.set(self.session_key, data, settings.SESSION_COOKIE_AGE)
+        if isinstance(data, tuple):
+            session_data, expire_date = data
+            if expire_date > datetime.datetime.now():
+                self._stored_expiry = expire_date
+                return self.decode(session_data)
+        # Not cached, expired, or cached by an older version.
+        data = super(SessionStore, self).load()
+        self._cache_stored()
         return data
 
+    def _cache_stored(self):
+        # The cache holds the expiry date too, since the one in the database
+        # may be behind in write-behind mode.
+        if self._stored_data is not None:
+            cache.set(self.session_key, (self._stored_data, self._stored_expiry),
+                      settings.SESSION_COOKIE_AGE)
+
     def exists(self, session_key):
         return super(SessionStore, self).exists(session_key)
 
     def save(self, must_create=False):
+        if (not must_create and settings.SESSION_EXPIRY_WRITE_BEHIND and
+                self._needs_expiry_refresh() and
+                self._data_unchanged(self._session)):
+            # Only the expiry date moves: update the cache now and the
+            # database later.
+            self._stored_expiry = self.get_expiry_date()
+            queue_expiry_update(self.session_key, self._stored_expiry)
+            self._cache_stored()
+            return
+        stored_data = self._stored_data
         super(SessionStore, self).save(must_create)
-        cache.set(self.session_key, self._session, settings.SESSION_COOKIE_AGE)
+        if self._stored_data is not stored_data:
+            # The database was written to.
+            self._cache_stored()
 
     def delete(self, session_key=None):
         super(SessionStore, self).delete(session_key)
         cache.delete(session_key or self.session_key)
 
+    def clear_expired(cls, batch_size=1000, pause=0):
+        # Write the expiry dates queued by this process first, so that its
+        # active sessions aren't deleted.
+        flush_expiry_updates()
+        return super(SessionStore, cls).clear_expired(batch_size, pause)
+    clear_expired = classmethod(clear_expired)
+
     def flush(self):
         """
         Removes the current session data from the database and regenerates the
@@ -39,4 +141,4 @@ class SessionStore(DBStore):
         """
         self.clear()
         self.delete(self.session_key)
-        self.create()
\ No newline at end of file
+        self.create()
@@ -1,9 +1,12 @@
 import datetime
+import time
 from django.conf import settings
 from django.contrib.sessions.models import Session
 from django.contrib.sessions.backends.base import SessionBase, CreateError
 from django.core.exceptions import SuspiciousOperation
 from django.db import IntegrityError, transaction, router
+from django.db.models.sql.subqueries import DeleteQuery
+from django.db.models.sql.where import AND, Constraint
 from django.utils.encoding import force_unicode
 
 class SessionStore(SessionBase):
@@ -19,6 +22,7 @@ class SessionStore(SessionBase):
                 session_key = self.session_key,
                 expire_date__gt=datetime.datetime.now()
             )
+            self._stored_expiry = s.expire_date
             return self.decode(force_unicode(s.session_data))
         except (Session.DoesNotExist, SuspiciousOperation):
             self.create()
@@ -52,9 +56,13 @@ class SessionStore(SessionBase):
         create a *new* entry (as opposed to possibly updating an existing
         entry).
         """
+        session_dict = self._get_session(no_load=must_create)
+        session_data = self._encode_for_save(session_dict, must_create)
+        if session_data is None:
+            return
         obj = Session(
             session_key = self.session_key,
-            session_data = self.encode(self._get_session(no_load=must_create)),
+            session_data = session_data,
             expire_date = self.get_expiry_date()
         )
         using = router.db_for_write(Session, instance=obj)
@@ -66,6 +74,8 @@ class SessionStore(SessionBase):
                 transaction.savepoint_rollback(sid, using=using)
                 raise CreateError
             raise
+        self._stored_data = session_data
+        self._stored_expiry = obj.expire_date
 
     def delete(self, session_key=None):
         if session_key is None:
@@ -76,3 +86,44 @@ class SessionStore(SessionBase):
             Session.objects.get(session_key=session_key).delete()
         except Session.DoesNotExist:
             pass
+
+    def clear_expired(cls, batch_size=1000, pause=0):
+        """
+        Deletes the expired sessions from the database, in transactions of at
+        most ``batch_size`` rows each, sleeping ``pause`` seconds between them
+        so that other queries get to run.
+
+        Each batch is a single DELETE over a range of primary keys, without
+        the related object collection Model.delete() does, since nothing
+        refers to sessions.
+        """
+        now = datetime.datetime.now()
+        using = router.db_for_write(Session)
+        expired = Session.objects.using(using).filter(expire_date__lt=now).order_by('pk')
+        pk_field = Session._meta.pk
+        expire_field = Session._meta.get_field('expire_date')
+        deleted = 0
+        last_key = None
+        while True:
+            batch = expired
+            if last_key is not None:
+                batch = batch.filter(pk__gt=last_key)
+            keys = list(batch.values_list('pk', flat=True)[:batch_size])
+            if not keys:
+                break
+            query = DeleteQuery(Session)
+            where = query.where_class()
+            where.add((Constraint(None, pk_field.column, pk_field), 'range',
+                       (keys[0], keys[-1])), AND)
+            where.add((Constraint(None, expire_field.column, expire_field), 'lt',
+                       now), AND)
+            query.do_query(Session._meta.db_table, where, using=using)
+            transaction.commit_unless_managed(using=using)
+            deleted += len(keys)
+            if len(keys) < batch_size:
+                break
+            last_key = keys[-1]
+            if pause:
+                time.sleep(pause)
+        return deleted
+    clear_expired = classmethod(clear_expired)
@@ -1,6 +1,8 @@
+import datetime
 import errno
 import os
 import tempfile
+import time
 
 from django.conf import settings
 from django.contrib.sessions.backends.base import SessionBase, CreateError
@@ -42,6 +44,18 @@ class SessionStore(SessionBase):
 
         return os.path.join(self.storage_path, self.file_prefix + session_key)
 
+    def _file_expiry(self, mtime, session_dict):
+        """
+        Returns when a session file last written at the given time expires.
+        The expiry isn't stored in the file: it counts from the last write.
+        """
+        expiry = session_dict.get('_session_expiry')
+        if isinstance(expiry, datetime.datetime):
+            return expiry
+        if not expiry:
+            expiry = settings.SESSION_COOKIE_AGE
+        return datetime.datetime.fromtimestamp(mtime) + datetime.timedelta(seconds=expiry)
+
     def load(self):
         session_data = {}
         try:
@@ -55,6 +69,10 @@ class SessionStore(SessionBase):
                         session_data = self.decode(file_data)
                     except (EOFError, SuspiciousOperation):
                         self.create()
+                    else:
+                        self._stored_expiry = self._file_expiry(
+                            os.fstat(session_file.fileno()).st_mtime,
+                            session_data)
             finally:
                 session_file.close()
         except IOError:
@@ -75,7 +93,10 @@ class SessionStore(SessionBase):
     def save(self, must_create=False):
         # Get the session data now, before we start messing
         # with the file it is stored within.
-        session_data = self._get_session(no_load=must_create)
+        session_dict = self._get_session(no_load=must_create)
+        session_data = self._encode_for_save(session_dict, must_create)
+        if session_data is None:
+            return
 
         session_file_name = self._key_to_file()
 
@@ -116,11 +137,13 @@ class SessionStore(SessionBase):
             renamed = False
             try:
                 try:
-                    os.write(output_file_fd, self.encode(session_data))
+                    os.write(output_file_fd, session_data)
                 finally:
                     os.close(output_file_fd)
                 os.rename(output_file_name, session_file_name)
                 renamed = True
+                self._stored_data = session_data
+                self._stored_expiry = self._file_expiry(time.time(), session_dict)
             finally:
                 if not renamed:
                     os.unlink(output_file_name)
@@ -145,3 +168,45 @@ class SessionStore(SessionBase):
 
     def clean(self):
         pass
+
+    def clear_expired(cls, batch_size=1000, pause=0):
+        """
+        Removes the expired session files, listing the storage directory only
+        once. The expiry of a file counts from its last modification, unless
+        the session has a custom expiry date.
+        """
+        store = cls()
+        prefix = store.file_prefix
+        now = datetime.datetime.now()
+        deleted = checked = 0
+        for file_name in os.listdir(store.storage_path):
+            # Skip other files, and the temporary ones save() writes to.
+            if not file_name.startswith(prefix) or '_out_' in file_name:
+                continue
+            path = os.path.join(store.storage_path, file_name)
+            try:
+                session_file = open(path, 'rb')
+                try:
+                    mtime = os.fstat(session_file.fileno()).st_mtime
+                    file_data = session_file.read()
+                finally:
+                    session_file.close()
+            except (IOError, OSError):
+                # Deleted or replaced by another process meanwhile.
+                continue
+            session_dict = {}
+            if file_data:
+                session_dict = store.decode(file_data)
+            if store._file_expiry(mtime, session_dict) < now:
+                try:
+                    # Don't delete a session that was saved in the meantime.
+                    if os.stat(path).st_mtime == mtime:
+                        os.unlink(path)
+                        deleted += 1
+                except OSError:
+                    pass
+            checked += 1
+            if pause and checked % batch_size == 0:
+                time.sleep(pause)
+        return deleted
+    clear_expired = classmethod(clear_expired)
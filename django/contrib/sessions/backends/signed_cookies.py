@@ -0,0 +1,124 @@
+"""
+Sessions stored entirely in a signed cookie, with no server-side storage.
+
+The session data is serialized with the SESSION_SERIALIZER, compressed when
+that makes it smaller, and signed with the SECRET_KEY. The data isn't
+encrypted: the client can read it, but can't change it.
+"""
+import base64
+import time
+import zlib
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.sessions.backends.base import SessionBase
+from django.contrib.sessions.serializers import get_serializer
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import base36_to_int, int_to_base36
+
+class SessionCookieTooLarge(Exception):
+    """
+    Raised when the signed session data doesn't fit in a cookie. Browsers
+    silently drop cookies larger than about 4KB, which would lose the session.
+    """
+    pass
+
+class SessionStore(SessionBase):
+    """
+    Implements a session store that keeps the data in the session cookie
+    itself: the "session key" is the signed session data.
+    """
+    # The largest cookie value browsers are known to accept.
+    max_cookie_size = 4093
+
+    def _hash(self, value):
+        return salted_hmac("django.contrib.sessions.backends.signed_cookies",
+                           value).hexdigest()
+
+    def _encode_cookie(self, session_dict):
+        """
+        Returns the session dictionary serialized, possibly compressed and
+        signed as a cookie-safe string: "<data>:<timestamp>:<signature>".
+        """
+        data = get_serializer().dumps(session_dict)
+        compressed = zlib.compress(data)
+        # A leading dot marks compressed data.
+        if len(compressed) < len(data) - 1:
+            data = '.' + compressed
+        value = '%s:%s' % (base64.urlsafe_b64encode(data).rstrip('='),
+                           int_to_base36(int(time.time())))
+        cookie = '%s:%s' % (value, self._hash(value))
+        if len(cookie) > self.max_cookie_size:
+            raise SessionCookieTooLarge(
+                "The signed session data is %d bytes long, more than a cookie"
+                " can hold (%d bytes)." % (len(cookie), self.max_cookie_size))
+        return cookie
+
+    def _decode_cookie(self, cookie):
+        """
+        Returns the session dictionary stored in the given cookie value, or
+        raises ValueError if it is invalid, tampered with or expired.
+        """
+        try:
+            value, signature = cookie.rsplit(':', 1)
+            encoded, timestamp = value.split(':', 1)
+        except (AttributeError, ValueError):
+            raise ValueError("Malformed session cookie.")
+        if not constant_time_compare(signature, self._hash(value)):
+            raise ValueError("Session cookie signature mismatch.")
+        data = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4))
+        if data[:1] == '.':
+            data = zlib.decompress(data[1:])
+        session_dict = get_serializer().loads(data)
+        if self._is_expired(session_dict, base36_to_int(timestamp)):
+            raise ValueError("Session cookie expired.")
+        return session_dict
+
+    def _is_expired(self, session_dict, timestamp):
+        # There is no server-side record to delete, so expiry must be
+        # enforced when the cookie comes back.
+        expiry = session_dict.get('_session_expiry')
+        if isinstance(expiry, datetime):
+            return expiry < datetime.now()
+        if not expiry:
+            expiry = settings.SESSION_COOKIE_AGE
+        return time.time() - timestamp > expiry
+
+    def load(self):
+        try:
+            return self._decode_cookie(self.session_key)
+        except Exception:
+            # Bad signatures, expired cookies, decoding and unserializing
+            # errors all result in a new, empty session.
+            self.create()
+            return {}
+
+    def _get_new_session_key(self):
+        return self._encode_cookie(getattr(self, '_session_cache', {}))
+
+    def exists(self, session_key):
+        # A signed cookie can't be looked up, so it can't collide either.
+        return False
+
+    def create(self):
+        self._session_key = None
+        self.modified = True
+
+    def save(self, must_create=False):
+        self._session_key = self._encode_cookie(self._get_session(no_load=must_create))
+        self.modified = True
+
+    def delete(self, session_key=None):
+        # Previously signed cookies can't be revoked; they will expire.
+        self._session_key = None
+        self._session_cache = {}
+        self.modified = True
+
+    def cycle_key(self):
+        # The key changes with the data, so there is nothing to rotate.
+        self.save()
+
+    def clear_expired(cls, batch_size=1000, pause=0):
+        # Nothing is stored on the server.
+        return 0
+    clear_expired = classmethod(clear_expired)
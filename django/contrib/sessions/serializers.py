@@ -0,0 +1,88 @@
+"""
+Serializers turning a session dictionary into a string and back.
+
+A serializer is any class with ``dumps(obj)`` and ``loads(data)`` methods. The
+one used by the session backends is chosen with the SESSION_SERIALIZER
+setting. Equal dictionaries should serialize to the same string, since the
+backends skip saving a session whose data serializes to what is stored.
+"""
+from datetime import datetime
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+try:
+    from cStringIO import StringIO
+except ImportError:
+    from StringIO import StringIO
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import simplejson
+from django.utils.importlib import import_module
+
+class PickleSerializer(object):
+    """
+    Serializes any picklable object. Only safe as long as the serialized data
+    is signed, since unpickling attacker-controlled data can execute code.
+    """
+    def dumps(self, obj):
+        # Without the memo, the output no longer depends on how many
+        # references to each object happen to exist.
+        output = StringIO()
+        pickler = pickle.Pickler(output, pickle.HIGHEST_PROTOCOL)
+        pickler.fast = 1
+        try:
+            pickler.dump(obj)
+        except ValueError:
+            # The memo is needed for cyclic objects.
+            return pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+        return output.getvalue()
+
+    def loads(self, data):
+        return pickle.loads(data)
+
+def _json_default(obj):
+    if isinstance(obj, datetime):
+        # Session expiry dates must survive a round trip.
+        return {'__datetime__': [obj.year, obj.month, obj.day, obj.hour,
+                                 obj.minute, obj.second, obj.microsecond]}
+    raise TypeError("%r is not JSON serializable" % obj)
+
+def _json_object_hook(obj):
+    if len(obj) == 1 and '__datetime__' in obj:
+        return datetime(*obj['__datetime__'])
+    return obj
+
+class JSONSerializer(object):
+    """
+    Serializes the basic JSON types, plus datetimes. Strings come back as
+    unicode and tuples as lists.
+    """
+    def dumps(self, obj):
+        return simplejson.dumps(obj, separators=(',', ':'), sort_keys=True,
+                                default=_json_default)
+
+    def loads(self, data):
+        return simplejson.loads(data, object_hook=_json_object_hook)
+
+_serializers = {}
+
+def get_serializer(import_path=None):
+    """
+    Returns an instance of the serializer class at the given import path,
+    which defaults to the SESSION_SERIALIZER setting.
+    """
+    if import_path is None:
+        import_path = settings.SESSION_SERIALIZER
+    try:
+        return _serializers[import_path]
+    except KeyError:
+        pass
+    try:
+        module_name, class_name = import_path.rsplit('.', 1)
+        serializer_class = getattr(import_module(module_name), class_name)
+    except (ValueError, ImportError, AttributeError), e:
+        raise ImproperlyConfigured('Error importing session serializer %s: "%s"' % (import_path, e))
+    serializer = _serializers[import_path] = serializer_class()
+    return serializer
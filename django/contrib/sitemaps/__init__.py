@@ -40,6 +40,9 @@ class Sitemap(object):
     # http://sitemaps.org/protocol.php#index.
     limit = 50000
 
+    # Set to KeysetPaginator for constant-time deep pages on big querysets.
+    paginator_class = paginator.Paginator
+
     def __get(self, name, obj, default=None):
         try:
             attr = getattr(self, name)
@@ -57,7 +60,7 @@ class Sitemap(object):
 
     def _get_paginator(self):
         if not hasattr(self, "_paginator"):
-            self._paginator = paginator.Paginator(self.items(), self.limit)
+            self._paginator = self.paginator_class(self.items(), self.limit)
         return self._paginator
     paginator = property(_get_paginator)
 
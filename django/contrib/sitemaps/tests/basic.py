@@ -1,3 +1,4 @@
+import re
 from datetime import date
 from django.conf import settings
 from django.contrib.auth.models import User
@@ -124,3 +125,20 @@ class SitemapTests(TestCase):
         Site.objects.get_current()
         Site._meta.installed = False
         self.assertRaises(ImproperlyConfigured, Sitemap().get_urls)
+
+    def test_keyset_sitemap(self):
+        "Sitemap pages can be seeked with cursors"
+        for username in ('alice', 'bob', 'carol', 'dave'):
+            User.objects.create_user(username, '%s@example.com' % username, 's3krit')
+        response = self.client.get('/keyset/index.xml')
+        pages = re.findall('<loc>http://example.com(.*?)</loc>', response.content)
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(pages[0], '/keyset/sitemap-users.xml')
+        locations = []
+        for page in pages:
+            response = self.client.get(page)
+            self.assertEqual(response.status_code, 200)
+            locations.extend(re.findall('<loc>http://example.com/users/(.*?)/</loc>', response.content))
+        self.assertEqual(locations, ['alice', 'bob', 'carol', 'dave', 'testuser'])
+        response = self.client.get('/keyset/sitemap-users.xml?p=frog')
+        self.assertEqual(response.status_code, 404)
@@ -2,6 +2,7 @@ from datetime import datetime
 from django.conf.urls.defaults import *
 from django.contrib.sitemaps import Sitemap, GenericSitemap, FlatPageSitemap
 from django.contrib.auth.models import User
+from django.core.paginator import KeysetPaginator
 
 class SimpleSitemap(Sitemap):
     changefreq = "never"
@@ -22,6 +23,20 @@ generic_sitemaps = {
     }),
 }
 
+class KeysetSitemap(Sitemap):
+    limit = 2
+    paginator_class = KeysetPaginator
+
+    def items(self):
+        return User.objects.order_by('username')
+
+    def location(self, obj):
+        return '/users/%s/' % obj.username
+
+keyset_sitemaps = {
+    'users': KeysetSitemap,
+}
+
 flatpage_sitemaps = {
     'flatpages': FlatPageSitemap,
 }
@@ -30,4 +45,6 @@ urlpatterns = patterns('django.contrib.sitemaps.views',
     (r'^simple/sitemap\.xml$', 'sitemap', {'sitemaps': simple_sitemaps}),
     (r'^generic/sitemap\.xml$', 'sitemap', {'sitemaps': generic_sitemaps}),
     (r'^flatpages/sitemap\.xml$', 'sitemap', {'sitemaps': flatpage_sitemaps}),
+    (r'^keyset/index\.xml$', 'index', {'sitemaps': keyset_sitemaps}),
+    (r'^keyset/sitemap-(?P<section>.+)\.xml$', 'sitemap', {'sitemaps': keyset_sitemaps}),
 )
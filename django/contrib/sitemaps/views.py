@@ -3,7 +3,8 @@ from django.template import loader
 from django.contrib.sites.models import get_current_site
 from django.core import urlresolvers
 from django.utils.encoding import smart_str
-from django.core.paginator import EmptyPage, PageNotAnInteger
+from django.core.paginator import EmptyPage, PageNotAnInteger, InvalidPage, KeysetPaginator
+from itertools import islice
 
 def index(request, sitemaps):
     current_site = get_current_site(request)
@@ -12,13 +13,17 @@ def index(request, sitemaps):
     for section, site in sitemaps.items():
         site.request = request
         if callable(site):
-            pages = site().paginator.num_pages
+            paginator = site().paginator
         else:
-            pages = site.paginator.num_pages
+            paginator = site.paginator
         sitemap_url = urlresolvers.reverse('django.contrib.sitemaps.views.sitemap', kwargs={'section': section})
         sites.append('%s://%s%s' % (protocol, current_site.domain, sitemap_url))
-        if pages > 1:
-            for page in range(2, pages+1):
+        if isinstance(paginator, KeysetPaginator):
+            # Pages are identified by cursors rather than numbers.
+            for cursor in islice(paginator.page_cursors(), 1, None):
+                sites.append('%s://%s%s?p=%s' % (protocol, current_site.domain, sitemap_url, cursor))
+        elif paginator.num_pages > 1:
+            for page in range(2, paginator.num_pages+1):
                 sites.append('%s://%s%s?p=%s' % (protocol, current_site.domain, sitemap_url, page))
     xml = loader.render_to_string('sitemap_index.xml', {'sitemaps': sites})
     return HttpResponse(xml, mimetype='application/xml')
@@ -43,5 +48,7 @@ def sitemap(request, sitemaps, section=None):
             raise Http404("Page %s empty" % page)
         except PageNotAnInteger:
             raise Http404("No page '%s'" % page)
+        except InvalidPage:
+            raise Http404("Invalid page '%s'" % page)
     xml = smart_str(loader.render_to_string('sitemap.xml', {'urlset': urls}))
     return HttpResponse(xml, mimetype='application/xml')
@@ -0,0 +1,20 @@
+from django.contrib.sites.models import Site, RequestSite
+
+
+class CurrentSiteMiddleware(object):
+    """
+    Sets ``request.site`` to the ``Site`` whose domain matches the host of
+    the request, or to the ``SITE_ID`` site if there is none.
+
+    If the sites framework isn't installed, ``request.site`` is a
+    ``RequestSite``.
+    """
+    def process_request(self, request):
+        if Site._meta.installed:
+            try:
+                request.site = Site.objects.get_by_host(request.get_host())
+            except Site.DoesNotExist:
+                request.site = Site.objects.get_current()
+        else:
+            request.site = RequestSite(request)
+        return None
@@ -3,6 +3,12 @@ from django.utils.translation import ugettext_lazy as _
 
 
 SITE_CACHE = {}
+SITE_HOST_CACHE = {}
+# Cached in SITE_HOST_CACHE for hosts that don't match any site.
+NO_SITE = object()
+# The number of unknown hosts that are cached. Any client can make up hosts,
+# so they're forgotten, all at once, past this limit.
+MAX_CACHED_UNKNOWN_HOSTS = 1000
 
 
 class SiteManager(models.Manager):
@@ -26,10 +32,58 @@ class SiteManager(models.Manager):
             SITE_CACHE[sid] = current_site
         return current_site
 
+    def get_by_host(self, host):
+        """
+        Returns the ``Site`` whose domain matches the given host, with or
+        without its port. All the ``Site`` objects are cached by domain the
+        first time this is called; when several share a domain, the one with
+        the lowest id is returned. Hosts that don't match any site are cached
+        too.
+        """
+        hosts = [host.lower()]
+        if ':' in host:
+            hosts.append(hosts[0].rsplit(':', 1)[0])
+        if not SITE_HOST_CACHE:
+            self._cache_by_domain(self.all())
+        site = self._get_cached(hosts)
+        if site is not None:
+            return site
+        if SITE_HOST_CACHE.get(hosts[0]) is not NO_SITE:
+            # The site may have been added by another process.
+            query = models.Q(domain__iexact=hosts[0])
+            for host in hosts[1:]:
+                query |= models.Q(domain__iexact=host)
+            self._cache_by_domain(self.filter(query))
+            site = self._get_cached(hosts)
+            if site is not None:
+                return site
+            self._cache_unknown_host(hosts[0])
+        raise self.model.DoesNotExist("No site matches the host %r." % hosts[0])
+
+    def _get_cached(self, hosts):
+        for host in hosts:
+            site = SITE_HOST_CACHE.get(host, NO_SITE)
+            if site is not NO_SITE:
+                return site
+        return None
+
+    def _cache_by_domain(self, sites):
+        for site in sites.order_by('pk'):
+            if SITE_HOST_CACHE.get(site.domain.lower(), NO_SITE) is NO_SITE:
+                SITE_HOST_CACHE[site.domain.lower()] = site
+
+    def _cache_unknown_host(self, host):
+        unknown = [key for key, site in SITE_HOST_CACHE.items() if site is NO_SITE]
+        if len(unknown) >= MAX_CACHED_UNKNOWN_HOSTS:
+            for key in unknown:
+                del SITE_HOST_CACHE[key]
+        SITE_HOST_CACHE[host] = NO_SITE
+
     def clear_cache(self):
         """Clears the ``Site`` object cache."""
-        global SITE_CACHE
+        global SITE_CACHE, SITE_HOST_CACHE
         SITE_CACHE = {}
+        SITE_HOST_CACHE = {}
 
 
 class Site(models.Model):
@@ -52,6 +106,8 @@ class Site(models.Model):
         # Cached information will likely be incorrect now.
         if self.id in SITE_CACHE:
             del SITE_CACHE[self.id]
+        # The domain may have changed, or match a host that was unknown.
+        SITE_HOST_CACHE.clear()
 
     def delete(self):
         pk = self.pk
@@ -60,6 +116,7 @@ class Site(models.Model):
             del SITE_CACHE[pk]
         except KeyError:
             pass
+        SITE_HOST_CACHE.clear()
 
 
 class RequestSite(object):
@@ -87,8 +144,13 @@ def get_current_site(request):
     """
     Checks if contrib.sites is installed and returns either the current
     ``Site`` object or a ``RequestSite`` object based on the request.
+
+    If ``CurrentSiteMiddleware`` is installed, the site it found for the
+    host of the request is returned.
     """
-    if Site._meta.installed:
+    if hasattr(request, 'site'):
+        current_site = request.site
+    elif Site._meta.installed:
         current_site = Site.objects.get_current()
     else:
         current_site = RequestSite(request)
@@ -1,4 +1,6 @@
 from django.conf import settings
+from django.contrib.sites import models
+from django.contrib.sites.middleware import CurrentSiteMiddleware
 from django.contrib.sites.models import Site, RequestSite, get_current_site
 from django.core.exceptions import ObjectDoesNotExist
 from django.http import HttpRequest
@@ -11,9 +13,11 @@ class SitesFrameworkTests(TestCase):
         Site(id=settings.SITE_ID, domain="example.com", name="example.com").save()
         self.old_Site_meta_installed = Site._meta.installed
         Site._meta.installed = True
+        Site.objects.clear_cache()
 
     def tearDown(self):
         Site._meta.installed = self.old_Site_meta_installed
+        Site.objects.clear_cache()
 
     def test_site_manager(self):
         # Make sure that get_current() does not return a deleted Site object.
@@ -54,3 +58,78 @@ class SitesFrameworkTests(TestCase):
         site = get_current_site(request)
         self.assert_(isinstance(site, RequestSite))
         self.assertEqual(site.name, u"example.com")
+
+    def test_get_by_host(self):
+        other = Site.objects.create(domain="other.example.com", name="Other")
+        self.assertEqual(Site.objects.get_by_host("Other.Example.com"), other)
+        # The port is ignored unless a domain includes it.
+        self.assertNumQueries(0, Site.objects.get_by_host, "other.example.com")
+        self.assertEqual(Site.objects.get_by_host("other.example.com:8000"), other)
+        local = Site.objects.create(domain="localhost:8000", name="Local")
+        self.assertEqual(Site.objects.get_by_host("localhost:8000"), local)
+        self.assertRaises(ObjectDoesNotExist, Site.objects.get_by_host, "localhost")
+        # Domains are cached, and so are unknown hosts, but not the known
+        # hosts with a port.
+        Site.objects.get_by_host("other.example.com:8001")
+        Site.objects.get_by_host("other.example.com:8002")
+        self.assertRaises(ObjectDoesNotExist, Site.objects.get_by_host, "unknown.example.com")
+        self.assertEqual(sorted(models.SITE_HOST_CACHE.keys()),
+                         ["example.com", "localhost", "localhost:8000",
+                          "other.example.com", "unknown.example.com"])
+        self.assertNumQueries(0, self.assertRaises, ObjectDoesNotExist,
+                              Site.objects.get_by_host, "unknown.example.com")
+        # The port of a host is still ignored when the host without it is
+        # unknown.
+        self.assertRaises(ObjectDoesNotExist, Site.objects.get_by_host, "unknown.example.com:80")
+        # Saving a Site forgets the unknown hosts.
+        unknown = Site.objects.create(domain="unknown.example.com", name="Unknown")
+        self.assertEqual(Site.objects.get_by_host("unknown.example.com"), unknown)
+        unknown.delete()
+
+        # Past the limit, the unknown hosts are forgotten.
+        old_max = models.MAX_CACHED_UNKNOWN_HOSTS
+        models.MAX_CACHED_UNKNOWN_HOSTS = 2
+        try:
+            for host in ("a.example.com", "b.example.com", "c.example.com"):
+                self.assertRaises(ObjectDoesNotExist, Site.objects.get_by_host, host)
+        finally:
+            models.MAX_CACHED_UNKNOWN_HOSTS = old_max
+        self.assertEqual(sorted(models.SITE_HOST_CACHE.keys()),
+                         ["c.example.com", "example.com", "localhost:8000",
+                          "other.example.com"])
+
+        # Sites sharing a domain don't make the lookup fail.
+        duplicate = Site.objects.create(domain="Other.example.com", name="Duplicate")
+        self.assertEqual(Site.objects.get_by_host("other.example.com"), other)
+        duplicate.delete()
+
+        # Saving or deleting a Site invalidates the cache.
+        Site.objects.get_by_host("other.example.com")
+        other.domain = "renamed.example.com"
+        other.save()
+        self.assertRaises(ObjectDoesNotExist, Site.objects.get_by_host, "other.example.com")
+        self.assertEqual(Site.objects.get_by_host("renamed.example.com").name, "Other")
+        other.delete()
+        self.assertRaises(ObjectDoesNotExist, Site.objects.get_by_host, "renamed.example.com")
+
+    def test_current_site_middleware(self):
+        other = Site.objects.create(domain="other.example.com", name="Other")
+        request = HttpRequest()
+        request.META = {"SERVER_NAME": "other.example.com", "SERVER_PORT": "80"}
+        CurrentSiteMiddleware().process_request(request)
+        self.assertEqual(request.site, other)
+        self.assertNumQueries(0, get_current_site, request)
+        self.assertEqual(get_current_site(request), other)
+
+        # Unknown hosts get the SITE_ID site.
+        request = HttpRequest()
+        request.META = {"SERVER_NAME": "unknown.example.com", "SERVER_PORT": "80"}
+        CurrentSiteMiddleware().process_request(request)
+        self.assertEqual(request.site.id, settings.SITE_ID)
+
+        Site._meta.installed = False
+        request = HttpRequest()
+        request.META = {"SERVER_NAME": "other.example.com", "SERVER_PORT": "80"}
+        CurrentSiteMiddleware().process_request(request)
+        self.assert_(isinstance(request.site, RequestSite))
+        self.assertEqual(get_current_site(request).domain, u"other.example.com")
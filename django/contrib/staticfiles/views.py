@@ -15,12 +15,16 @@ from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 from django.http import Http404, HttpResponse, HttpResponseRedirect, HttpResponseNotModified
 from django.template import loader, Template, Context, TemplateDoesNotExist
+from django.utils.cache import patch_vary_headers
 from django.utils.http import http_date
 
 from django.contrib.staticfiles import finders
 
 
-def serve(request, path, document_root=None, show_indexes=False):
+re_accepts_gzip = re.compile(r'\bgzip\b')
+
+def serve(request, path, document_root=None, show_indexes=False,
+          precompressed=False):
     """
     Serve static files below a given point in the directory structure or
     from locations inferred from the static files finders.
@@ -40,6 +44,11 @@ def serve(request, path, document_root=None, show_indexes=False):
     basic index of the directory.  This index view will use the
     template hardcoded below, but if you'd like to override it, you can create
     a template called ``static/directory_index.html``.
+
+    If ``precompressed`` is ``True`` and the browser accepts gzip, a
+    ``<path>.gz`` file next to the requested one is served in its place with
+    a ``Content-Encoding: gzip`` header, so the response doesn't have to be
+    compressed on every request.
     """
     if not settings.DEBUG:
         raise ImproperlyConfigured("The view to serve static files can only "
@@ -72,19 +81,31 @@ def serve(request, path, document_root=None, show_indexes=False):
         raise Http404("Directory indexes are not allowed here.")
     if not os.path.exists(fullpath):
         raise Http404('"%s" does not exist' % fullpath)
-    # Respect the If-Modified-Since header.
-    statobj = os.stat(fullpath)
     mimetype, encoding = mimetypes.guess_type(fullpath)
     mimetype = mimetype or 'application/octet-stream'
+    vary = False
+    if precompressed and not encoding:
+        # Every response for this path depends on Accept-Encoding, whether or
+        # not the compressed variant is actually served.
+        vary = True
+        if (re_accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+                and os.path.isfile(fullpath + '.gz')):
+            fullpath = fullpath + '.gz'
+            encoding = 'gzip'
+    # Respect the If-Modified-Since header.
+    statobj = os.stat(fullpath)
     if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'),
                               statobj[stat.ST_MTIME], statobj[stat.ST_SIZE]):
-        return HttpResponseNotModified(mimetype=mimetype)
-    contents = open(fullpath, 'rb').read()
-    response = HttpResponse(contents, mimetype=mimetype)
-    response["Last-Modified"] = http_date(statobj[stat.ST_MTIME])
-    response["Content-Length"] = len(contents)
-    if encoding:
-        response["Content-Encoding"] = encoding
+        response = HttpResponseNotModified(mimetype=mimetype)
+    else:
+        contents = open(fullpath, 'rb').read()
+        response = HttpResponse(contents, mimetype=mimetype)
+        response["Last-Modified"] = http_date(statobj[stat.ST_MTIME])
+        response["Content-Length"] = len(contents)
+        if encoding:
+            response["Content-Encoding"] = encoding
+    if vary:
+        patch_vary_headers(response, ('Accept-Encoding',))
     return response
 
 
@@ -1,4 +1,5 @@
 import sys
+import time
 
 from django import http
 from django.core import signals
@@ -7,6 +8,7 @@ from django.utils.importlib import import_module
 from django.utils.log import getLogger
 
 logger = getLogger('django.request')
+timing_logger = getLogger('django.middleware')
 
 
 class BaseHandler(object):
@@ -20,6 +22,7 @@ class BaseHandler(object):
 
     def __init__(self):
         self._request_middleware = self._view_middleware = self._response_middleware = self._exception_middleware = None
+        self._middleware_timing = False
 
     def load_middleware(self):
         """
@@ -32,6 +35,7 @@ class BaseHandler(object):
         self._view_middleware = []
         self._response_middleware = []
         self._exception_middleware = []
+        self._middleware_timing = settings.MIDDLEWARE_TIMING
 
         request_middleware = []
         for middleware_path in settings.MIDDLEWARE_CLASSES:
@@ -55,18 +59,36 @@ class BaseHandler(object):
                 continue
 
             if hasattr(mw_instance, 'process_request'):
-                request_middleware.append(mw_instance.process_request)
+                request_middleware.append(self._instrument(middleware_path, mw_instance.process_request))
             if hasattr(mw_instance, 'process_view'):
-                self._view_middleware.append(mw_instance.process_view)
+                self._view_middleware.append(self._instrument(middleware_path, mw_instance.process_view))
             if hasattr(mw_instance, 'process_response'):
-                self._response_middleware.insert(0, mw_instance.process_response)
+                self._response_middleware.insert(0, self._instrument(middleware_path, mw_instance.process_response))
             if hasattr(mw_instance, 'process_exception'):
-                self._exception_middleware.insert(0, mw_instance.process_exception)
+                self._exception_middleware.insert(0, self._instrument(middleware_path, mw_instance.process_exception))
 
         # We only assign to this when initialization is complete as it is used
         # as a flag for initialization being complete.
         self._request_middleware = request_middleware
 
+    def _instrument(self, middleware_path, method):
+        """
+        Wraps a middleware method so that its running time is recorded on the
+        request, if settings.MIDDLEWARE_TIMING is enabled. Otherwise returns
+        the method unchanged, so there is no overhead.
+        """
+        if not self._middleware_timing:
+            return method
+        name = '%s.%s' % (middleware_path, method.__name__)
+        def timed(request, *args):
+            start = time.time()
+            try:
+                return method(request, *args)
+            finally:
+                timings = request.__dict__.setdefault('middleware_timings', [])
+                timings.append((name, time.time() - start))
+        return timed
+
     def get_response(self, request):
         "Returns an HttpResponse object for the given HttpRequest"
         from django.core import exceptions, urlresolvers
@@ -192,6 +214,24 @@ class BaseHandler(object):
         callback, param_dict = resolver.resolve500()
         return callback(request, **param_dict)
 
+    def apply_response_middleware(self, request, response):
+        """
+        Runs the response through every response middleware, in reverse order
+        of MIDDLEWARE_CLASSES. Returns the new response.
+        """
+        for middleware_method in self._response_middleware:
+            response = middleware_method(request, response)
+        if self._middleware_timing:
+            timings = request.__dict__.get('middleware_timings', [])
+            timing_logger.debug('Middleware timings for %s: %s' % (request.path,
+                    ', '.join(['%s %.3fms' % (name, elapsed * 1000)
+                               for name, elapsed in timings])),
+                extra={
+                    'request': request,
+                    'timings': timings,
+                })
+        return response
+
     def apply_response_fixes(self, request, response):
         """
         Applies each of the functions in self.response_fixes to the request and
@@ -136,7 +136,7 @@ class WSGIRequest(http.HttpRequest):
     def _load_post_and_files(self):
         # Populates self._post and self._files
         if self.method == 'POST':
-            if self.environ.get('CONTENT_TYPE', '').startswith('multipart'):
+            if self.content_type.startswith('multipart'):
                 self._raw_post_data = ''
                 try:
                     self._post, self._files = self.parse_file_upload(self.META, self.environ['wsgi.input'])
@@ -252,9 +252,8 @@ class WSGIHandler(base.BaseHandler):
             else:
                 response = self.get_response(request)
 
-                # Apply response middleware
-                for middleware_method in self._response_middleware:
-                    response = middleware_method(request, response)
+                # Apply response middleware.
+                response = self.apply_response_middleware(request, response)
                 response = self.apply_response_fixes(request, response)
         finally:
             signals.request_finished.send(sender=self.__class__)
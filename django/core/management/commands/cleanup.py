@@ -1,11 +1,27 @@
-import datetime
+from optparse import make_option
+
 from django.core.management.base import NoArgsCommand
 
 class Command(NoArgsCommand):
+    option_list = NoArgsCommand.option_list + (
+        make_option('--batch-size', action='store', dest='batch_size', type='int', default=1000,
+            help='The number of expired sessions to remove at a time. Defaults to 1000.'),
+        make_option('--pause', action='store', dest='pause', type='float', default=0,
+            help='Seconds to sleep between batches, to let other queries run. Defaults to 0.'),
+    )
     help = "Can be run as a cronjob or directly to clean out old data from the database (only expired sessions at the moment)."
 
     def handle_noargs(self, **options):
-        from django.db import transaction
-        from django.contrib.sessions.models import Session
-        Session.objects.filter(expire_date__lt=datetime.datetime.now()).delete()
-        transaction.commit_unless_managed()
+        from django.conf import settings
+        from django.utils.importlib import import_module
+        engine = import_module(settings.SESSION_ENGINE)
+        try:
+            deleted = engine.SessionStore.clear_expired(
+                batch_size=options.get('batch_size', 1000),
+                pause=options.get('pause', 0))
+        except NotImplementedError:
+            self.stderr.write("Session engine '%s' doesn't support clearing "
+                              "expired sessions.\n" % settings.SESSION_ENGINE)
+        else:
+            if int(options.get('verbosity', 1)) >= 2:
+                self.stdout.write("Removed %d expired sessions.\n" % deleted)
@@ -0,0 +1,55 @@
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+
+class Command(BaseCommand):
+    help = ("Displays the profile stats collected by ProfileMiddleware, "
+            "aggregated per view.")
+    args = "[view name ...]"
+
+    option_list = BaseCommand.option_list + (
+        make_option('--sort', action='store', dest='sort', default='cumulative',
+            help='The pstats sort key used to order functions. Defaults to "cumulative".'),
+        make_option('--limit', action='store', dest='limit', type='int', default=25,
+            help='The number of functions displayed for each view. Defaults to 25.'),
+        make_option('--clear', action='store_true', dest='clear', default=False,
+            help='Deletes the collected stats instead of displaying them.'),
+        make_option('--token', action='store', dest='token', default=None,
+            help='Prints the X-Django-Profile header value that forces '
+                 'requests for the given path to be profiled.'),
+    )
+
+    requires_model_validation = False
+
+    def handle(self, *view_names, **options):
+        from django.middleware.profile import (clear_stats, get_profile_token,
+            get_stats_dir, load_stats)
+
+        if options.get('token'):
+            self.stdout.write('X-Django-Profile: %s\n' % get_profile_token(options['token']))
+            return
+
+        stats_dir = get_stats_dir()
+        if options.get('clear'):
+            clear_stats(stats_dir)
+            return
+
+        all_stats = load_stats(stats_dir)
+        if view_names:
+            missing = [name for name in view_names if name not in all_stats]
+            if missing:
+                raise CommandError("No profile stats for: %s" % ', '.join(missing))
+        else:
+            view_names = sorted(all_stats.keys(),
+                                key=lambda name: all_stats[name].total_tt,
+                                reverse=True)
+        if not view_names:
+            self.stdout.write("No profile stats in %s.\n" % stats_dir)
+            return
+
+        for view_name in view_names:
+            stats = all_stats[view_name]
+            self.stdout.write("%s (%.3fs total)\n" % (view_name, stats.total_tt))
+            stats.stream = self.stdout
+            stats.sort_stats(options.get('sort'))
+            stats.print_stats(options.get('limit'))
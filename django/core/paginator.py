@@ -1,3 +1,4 @@
+import base64
 from math import ceil
 
 class InvalidPage(Exception):
@@ -9,6 +10,9 @@ class PageNotAnInteger(InvalidPage):
 class EmptyPage(InvalidPage):
     pass
 
+class InvalidCursor(InvalidPage):
+    pass
+
 class Paginator(object):
     def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True):
         self.object_list = object_list
@@ -75,6 +79,280 @@ class Paginator(object):
 
 QuerySetPaginator = Paginator # For backwards-compatibility.
 
+class EstimatedCountPaginator(Paginator):
+    """
+    A paginator that trusts the database's estimate of the number of rows of
+    a table rather than counting them, when paginating an unfiltered QuerySet
+    whose estimate is at least ``estimate_threshold``. Counting all the rows
+    of a big table can take seconds, but the count, the number of pages and
+    the end of the last page are only approximate then; ``is_estimate`` tells
+    whether they are.
+    """
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True,
+                 estimate_threshold=100000):
+        super(EstimatedCountPaginator, self).__init__(object_list, per_page, orphans,
+                                                      allow_empty_first_page)
+        self.estimate_threshold = estimate_threshold
+        self.is_estimate = False
+
+    def get_estimate(self):
+        """
+        Returns the database's estimate of the number of objects, or None if
+        it has none or the objects can't be estimated from a table's
+        statistics.
+        """
+        query = getattr(self.object_list, 'query', None)
+        if (query is None or query.where or query.having or query.distinct or
+                query.low_mark or query.high_mark is not None or query.extra_tables):
+            return None
+        from django.db import connections
+        connection = connections[self.object_list.db]
+        sql = connection.ops.estimated_count_sql(query.model._meta.db_table)
+        if sql is None:
+            return None
+        cursor = connection.cursor()
+        cursor.execute(*sql)
+        row = cursor.fetchone()
+        if row is None or row[0] is None or row[0] < 0:
+            return None
+        return int(row[0])
+
+    def _get_count(self):
+        "Returns the total number of objects, across all pages."
+        if self._count is None:
+            estimate = self.get_estimate()
+            if estimate is not None and estimate >= self.estimate_threshold:
+                self._count = estimate
+                self.is_estimate = True
+        return super(EstimatedCountPaginator, self)._get_count()
+    count = property(_get_count)
+
+class UncountedPaginator(Paginator):
+    """
+    A paginator that never counts the objects. Each page fetches the objects
+    that follow it too (one, plus ``orphans``) to find out whether there is a
+    next page. ``count``, ``num_pages`` and ``page_range`` are None.
+    """
+    count = num_pages = page_range = None
+
+    def validate_number(self, number):
+        "Validates the given 1-based page number."
+        try:
+            number = int(number)
+        except ValueError:
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        "Returns a Page object for the given 1-based page number."
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        objects = list(self.object_list[bottom:top + self.orphans + 1])
+        if not objects and (number > 1 or not self.allow_empty_first_page):
+            raise EmptyPage('That page contains no results')
+        has_next = len(objects) > self.per_page + self.orphans
+        if has_next:
+            top = bottom + self.per_page
+            objects = objects[:self.per_page]
+        else:
+            top = bottom + len(objects)
+        object_list = self.object_list[bottom:top]
+        if hasattr(object_list, '_result_cache'):
+            # Keep the page a QuerySet, but don't run its query again.
+            object_list._result_cache = objects
+        else:
+            object_list = objects
+        return UncountedPage(object_list, number, self, has_next)
+
+class KeysetPaginator(object):
+    """
+    A paginator that seeks each page with a WHERE clause on the values of the
+    ordering fields of the last object of the previous page, instead of
+    skipping the objects before it with OFFSET, so that every page costs the
+    same. Pages are identified by opaque, signed cursors rather than numbers,
+    and the objects aren't counted.
+
+    ``object_list`` must be a QuerySet. ``ordering`` is a list of field names,
+    like the arguments of ``order_by()``, which defaults to the ordering of
+    the QuerySet. The primary key is added to it if it isn't in it, so that
+    the ordering is unique. The fields can't be NULL, and must belong to the
+    model of the QuerySet rather than to related models.
+    """
+    count = num_pages = page_range = None
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True,
+                 ordering=None):
+        self.object_list = object_list
+        self.per_page = per_page
+        self.orphans = orphans
+        self.allow_empty_first_page = allow_empty_first_page
+        opts = object_list.model._meta
+        if ordering is None:
+            query = object_list.query
+            ordering = query.order_by or (query.default_ordering and opts.ordering) or []
+        self.keys = []
+        for name in ordering:
+            if name == '?':
+                continue
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            if name == 'pk':
+                field = opts.pk
+            else:
+                from django.core.exceptions import ImproperlyConfigured
+                from django.db.models.fields import FieldDoesNotExist
+                from django.db.models.sql.constants import LOOKUP_SEP
+                if LOOKUP_SEP in name:
+                    raise ImproperlyConfigured("KeysetPaginator can't order by %r, "
+                        "which spans a relation." % name)
+                try:
+                    field = opts.get_field(name)
+                except FieldDoesNotExist:
+                    raise ImproperlyConfigured("KeysetPaginator can't order by %r, "
+                        "which isn't a field of %s." % (name, opts.object_name))
+            self.keys.append((field, descending))
+        if opts.pk not in [field for field, descending in self.keys]:
+            self.keys.append((opts.pk, self.keys and self.keys[-1][1] or False))
+
+    def _get_salt(self):
+        opts = self.object_list.model._meta
+        return 'django.core.paginator.KeysetPaginator%s.%s%s' % (
+            opts.app_label, opts.object_name,
+            ','.join([(descending and '-' or '') + field.name for field, descending in self.keys]))
+
+    def make_cursor(self, values, previous=False):
+        """
+        Returns the cursor of the page after the given values of the ordering
+        fields, or the one before them if ``previous`` is True.
+        """
+        from django.utils import simplejson
+        from django.utils.crypto import salted_hmac
+        payload = simplejson.dumps([previous and 'p' or 'n',
+                                    [self._serialize(value) for value in values]])
+        signature = salted_hmac(self._get_salt(), payload).hexdigest()
+        return '%s.%s' % (base64.urlsafe_b64encode(payload).rstrip('='), signature)
+
+    def _serialize(self, value):
+        # str() and unicode() round floats to 12 significant digits, which
+        # would make the cursor seek from another value than the right one.
+        from decimal import Decimal
+        from django.utils.encoding import smart_unicode
+        if isinstance(value, float):
+            return repr(value)
+        if isinstance(value, Decimal):
+            return str(value)
+        return smart_unicode(value)
+
+    def read_cursor(self, cursor):
+        """
+        Returns a tuple (previous, values) from a cursor made by
+        ``make_cursor()``. Raises InvalidCursor if it's malformed or its
+        signature doesn't match.
+        """
+        from django.utils import simplejson
+        from django.utils.crypto import constant_time_compare, salted_hmac
+        try:
+            payload, signature = str(cursor).split('.', 1)
+            payload = base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4))
+        except (ValueError, TypeError, UnicodeEncodeError):
+            raise InvalidCursor('That cursor is malformed')
+        if not constant_time_compare(signature, salted_hmac(self._get_salt(), payload).hexdigest()):
+            raise InvalidCursor('That cursor has an invalid signature')
+        direction, values = simplejson.loads(payload)
+        try:
+            values = [field.to_python(value) for (field, descending), value
+                      in zip(self.keys, values)]
+        except Exception:
+            raise InvalidCursor('That cursor has invalid values')
+        return direction == 'p', values
+
+    def _get_values(self, obj):
+        return [getattr(obj, field.attname) for field, descending in self.keys]
+
+    def _get_name(self, field, ordering=False):
+        if field.primary_key:
+            # Don't follow the link of a multi-table inheritance child.
+            return 'pk'
+        if ordering and field.rel:
+            # Order by the column, not by the ordering of the related model.
+            return '%s__%s' % (field.name, field.rel.get_related_field().name)
+        return field.name
+
+    def _seek(self, values, previous=False):
+        """
+        Returns the QuerySet of the objects after the given values of the
+        ordering fields, in order, or of the objects before them in reverse
+        order if ``previous`` is True.
+        """
+        from django.db.models import Q
+        ordering = []
+        for field, descending in self.keys:
+            if descending != previous:
+                ordering.append('-' + self._get_name(field, True))
+            else:
+                ordering.append(self._get_name(field, True))
+        queryset = self.object_list.order_by(*ordering)
+        if values is None:
+            return queryset
+        # (a, b) > (x, y) is a > x OR (a = x AND b > y), which every
+        # database supports, with any mix of directions.
+        condition = None
+        for i, (field, descending) in enumerate(self.keys):
+            lookup = (descending != previous) and 'lt' or 'gt'
+            q = Q(**{'%s__%s' % (self._get_name(field), lookup): values[i]})
+            for (equal_field, d), value in zip(self.keys[:i], values[:i]):
+                q &= Q(**{self._get_name(equal_field): value})
+            if condition is None:
+                condition = q
+            else:
+                condition |= q
+        return queryset.filter(condition)
+
+    def page(self, cursor=None):
+        """
+        Returns a Page object for the given cursor. None, or 1 for
+        compatibility with numbered pages, gives the first page.
+        """
+        if cursor in (None, '', 1, '1'):
+            previous, values = False, None
+        else:
+            previous, values = self.read_cursor(cursor)
+            cursor = str(cursor)
+        objects = list(self._seek(values, previous)[:self.per_page + self.orphans + 1])
+        more = len(objects) > self.per_page + self.orphans
+        if more:
+            objects = objects[:self.per_page]
+        if previous:
+            objects.reverse()
+            has_next, has_previous = True, more
+        else:
+            has_next, has_previous = more, values is not None
+        if not objects and (values is not None or not self.allow_empty_first_page):
+            raise EmptyPage('That page contains no results')
+        # Keep the page a QuerySet, but don't run its query again.
+        object_list = self._seek(None).filter(pk__in=[obj.pk for obj in objects])
+        object_list._result_cache = objects
+        return KeysetPage(object_list, cursor, self, has_next, has_previous)
+
+    def page_cursors(self):
+        """
+        Yields the cursor of every page, in order, with one query per page
+        which only reads the ordering fields.
+        """
+        names = [self._get_name(field) for field, descending in self.keys]
+        values = None
+        yield None
+        while True:
+            # The last row of this page and the first of the next.
+            rows = list(self._seek(values).values_list(*names)[self.per_page - 1:self.per_page + 1])
+            if len(rows) < 2:
+                return
+            values = rows[0]
+            yield self.make_cursor(values)
+
 class Page(object):
     def __init__(self, object_list, number, paginator):
         self.object_list = object_list
@@ -118,3 +396,80 @@ class Page(object):
         if self.number == self.paginator.num_pages:
             return self.paginator.count
         return self.number * self.paginator.per_page
+
+class UncountedPage(Page):
+    """
+    A page of an ``UncountedPaginator``, which knows whether there is a next
+    page without knowing how many there are.
+    """
+    def __init__(self, object_list, number, paginator, has_next):
+        super(UncountedPage, self).__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def __repr__(self):
+        return '<Page %s>' % self.number
+
+    def has_next(self):
+        return self._has_next
+
+    def start_index(self):
+        """
+        Returns the 1-based index of the first object on this page,
+        relative to total objects in the paginator.
+        """
+        if not len(self.object_list):
+            return 0
+        return (self.paginator.per_page * (self.number - 1)) + 1
+
+    def end_index(self):
+        """
+        Returns the 1-based index of the last object on this page,
+        relative to total objects found (hits).
+        """
+        return (self.paginator.per_page * (self.number - 1)) + len(self.object_list)
+
+class KeysetPage(Page):
+    """
+    A page of a ``KeysetPaginator``. Its ``number`` is its cursor, and
+    ``next_page_number()`` and ``previous_page_number()`` return the cursors
+    of the pages around it, so templates building links from page numbers
+    work unchanged.
+    """
+    def __init__(self, object_list, cursor, paginator, has_next, has_previous):
+        super(KeysetPage, self).__init__(object_list, cursor, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return '<Page %s>' % (self.number or 1)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def next_page_number(self):
+        return self.next_cursor()
+
+    def previous_page_number(self):
+        return self.previous_cursor()
+
+    def next_cursor(self):
+        "Returns the cursor of the next page, or None if there is none."
+        if not self._has_next or not self.object_list:
+            return None
+        return self.paginator.make_cursor(self.paginator._get_values(self.object_list[len(self.object_list) - 1]))
+
+    def previous_cursor(self):
+        "Returns the cursor of the previous page, or None if there is none."
+        if not self._has_previous or not self.object_list:
+            return None
+        return self.paginator.make_cursor(self.paginator._get_values(self.object_list[0]),
+                                          previous=True)
+
+    def start_index(self):
+        return None
+
+    def end_index(self):
+        return None
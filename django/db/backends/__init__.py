@@ -253,6 +253,14 @@ class BaseDatabaseOperations(object):
         """
         return None
 
+    def estimated_count_sql(self, table_name):
+        """
+        Returns the SQL and parameters of a query returning the database's
+        estimate of the number of rows in the given table, from its
+        statistics, or None if the database doesn't keep such an estimate.
+        """
+        return None
+
     def fetch_returned_insert_id(self, cursor):
         """
         Given a cursor object that has just performed an INSERT...RETURNING
@@ -457,6 +465,22 @@ class BaseDatabaseOperations(object):
             return "ROLLBACK;"
         return "COMMIT;"
 
+    def statement_timeout_sql(self, timeout):
+        """
+        Returns the SQL that makes the database cancel the statements of the
+        connection which take longer than ``timeout`` seconds, or that removes
+        the limit if ``timeout`` is None. Returns None if the database doesn't
+        support it.
+        """
+        return None
+
+    def is_statement_timeout(self, exception):
+        """
+        Returns True if the given DatabaseError was raised because the
+        statement was cancelled by the limit of statement_timeout_sql().
+        """
+        return False
+
     def tablespace_sql(self, tablespace, inline=False):
         """
         Returns the SQL that will be appended to tables or rows to define
@@ -169,6 +169,11 @@ class DatabaseOperations(BaseDatabaseOperations):
         """
         return ["NULL"]
 
+    def estimated_count_sql(self, table_name):
+        # Exact for MyISAM, an estimate for InnoDB.
+        return ("SELECT table_rows FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = %s", [table_name])
+
     def fulltext_search_sql(self, field_name):
         return 'MATCH (%s) AGAINST (%%s IN BOOLEAN MODE)' % field_name
 
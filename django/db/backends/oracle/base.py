@@ -161,6 +161,11 @@ WHEN (new.%(col_name)s IS NULL)
     def drop_sequence_sql(self, table):
         return "DROP SEQUENCE %s;" % self.quote_name(get_sequence_name(table))
 
+    def estimated_count_sql(self, table_name):
+        # The name as created: uppercased and truncated.
+        return ("SELECT num_rows FROM user_tables WHERE table_name = %s",
+                [self.quote_name(table_name)[1:-1]])
+
     def fetch_returned_insert_id(self, cursor):
         return long(cursor._insert_id_var.getvalue())
 
@@ -34,6 +34,11 @@ class DatabaseOperations(BaseDatabaseOperations):
     def deferrable_sql(self):
         return " DEFERRABLE INITIALLY DEFERRED"
 
+    def estimated_count_sql(self, table_name):
+        # Maintained by VACUUM and ANALYZE.
+        return ("SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [self.quote_name(table_name)])
+
     def lookup_cast(self, lookup_type):
         lookup = '%s'
 
@@ -151,6 +156,16 @@ class DatabaseOperations(BaseDatabaseOperations):
     def savepoint_rollback_sql(self, sid):
         return "ROLLBACK TO SAVEPOINT %s" % sid
 
+    def statement_timeout_sql(self, timeout):
+        if timeout is None:
+            return "SET statement_timeout TO DEFAULT"
+        return "SET statement_timeout TO %d" % max(int(timeout * 1000), 1)
+
+    def is_statement_timeout(self, exception):
+        # psycopg2 sets the SQLSTATE of the error, which is query_canceled
+        # for statements cancelled by statement_timeout.
+        return getattr(exception, 'pgcode', None) == '57014'
+
     def prep_for_iexact_query(self, x):
         return x
 
@@ -432,8 +432,13 @@ class BaseModelFormSet(BaseFormSet):
     model = None
 
     def __init__(self, data=None, files=None, auto_id='id_%s', prefix=None,
-                 queryset=None, **kwargs):
+                 queryset=None, choice_caches=None, **kwargs):
         self.queryset = queryset
+        if choice_caches is None:
+            choice_caches = {}
+        self.choice_caches = choice_caches
+        # The keys of the querysets of the fields, for ModelChoiceCache.get_key().
+        self._query_keys = {}
         defaults = {'data': data, 'files': files, 'auto_id': auto_id, 'prefix': prefix}
         defaults.update(kwargs)
         super(BaseModelFormSet, self).__init__(**defaults)
@@ -454,8 +459,12 @@ class BaseModelFormSet(BaseFormSet):
             pk_key = "%s-%s" % (self.add_prefix(i), self.model._meta.pk.name)
             pk = self.data[pk_key]
             pk_field = self.model._meta.pk
-            pk = pk_field.get_db_prep_lookup('exact', pk,
-                connection=connections[self.get_queryset().db])
+            try:
+                pk = pk_field.get_db_prep_lookup('exact', pk,
+                    connection=connections[self.get_queryset().db])
+            except (ValueError, ValidationError):
+                # A tampered value, which the pk field of the form rejects.
+                pk = None
             if isinstance(pk, list):
                 pk = pk[0]
             kwargs['instance'] = self._existing_object(pk)
@@ -672,6 +681,25 @@ class BaseModelFormSet(BaseFormSet):
             qs = qs.using(form.instance._state.db)
             form.fields[self._pk_field.name] = ModelChoiceField(qs, initial=pk_value, required=False, widget=HiddenInput)
         super(BaseModelFormSet, self).add_fields(form, index)
+        self.share_choices(form)
+
+    def share_choices(self, form):
+        """
+        Makes the visible ModelChoiceFields of the form share their choices
+        with the fields of the other forms that have the same queryset, so
+        that each queryset is evaluated once for the formset rather than once
+        per form. Formsets given the same ``choice_caches`` dictionary share
+        their choices too.
+        """
+        for field in form.fields.values():
+            if (not isinstance(field, ModelChoiceField) or field.widget.is_hidden
+                    or field.cache_choices or hasattr(field, '_choices')):
+                continue
+            key = ModelChoiceCache.get_key(field, self._query_keys)
+            if key not in self.choice_caches:
+                self.choice_caches[key] = ModelChoiceCache(field)
+            field.cache_choices = True
+            field.choice_cache = self.choice_caches[key]
 
 def modelformset_factory(model, form=ModelForm, formfield_callback=None,
                          formset=BaseModelFormSet,
@@ -693,7 +721,7 @@ def modelformset_factory(model, form=ModelForm, formfield_callback=None,
 class BaseInlineFormSet(BaseModelFormSet):
     """A formset for child objects related to a parent."""
     def __init__(self, data=None, files=None, instance=None,
-                 save_as_new=False, prefix=None, queryset=None):
+                 save_as_new=False, prefix=None, queryset=None, choice_caches=None):
         from django.db.models.fields.related import RelatedObject
         if instance is None:
             self.instance = self.fk.rel.to()
@@ -710,7 +738,7 @@ class BaseInlineFormSet(BaseModelFormSet):
             queryset = self.model._default_manager
         qs = queryset.filter(**{self.fk.name: backlink_value})
         super(BaseInlineFormSet, self).__init__(data, files, prefix=prefix,
-                                                queryset=qs)
+                                                queryset=qs, choice_caches=choice_caches)
 
     def initial_form_count(self):
         if self.save_as_new:
@@ -898,6 +926,71 @@ class InlineForeignKeyField(Field):
             raise ValidationError(self.error_messages['invalid_choice'])
         return self.parent_instance
 
+class ModelChoiceCache(object):
+    """
+    The choices of a ModelChoiceField's queryset, evaluated the first time
+    they are iterated. It can be used as the ``choice_cache`` of several
+    fields with the same queryset, which also share the ``<option>``
+    elements rendered for the choices.
+    """
+    def __init__(self, field):
+        self.field = field
+        self.queryset = field.queryset
+        self.choices = None
+        self.rendered = {}
+
+    def get_key(cls, field, query_keys):
+        """
+        Returns the key of the choices of the field in a dictionary of
+        ModelChoiceCaches, which depends on the SQL of its queryset and on
+        how the choices are rendered. ``query_keys`` is a dictionary in which
+        the keys of the querysets are kept between calls.
+        """
+        from django.db.models.sql.datastructures import EmptyResultSet
+        label_from_instance = field.label_from_instance
+        key = (field.__class__, field.to_field_name,
+               getattr(label_from_instance, 'im_func', label_from_instance))
+        # The forms of a formset copy the fields of the form class, which keep
+        # their queryset, so compile the SQL of each queryset once.
+        queryset = field.queryset
+        try:
+            return key + query_keys[(queryset.db, id(queryset))][1]
+        except KeyError:
+            pass
+        try:
+            sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+            query_key = (queryset.db, sql, tuple(params))
+            hash(query_key)
+        except (EmptyResultSet, TypeError):
+            query_key = (queryset.db, id(queryset))
+        # Keep the queryset, so that its id isn't reused.
+        query_keys[(queryset.db, id(queryset))] = (queryset, query_key)
+        return key + query_key
+    get_key = classmethod(get_key)
+
+    def __iter__(self):
+        if self.choices is None:
+            iterator = ModelChoiceIterator(self.field)
+            self.choices = [iterator.choice(obj) for obj in self.queryset.all()]
+        return iter(self.choices)
+
+    def render_options(self, widget, selected_choices):
+        """
+        Returns the ``<option>`` elements of the choices rendered by the
+        widget, rendering again only the selected ones.
+        """
+        render_option = widget.render_option
+        key = getattr(render_option, 'im_func', render_option)
+        if key not in self.rendered:
+            self.rendered[key] = [(force_unicode(value), value, label, render_option((), value, label))
+                                  for value, label in self]
+        output = []
+        for option_value, value, label, option in self.rendered[key]:
+            if option_value in selected_choices:
+                option = render_option(selected_choices, value, label)
+            output.append(option)
+        return output
+
 class ModelChoiceIterator(object):
     def __init__(self, field):
         self.field = field
@@ -923,6 +1016,19 @@ class ModelChoiceIterator(object):
     def choice(self, obj):
         return (self.field.prepare_value(obj), self.field.label_from_instance(obj))
 
+    def render_options(self, widget, selected_choices):
+        """
+        Returns the ``<option>`` elements of the choices for the widget if
+        the field shares its choices with other fields, or None.
+        """
+        if not (self.field.cache_choices and isinstance(self.field.choice_cache, ModelChoiceCache)):
+            return None
+        output = []
+        if self.field.empty_label is not None:
+            output.append(widget.render_option(selected_choices, u"", self.field.empty_label))
+        output.extend(self.field.choice_cache.render_options(widget, selected_choices))
+        return u'\n'.join(output)
+
 class ModelChoiceField(ChoiceField):
     """A ChoiceField whose choices are a model QuerySet."""
     # This class is a subclass of ChoiceField for purity, but it doesn't
@@ -959,6 +1065,12 @@ class ModelChoiceField(ChoiceField):
         return self._queryset
 
     def _set_queryset(self, queryset):
+        if (isinstance(getattr(self, 'choice_cache', None), ModelChoiceCache)
+                and queryset is not self._queryset):
+            # The choices were shared by BaseModelFormSet.share_choices() for
+            # the previous queryset.
+            self.cache_choices = False
+            self.choice_cache = None
         self._queryset = queryset
         self.widget.choices = self.choices
 
@@ -522,6 +522,12 @@ class Select(Widget):
     def render_options(self, choices, selected_choices):
         # Normalize to strings.
         selected_choices = set([force_unicode(v) for v in selected_choices])
+        if not choices and hasattr(self.choices, 'render_options'):
+            # The choices of a ModelChoiceField can reuse the options rendered
+            # for the other forms of a formset.
+            options = self.choices.render_options(self, selected_choices)
+            if options is not None:
+                return options
         output = []
         for option_value, option_label in chain(self.choices, choices):
             if isinstance(option_label, (list, tuple)):
@@ -1,3 +1,4 @@
+import cgi
 import datetime
 import os
 import re
@@ -51,8 +52,78 @@ class HttpRequest(object):
             (pformat(self.GET), pformat(self.POST), pformat(self.COOKIES),
             pformat(self.META))
 
+    def _get_meta_cache(self):
+        """
+        Returns the dictionary holding values derived from META. The cache is
+        discarded if META itself is replaced.
+        """
+        cache = self.__dict__.get('_meta_cache')
+        if cache is None or cache[0] is not self.META:
+            cache = self._meta_cache = (self.META, {})
+        return cache[1]
+
+    def _get_derived(self, name, keys, derive):
+        """
+        Returns derive(), computed again only when the values of the given
+        META keys change, so that changes made to META in place, e.g. by a
+        middleware fixing the headers set by a proxy, are seen.
+        """
+        cache = self._get_meta_cache()
+        source = tuple([self.META.get(key) for key in keys])
+        try:
+            cached_source, value = cache[name]
+        except KeyError:
+            pass
+        else:
+            if cached_source == source:
+                return value
+        value = derive()
+        cache[name] = (source, value)
+        return value
+
+    def _get_headers(self):
+        cache = self._get_meta_cache()
+        if 'headers' not in cache:
+            cache['headers'] = HttpHeaders(self.META)
+        return cache['headers']
+
+    headers = property(_get_headers)
+
+    def _get_scheme(self):
+        return self.is_secure() and 'https' or 'http'
+
+    scheme = property(_get_scheme)
+
+    def _parse_content_type(self):
+        def parse():
+            content_type, params = cgi.parse_header(self.META.get('CONTENT_TYPE') or '')
+            return content_type.lower(), params
+        return self._get_derived('content_type', ('CONTENT_TYPE',), parse)
+
+    def _get_content_type(self):
+        return self._parse_content_type()[0]
+
+    content_type = property(_get_content_type)
+
+    def _get_content_params(self):
+        return self._parse_content_type()[1]
+
+    content_params = property(_get_content_params)
+
+    def _get_accepted_languages(self):
+        from django.utils.translation.trans_real import parse_accept_lang_header
+        return self._get_derived('accepted_languages', ('HTTP_ACCEPT_LANGUAGE',),
+            lambda: parse_accept_lang_header(self.META.get('HTTP_ACCEPT_LANGUAGE', '')))
+
+    accepted_languages = property(_get_accepted_languages)
+
     def get_host(self):
         """Returns the HTTP host using the environment or request headers."""
+        return self._get_derived('host', ('HTTP_X_FORWARDED_HOST', 'HTTP_HOST',
+                                          'SERVER_NAME', 'SERVER_PORT'),
+                                 self._get_raw_host)
+
+    def _get_raw_host(self):
         # We try three options, in order of decreasing preference.
         if 'HTTP_X_FORWARDED_HOST' in self.META:
             host = self.META['HTTP_X_FORWARDED_HOST']
@@ -78,8 +149,7 @@ class HttpRequest(object):
         if not location:
             location = self.get_full_path()
         if not absolute_http_url_re.match(location):
-            current_uri = '%s://%s%s' % (self.is_secure() and 'https' or 'http',
-                                         self.get_host(), self.path)
+            current_uri = '%s://%s%s' % (self.scheme, self.get_host(), self.path)
             location = urljoin(current_uri, location)
         return iri_to_uri(location)
 
@@ -132,6 +202,54 @@ class HttpRequest(object):
         parser = MultiPartParser(META, post_data, self.upload_handlers, self.encoding)
         return parser.parse()
 
+class HttpHeaders(object):
+    """
+    A read-only, case-insensitive mapping of the HTTP headers found in a
+    request's META, e.g. ``request.headers['User-Agent']``.
+    """
+    # CGI puts these two headers in the environ without the HTTP_ prefix.
+    UNPREFIXED_HEADERS = ('CONTENT_TYPE', 'CONTENT_LENGTH')
+
+    def __init__(self, environ):
+        self._store = {}
+        for key, value in environ.iteritems():
+            if key.startswith('HTTP_'):
+                key = key[5:]
+            elif key not in self.UNPREFIXED_HEADERS:
+                continue
+            name = '-'.join([part.capitalize() for part in key.split('_')])
+            self._store[name.lower()] = (name, value)
+
+    def __getitem__(self, key):
+        return self._store[key.lower().replace('_', '-')][1]
+
+    def __contains__(self, key):
+        return key.lower().replace('_', '-') in self._store
+
+    has_key = __contains__
+
+    def __iter__(self):
+        for name, value in self._store.itervalues():
+            yield name
+
+    def __len__(self):
+        return len(self._store)
+
+    def __repr__(self):
+        return '<HttpHeaders: %r>' % dict(self.items())
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(self)
+
+    def items(self):
+        return self._store.values()
+
 class QueryDict(MultiValueDict):
     """
     A specialized MultiValueDict that takes a query string when initialized.
@@ -309,6 +427,7 @@ class HttpResponse(object):
     """A basic HTTP response, with content and dictionary-accessed headers."""
 
     status_code = 200
+    streaming = False
 
     def __init__(self, content='', mimetype=None, status=None,
             content_type=None):
@@ -459,6 +578,59 @@ class HttpResponse(object):
             raise Exception("This %s instance cannot tell its position" % self.__class__)
         return sum([len(chunk) for chunk in self._container])
 
+class StreamingHttpResponse(HttpResponse):
+    """
+    A streaming HTTP response class with an iterator as content.
+
+    The content is only consumed when the response is iterated over by the
+    server, so middleware must never touch ``content``. It can wrap the
+    iterator by reassigning ``streaming_content`` instead.
+    """
+
+    streaming = True
+
+    def __init__(self, streaming_content=(), mimetype=None, status=None,
+            content_type=None):
+        super(StreamingHttpResponse, self).__init__('', mimetype=mimetype,
+            status=status, content_type=content_type)
+        # Keep a reference to the original iterable so that close() still
+        # reaches it after middleware has wrapped streaming_content.
+        self._closable = streaming_content
+        self.streaming_content = streaming_content
+
+    def _get_content(self):
+        raise AttributeError("This %s instance has no `content` attribute. "
+            "Use `streaming_content` instead." % self.__class__.__name__)
+
+    def _set_content(self, value):
+        raise AttributeError("This %s instance has no `content` attribute. "
+            "Use `streaming_content` instead." % self.__class__.__name__)
+
+    content = property(_get_content, _set_content)
+
+    def _get_streaming_content(self):
+        return self._encode_chunks(self._container)
+
+    def _set_streaming_content(self, value):
+        self._container = iter(value)
+        self._is_string = False
+
+    streaming_content = property(_get_streaming_content, _set_streaming_content)
+
+    def _encode_chunks(self, chunks):
+        for chunk in chunks:
+            if isinstance(chunk, unicode):
+                chunk = chunk.encode(self._charset)
+            yield str(chunk)
+
+    def __iter__(self):
+        self._iterator = self._container
+        return self
+
+    def close(self):
+        if hasattr(self._closable, 'close'):
+            self._closable.close()
+
 class HttpResponseRedirect(HttpResponse):
     status_code = 302
 
@@ -29,7 +29,8 @@ class CommonMiddleware(object):
 
         - ETags: If the USE_ETAGS setting is set, ETags will be calculated from
           the entire page content and Not Modified responses will be returned
-          appropriately.
+          appropriately. Streaming responses are never buffered to compute an
+          ETag; only one set explicitly by the view is honored.
     """
 
     def process_request(self, request):
@@ -81,8 +82,7 @@ class CommonMiddleware(object):
             return
         if new_url[0]:
             newurl = "%s://%s%s" % (
-                request.is_secure() and 'https' or 'http',
-                new_url[0], urlquote(new_url[1]))
+                request.scheme, new_url[0], urlquote(new_url[1]))
         else:
             newurl = urlquote(new_url[1])
         if request.GET:
@@ -111,14 +111,17 @@ class CommonMiddleware(object):
         if settings.USE_ETAGS:
             if response.has_header('ETag'):
                 etag = response['ETag']
+            elif response.streaming:
+                etag = None
             else:
                 etag = '"%s"' % md5_constructor(response.content).hexdigest()
-            if response.status_code >= 200 and response.status_code < 300 and request.META.get('HTTP_IF_NONE_MATCH') == etag:
-                cookies = response.cookies
-                response = http.HttpResponseNotModified()
-                response.cookies = cookies
-            else:
-                response['ETag'] = etag
+            if etag is not None:
+                if response.status_code >= 200 and response.status_code < 300 and request.META.get('HTTP_IF_NONE_MATCH') == etag:
+                    cookies = response.cookies
+                    response = http.HttpResponseNotModified()
+                    response.cookies = cookies
+                else:
+                    response['ETag'] = etag
 
         return response
 
@@ -282,6 +282,10 @@ class CsrfResponseMiddleware(object):
         if getattr(response, 'csrf_exempt', False):
             return response
 
+        # Rewriting the forms would require buffering the whole stream.
+        if response.streaming:
+            return response
+
         if response['Content-Type'].split(';')[0] in _HTML_TYPES:
             csrf_token = get_token(request)
             # If csrf_token is None, we have no token for this request, which probably
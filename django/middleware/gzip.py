@@ -1,6 +1,7 @@
 import re
 
-from django.utils.text import compress_string
+from django.conf import settings
+from django.utils.text import compress_sequence, compress_string
 from django.utils.cache import patch_vary_headers
 
 re_accepts_gzip = re.compile(r'\bgzip\b')
@@ -10,10 +11,49 @@ class GZipMiddleware(object):
     This middleware compresses content if the browser allows gzip compression.
     It sets the Vary header accordingly, so that caches will base their storage
     on the Accept-Encoding header.
+
+    Streaming responses are compressed incrementally as they are consumed, so
+    their content is never loaded into memory.
+
+    The compression level, the minimum length worth compressing and the
+    content types that are already compressed default to the
+    GZIP_COMPRESSION_LEVEL, GZIP_MIN_LENGTH and GZIP_EXCLUDED_CONTENT_TYPES
+    settings.
     """
+    def __init__(self, compresslevel=None, min_length=None, excluded_content_types=None):
+        self.compresslevel = compresslevel
+        if compresslevel is None:
+            self.compresslevel = settings.GZIP_COMPRESSION_LEVEL
+        self.min_length = min_length
+        if min_length is None:
+            self.min_length = settings.GZIP_MIN_LENGTH
+        self.excluded_content_types = excluded_content_types
+        if excluded_content_types is None:
+            self.excluded_content_types = settings.GZIP_EXCLUDED_CONTENT_TYPES
+
+    def is_compressed_type(self, content_type):
+        """
+        Returns True if the given Content-Type header value names a format
+        that is already compressed, so gzipping it would only waste CPU.
+        """
+        mimetype = content_type.split(';')[0].strip().lower()
+        for excluded in self.excluded_content_types:
+            if excluded.endswith('/'):
+                if mimetype.startswith(excluded):
+                    return True
+            elif mimetype == excluded:
+                return True
+        return False
+
     def process_response(self, request, response):
         # It's not worth compressing non-OK or really short responses.
-        if response.status_code != 200 or len(response.content) < 200:
+        if response.status_code != 200:
+            return response
+        if not response.streaming and len(response.content) < self.min_length:
+            return response
+
+        # Compressing already compressed formats gains nothing.
+        if self.is_compressed_type(response.get('Content-Type', '')):
             return response
 
         patch_vary_headers(response, ('Accept-Encoding',))
@@ -32,7 +72,13 @@ class GZipMiddleware(object):
         if not re_accepts_gzip.search(ae):
             return response
 
-        response.content = compress_string(response.content)
+        if response.streaming:
+            # The length of the compressed stream isn't known in advance.
+            response.streaming_content = compress_sequence(
+                response.streaming_content, self.compresslevel)
+            del response['Content-Length']
+        else:
+            response.content = compress_string(response.content, self.compresslevel)
+            response['Content-Length'] = str(len(response.content))
         response['Content-Encoding'] = 'gzip'
-        response['Content-Length'] = str(len(response.content))
         return response
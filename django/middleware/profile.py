@@ -0,0 +1,262 @@
+"""
+Sampling profiler middleware.
+
+Profiles a sample of the requests with cProfile and aggregates the results per
+view, in one file per view and process under PROFILE_STATS_DIR. Use the
+``profilestats`` management command to read them. Requires Python 2.5 or
+later.
+"""
+import atexit
+import marshal
+import os
+import pstats
+import random
+import re
+import tempfile
+import time
+try:
+    import cProfile
+except ImportError:
+    # Python 2.4
+    cProfile = None
+try:
+    import threading
+except ImportError:
+    import dummy_threading as threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.crypto import salted_hmac, constant_time_compare
+from django.utils.http import int_to_base36, base36_to_int
+
+PROFILE_HEADER = 'HTTP_X_DJANGO_PROFILE'
+UNRESOLVED_VIEW_NAME = 'unresolved'
+# Rewritten by clear_stats() so that running processes drop their stats too.
+CLEARED_MARKER = 'cleared'
+
+unsafe_filename_chars_re = re.compile(r'[^\w.-]')
+
+def get_profile_token(path, timestamp=None):
+    """
+    Returns the value of the X-Django-Profile request header that forces the
+    request for the given path to be profiled, for PROFILE_TOKEN_MAX_AGE
+    seconds from ``timestamp`` (now by default).
+    """
+    if timestamp is None:
+        timestamp = int(time.time())
+    ts_b36 = int_to_base36(timestamp)
+    return '%s-%s' % (ts_b36, salted_hmac('django.middleware.profile',
+                                          '%s-%s' % (ts_b36, path)).hexdigest())
+
+def check_profile_token(token, path):
+    """
+    Returns True if the token was made by get_profile_token() for the path
+    and hasn't expired.
+    """
+    try:
+        ts_b36, signature = token.split('-', 1)
+        timestamp = base36_to_int(ts_b36)
+    except ValueError:
+        return False
+    if not constant_time_compare(token, get_profile_token(path, timestamp)):
+        return False
+    return 0 <= time.time() - timestamp <= settings.PROFILE_TOKEN_MAX_AGE
+
+def get_stats_dir():
+    stats_dir = settings.PROFILE_STATS_DIR
+    if not stats_dir:
+        stats_dir = os.path.join(tempfile.gettempdir(), 'django-profile')
+    return stats_dir
+
+def get_view_name(callback):
+    name = getattr(callback, '__name__', callback.__class__.__name__)
+    return '%s.%s' % (callback.__module__, name)
+
+def _write_atomic(stats_dir, path, write):
+    # Write to a temporary file first, so that readers never see a partial
+    # file.
+    fd, tmp_path = tempfile.mkstemp(dir=stats_dir, suffix='.tmp')
+    f = os.fdopen(fd, 'wb')
+    try:
+        write(f)
+    finally:
+        f.close()
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        # Windows doesn't replace existing files.
+        os.remove(path)
+        os.rename(tmp_path, path)
+
+def get_cleared_generation(stats_dir):
+    """
+    Returns the value written by the last clear_stats() call, or None if the
+    stats were never cleared.
+    """
+    try:
+        f = open(os.path.join(stats_dir, CLEARED_MARKER), 'rb')
+    except IOError:
+        return None
+    try:
+        return f.read()
+    finally:
+        f.close()
+
+def clear_stats(stats_dir=None):
+    """
+    Deletes the profile files and tells the running processes, through the
+    CLEARED_MARKER file, to discard the stats they hold in memory.
+    """
+    if stats_dir is None:
+        stats_dir = get_stats_dir()
+    if not os.path.isdir(stats_dir):
+        return
+    generation = '%s-%s' % (repr(time.time()), random.random())
+    _write_atomic(stats_dir, os.path.join(stats_dir, CLEARED_MARKER),
+                  lambda f: f.write(generation))
+    for filename in os.listdir(stats_dir):
+        if filename.endswith('.prof'):
+            os.unlink(os.path.join(stats_dir, filename))
+
+def load_stats(stats_dir=None):
+    """
+    Merges the profile files written by every process into a dictionary
+    mapping view names to pstats.Stats objects.
+    """
+    if stats_dir is None:
+        stats_dir = get_stats_dir()
+    stats = {}
+    if not os.path.isdir(stats_dir):
+        return stats
+    for filename in sorted(os.listdir(stats_dir)):
+        if not filename.endswith('.prof'):
+            continue
+        # Files are named <view name>.<pid>.prof.
+        view_name = filename.rsplit('.', 2)[0]
+        path = os.path.join(stats_dir, filename)
+        if view_name in stats:
+            stats[view_name].add(path)
+        else:
+            stats[view_name] = pstats.Stats(path)
+    return stats
+
+class ProfileMiddleware(object):
+    """
+    Profiles one in every PROFILE_SAMPLE_RATE requests, as well as every
+    request that carries a valid X-Django-Profile header (see
+    get_profile_token()).
+
+    The profiler runs from process_request() to process_response(), so this
+    middleware should be first in MIDDLEWARE_CLASSES to cover the whole
+    request. Stats are accumulated per view in memory and written out at most
+    once every ``write_interval`` seconds per view, and when the process
+    exits. They're discarded when clear_stats() has run since they were
+    collected.
+    """
+    write_interval = 10
+
+    def __init__(self):
+        if cProfile is None:
+            raise ImproperlyConfigured("ProfileMiddleware requires the "
+                                       "cProfile module of Python 2.5 or later.")
+        self.sample_rate = settings.PROFILE_SAMPLE_RATE
+        self.stats_dir = get_stats_dir()
+        if not os.path.isdir(self.stats_dir):
+            try:
+                os.makedirs(self.stats_dir)
+            except OSError:
+                raise ImproperlyConfigured(
+                    "The profile stats directory %r doesn't exist and can't be"
+                    " created. Please set your PROFILE_STATS_DIR setting to a"
+                    " writable directory." % self.stats_dir)
+        self.stats = {}
+        self.written = {}
+        self.pending = set()
+        self.generation = get_cleared_generation(self.stats_dir)
+        self.lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def should_profile(self, request):
+        token = request.META.get(PROFILE_HEADER)
+        if token:
+            return check_profile_token(token, request.path)
+        return self.sample_rate > 0 and random.random() * self.sample_rate < 1
+
+    def process_request(self, request):
+        if self.should_profile(request):
+            request._profiler = cProfile.Profile()
+            request._profiler.enable()
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if hasattr(request, '_profiler'):
+            request._profile_view_name = get_view_name(callback)
+
+    def process_response(self, request, response):
+        profiler = getattr(request, '_profiler', None)
+        if profiler is None:
+            return response
+        profiler.disable()
+        del request._profiler
+        view_name = getattr(request, '_profile_view_name', UNRESOLVED_VIEW_NAME)
+        self.record(view_name, profiler)
+        return response
+
+    def reset_if_cleared(self):
+        """
+        Discards the stats collected so far if clear_stats() has run since.
+        Must be called with the lock held.
+        """
+        generation = get_cleared_generation(self.stats_dir)
+        if generation != self.generation:
+            self.generation = generation
+            self.stats = {}
+            self.written = {}
+            self.pending.clear()
+
+    def record(self, view_name, profiler):
+        now = time.time()
+        self.lock.acquire()
+        try:
+            self.reset_if_cleared()
+            if view_name in self.stats:
+                self.stats[view_name].add(profiler)
+            else:
+                self.stats[view_name] = pstats.Stats(profiler)
+            if now - self.written.get(view_name, 0) < self.write_interval:
+                self.pending.add(view_name)
+                return
+            self.written[view_name] = now
+            self.pending.discard(view_name)
+            # Adding stats replaces their entries rather than changing them,
+            # so a shallow copy can be written without holding the lock.
+            data = self.stats[view_name].stats.copy()
+        finally:
+            self.lock.release()
+        self.write(view_name, data)
+
+    def write(self, view_name, data):
+        filename = '%s.%d.prof' % (unsafe_filename_chars_re.sub('_', view_name), os.getpid())
+        path = os.path.join(self.stats_dir, filename)
+        _write_atomic(self.stats_dir, path, lambda f: marshal.dump(data, f))
+
+    def flush(self):
+        """
+        Writes the stats that weren't written yet.
+        """
+        self.lock.acquire()
+        try:
+            try:
+                self.reset_if_cleared()
+            except EnvironmentError:
+                pass
+            pending = [(view_name, self.stats[view_name].stats.copy())
+                       for view_name in self.pending]
+            self.pending.clear()
+        finally:
+            self.lock.release()
+        for view_name, data in pending:
+            try:
+                self.write(view_name, data)
+            except EnvironmentError:
+                # The stats directory may be gone when the process exits.
+                pass
@@ -83,8 +83,7 @@ class ClientHandler(BaseHandler):
             response = self.get_response(request)
 
             # Apply response middleware.
-            for middleware_method in self._response_middleware:
-                response = middleware_method(request, response)
+            response = self.apply_response_middleware(request, response)
             response = self.apply_response_fixes(request, response)
         finally:
             signals.request_finished.disconnect(close_connection)
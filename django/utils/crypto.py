@@ -2,10 +2,24 @@
 Django's standard crypto functions and utilities.
 """
 import hmac
+import random
+import struct
 
 from django.conf import settings
 from django.utils.hashcompat import sha_constructor, sha_hmac
 
+# Use the system (hardware-based) random number generator if it exists.
+if hasattr(random, 'SystemRandom'):
+    _sysrandom = random.SystemRandom()
+else:
+    _sysrandom = random
+
+try:
+    # Python 2.7.8 and later implement PBKDF2 in C.
+    from hashlib import pbkdf2_hmac as _pbkdf2_hmac
+except ImportError:
+    _pbkdf2_hmac = None
+
 
 def salted_hmac(key_salt, value, secret=None):
     """
@@ -43,3 +57,60 @@ def constant_time_compare(val1, val2):
     for x, y in zip(val1, val2):
         result |= ord(x) ^ ord(y)
     return result == 0
+
+
+def get_random_string(length=12,
+                      allowed_chars='abcdefghijklmnopqrstuvwxyz'
+                                    'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'):
+    """
+    Returns a random string of the given length, made of the allowed
+    characters. The default length of 12 with the a-z, A-Z, 0-9 character set
+    gives about 71 bits of randomness.
+    """
+    return ''.join([_sysrandom.choice(allowed_chars) for i in range(length)])
+
+
+_trans_5c = ''.join([chr(x ^ 0x5C) for x in xrange(256)])
+_trans_36 = ''.join([chr(x ^ 0x36) for x in xrange(256)])
+
+def pbkdf2(password, salt, iterations, dklen=0, digest=None):
+    """
+    Implements PBKDF2 as defined in RFC 2898, section 5.2, and returns the
+    derived key as a binary string of ``dklen`` bytes (the digest size of the
+    hash function by default).
+
+    ``digest`` is a hashlib-style constructor and defaults to SHA1. Without
+    hashlib's own implementation, the HMAC is computed by hand so that the
+    key setup is only done once rather than once per iteration, which about
+    halves the cost of each iteration.
+    """
+    if digest is None:
+        digest = sha_constructor
+    inner, outer = digest(), digest()
+    hlen = inner.digest_size
+    block_size = getattr(inner, 'block_size', 64)
+    if not dklen:
+        dklen = hlen
+    if dklen > (2 ** 32 - 1) * hlen:
+        raise OverflowError('dklen too big')
+    if _pbkdf2_hmac is not None:
+        return _pbkdf2_hmac(inner.name, password, salt, int(iterations), dklen)
+    if len(password) > block_size:
+        password = digest(password).digest()
+    password += '\x00' * (block_size - len(password))
+    inner.update(password.translate(_trans_36))
+    outer.update(password.translate(_trans_5c))
+
+    def F(i):
+        u = salt + struct.pack('>I', i)
+        result = 0
+        for j in xrange(int(iterations)):
+            dig1, dig2 = inner.copy(), outer.copy()
+            dig1.update(u)
+            dig2.update(dig1.digest())
+            u = dig2.digest()
+            result ^= long(u.encode('hex'), 16)
+        return ('%0*x' % (hlen * 2, result)).decode('hex')
+
+    blocks = -(-dklen // hlen)
+    return ''.join([F(i) for i in range(1, blocks + 1)])[:dklen]
@@ -352,8 +352,13 @@ def get_language_from_request(request):
     if lang_code and lang_code in supported and check_for_language(lang_code):
         return lang_code
 
-    accept = request.META.get('HTTP_ACCEPT_LANGUAGE', '')
-    for accept_lang, unused in parse_accept_lang_header(accept):
+    from django.http import HttpRequest
+    if isinstance(request, HttpRequest):
+        # Reuse the header already parsed for this request.
+        accepted = request.accepted_languages
+    else:
+        accepted = parse_accept_lang_header(request.META.get('HTTP_ACCEPT_LANGUAGE', ''))
+    for accept_lang, unused in accepted:
         if accept_lang == '*':
             break
 
@@ -1,4 +1,4 @@
-from django.core.paginator import Paginator, InvalidPage
+from django.core.paginator import Paginator, KeysetPaginator, InvalidPage
 from django.core.exceptions import ImproperlyConfigured
 from django.http import Http404
 from django.utils.encoding import smart_str
@@ -10,6 +10,7 @@ class MultipleObjectMixin(object):
     model = None
     paginate_by = None
     context_object_name = None
+    paginator_class = Paginator
 
     def get_queryset(self):
         """
@@ -31,13 +32,21 @@ class MultipleObjectMixin(object):
         """
         Paginate the queryset, if needed.
         """
-        if queryset.count() > page_size:
-            paginator = Paginator(queryset, page_size, allow_empty_first_page=self.get_allow_empty())
+        paginator = self.get_paginator(queryset, page_size, allow_empty_first_page=self.get_allow_empty())
+        if isinstance(paginator, KeysetPaginator):
+            # Pages are identified by cursors, and the objects aren't counted.
+            page_number = self.kwargs.get('page', None) or self.request.GET.get('page', None)
+            try:
+                page = paginator.page(page_number)
+            except InvalidPage:
+                raise Http404(u'Invalid page (%s)' % page_number)
+            return (paginator, page, page.object_list, page.has_other_pages())
+        if paginator.count is None or paginator.count > page_size:
             page = self.kwargs.get('page', None) or self.request.GET.get('page', 1)
             try:
                 page_number = int(page)
             except ValueError:
-                if page == 'last':
+                if page == 'last' and paginator.num_pages is not None:
                     page_number = paginator.num_pages
                 else:
                     raise Http404("Page is not 'last', nor can it be converted to an int.")
@@ -49,6 +58,13 @@ class MultipleObjectMixin(object):
         else:
             return (None, None, queryset, False)
 
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        """
+        Return an instance of the paginator for this view.
+        """
+        return self.paginator_class(queryset, per_page, orphans=orphans,
+                                    allow_empty_first_page=allow_empty_first_page)
+
     def get_paginate_by(self, queryset):
         """
         Get the number of items to paginate by, or ``None`` for no pagination.
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+"""
+Measures the cost of rendering the rows of an admin change list: 100 rows of
+15 columns of various kinds, plus the action checkboxes, without the queries
+that fetch them.
+
+Usage::
+
+    python admin_changelist.py [number_of_renderings]
+
+The numbers are only meaningful relative to each other, so run the script
+before and after a change on the same machine.
+"""
+import datetime
+import decimal
+import sys
+import time
+
+from django.conf import settings
+
+settings.configure(
+    DEBUG=False,
+    DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+    USE_I18N=True,
+    USE_L10N=True,
+    INSTALLED_APPS=(
+        'django.contrib.auth',
+        'django.contrib.contenttypes',
+        'django.contrib.admin',
+    ),
+)
+
+from django.contrib import admin
+from django.contrib.admin.templatetags.admin_list import result_list
+from django.contrib.admin.views.main import ChangeList
+from django.core.management.color import no_style
+from django.db import connection, models
+
+class Category(models.Model):
+    name = models.CharField(max_length=50)
+
+    class Meta:
+        app_label = 'benchmark'
+
+    def __unicode__(self):
+        return self.name
+
+class Entry(models.Model):
+    STATUS_CHOICES = (('d', 'Draft'), ('p', 'Published'), ('a', 'Archived'))
+    title = models.CharField(max_length=100)
+    slug = models.SlugField()
+    category = models.ForeignKey(Category)
+    status = models.CharField(max_length=1, choices=STATUS_CHOICES)
+    views = models.IntegerField()
+    price = models.DecimalField(max_digits=8, decimal_places=2)
+    rating = models.FloatField()
+    published = models.DateField()
+    updated = models.DateTimeField()
+    featured = models.BooleanField()
+    reviewed = models.NullBooleanField()
+
+    class Meta:
+        app_label = 'benchmark'
+
+    def __unicode__(self):
+        return self.title
+
+    def was_popular(self):
+        return self.views > 500
+    was_popular.boolean = True
+
+def title_length(obj):
+    return len(obj.title)
+
+class EntryAdmin(admin.ModelAdmin):
+    list_display = ('title', 'slug', 'category', 'status', 'views', 'price',
+                    'rating', 'published', 'updated', 'featured', 'reviewed',
+                    'was_popular', title_length, 'colored_status', '__str__')
+    list_select_related = True
+    list_per_page = 100
+
+    def colored_status(self, obj):
+        return '<span class="%s">%s</span>' % (obj.status, obj.get_status_display())
+    colored_status.allow_tags = True
+
+class Request(object):
+    GET = {}
+
+def setup(rows):
+    cursor = connection.cursor()
+    seen = set()
+    for model in (Category, Entry):
+        for sql in connection.creation.sql_create_model(model, no_style(), seen)[0]:
+            cursor.execute(sql)
+        seen.add(model)
+    categories = [Category.objects.create(name='Category %d' % i) for i in range(10)]
+    now = datetime.datetime(2010, 10, 1, 12, 0)
+    for i in range(rows):
+        Entry.objects.create(title='Entry <%d>' % i, slug='entry-%d' % i,
+            category=categories[i % 10], status='dpa'[i % 3], views=i * 10,
+            price=decimal.Decimal('%d.99' % i), rating=i / 7.0,
+            published=now.date() - datetime.timedelta(days=i),
+            updated=now - datetime.timedelta(hours=i), featured=i % 2 == 0,
+            reviewed=(None, True, False)[i % 3])
+
+def main(count):
+    setup(100)
+    model_admin = EntryAdmin(Entry, admin.site)
+    cl = ChangeList(Request(), Entry, model_admin.list_display,
+        model_admin.list_display_links, model_admin.list_filter,
+        model_admin.date_hierarchy, model_admin.search_fields,
+        model_admin.list_select_related, model_admin.list_per_page,
+        model_admin.list_editable, model_admin)
+    cl.formset = None
+    # Fetch the rows once, so that only the rendering is timed.
+    cl.result_list = list(cl.result_list)
+    for i in range(3):
+        result_list(cl)
+    start = time.time()
+    for i in xrange(count):
+        # The columns are planned again for each change list.
+        cl.__dict__.pop('_result_columns', None)
+        result_list(cl)
+    elapsed = time.time() - start
+    print '%d renderings of %d rows x %d columns in %.3fs: %.2f ms/rendering' % (
+        count, len(cl.result_list), len(model_admin.list_display), elapsed,
+        elapsed / count * 1e3)
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(50)
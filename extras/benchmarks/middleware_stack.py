@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+Measures the fixed per-request cost of Django's request handling: the full
+default middleware stack wrapped around a view that does nothing.
+
+Usage::
+
+    python middleware_stack.py [number_of_requests]
+
+The numbers are only meaningful relative to each other, so run the script
+before and after a change on the same machine.
+"""
+import sys
+import time
+
+from django.conf import settings
+
+settings.configure(
+    DEBUG=False,
+    ROOT_URLCONF=__name__,
+    SECRET_KEY='benchmark',
+    SESSION_ENGINE='django.contrib.sessions.backends.cache',
+    CACHE_BACKEND='locmem://',
+    USE_I18N=True,
+    USE_ETAGS=True,
+    INSTALLED_APPS=(
+        'django.contrib.auth',
+        'django.contrib.contenttypes',
+        'django.contrib.sessions',
+        'django.contrib.messages',
+    ),
+    MIDDLEWARE_CLASSES=(
+        'django.middleware.gzip.GZipMiddleware',
+        'django.middleware.http.ConditionalGetMiddleware',
+        'django.middleware.common.CommonMiddleware',
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.middleware.locale.LocaleMiddleware',
+        'django.middleware.csrf.CsrfViewMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+    ),
+)
+
+from django.conf.urls.defaults import patterns
+from django.core.handlers.wsgi import WSGIHandler
+from django.http import HttpResponse
+
+def trivial_view(request):
+    return HttpResponse('Hello, world')
+
+urlpatterns = patterns('',
+    (r'^$', trivial_view),
+)
+
+def environ():
+    return {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': '/',
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'testserver',
+        'HTTP_ACCEPT_ENCODING': 'gzip, deflate',
+        'HTTP_ACCEPT_LANGUAGE': 'en-us,en;q=0.5',
+        'HTTP_COOKIE': 'csrftoken=0123456789abcdef0123456789abcdef',
+        'HTTP_USER_AGENT': 'Mozilla/5.0 (benchmark)',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': sys.stdin,
+        'wsgi.errors': sys.stderr,
+        'wsgi.version': (1, 0),
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+def start_response(status, headers):
+    pass
+
+def main(count):
+    handler = WSGIHandler()
+    # Warm up: loads the middleware and URLconf and primes the caches.
+    for i in range(10):
+        ''.join(handler(environ(), start_response))
+    start = time.time()
+    for i in xrange(count):
+        ''.join(handler(environ(), start_response))
+    elapsed = time.time() - start
+    print '%d requests in %.3fs: %.1f us/request' % (count, elapsed,
+                                                     elapsed / count * 1e6)
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(5000)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+Measures the cost of rendering a model formset of 50 forms, each with a
+select of 200 related objects and a multiple select of 100 others, with and
+without the forms sharing their choices.
+
+Usage::
+
+    python model_formset.py [number_of_renderings]
+
+The numbers are only meaningful relative to each other, so run the script
+before and after a change on the same machine.
+"""
+import sys
+import time
+
+from django.conf import settings
+
+settings.configure(
+    # Needed to count the queries.
+    DEBUG=True,
+    DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+    INSTALLED_APPS=(),
+)
+
+from django.core.management.color import no_style
+from django.db import connection, models, reset_queries
+from django.forms.models import BaseModelFormSet, modelformset_factory
+
+class Category(models.Model):
+    name = models.CharField(max_length=50)
+
+    class Meta:
+        app_label = 'benchmark'
+
+    def __unicode__(self):
+        return self.name
+
+class Tag(models.Model):
+    name = models.CharField(max_length=50)
+
+    class Meta:
+        app_label = 'benchmark'
+
+    def __unicode__(self):
+        return self.name
+
+class Entry(models.Model):
+    title = models.CharField(max_length=100)
+    category = models.ForeignKey(Category)
+    tags = models.ManyToManyField(Tag)
+
+    class Meta:
+        app_label = 'benchmark'
+
+class UnsharedFormSet(BaseModelFormSet):
+    def share_choices(self, form):
+        pass
+
+def setup(forms):
+    cursor = connection.cursor()
+    seen = set()
+    for model in (Category, Tag, Entry, Entry.tags.through):
+        for sql in connection.creation.sql_create_model(model, no_style(), seen)[0]:
+            cursor.execute(sql)
+        seen.add(model)
+    categories = [Category.objects.create(name='Category <%d>' % i) for i in range(200)]
+    tags = [Tag.objects.create(name='Tag %d' % i) for i in range(100)]
+    for i in range(forms):
+        entry = Entry.objects.create(title='Entry %d' % i, category=categories[i % 200])
+        entry.tags.add(tags[i % 100], tags[(i * 7) % 100])
+
+def render(FormSet, count):
+    queryset = Entry.objects.order_by('pk')
+    # The formset and its forms are created for each rendering, as they would
+    # be for each request.
+    reset_queries()
+    unicode(FormSet(queryset=queryset))
+    queries = len(connection.queries)
+    start = time.time()
+    for i in xrange(count):
+        unicode(FormSet(queryset=queryset))
+    elapsed = time.time() - start
+    return queries, elapsed
+
+def main(count):
+    setup(50)
+    for name, formset in (('unshared', UnsharedFormSet), ('shared', BaseModelFormSet)):
+        FormSet = modelformset_factory(Entry, formset=formset, extra=0)
+        queries, elapsed = render(FormSet, count)
+        print '%-8s %d renderings of 50 forms in %.3fs: %.2f ms/rendering, %d queries/rendering' % (
+            name, count, elapsed, elapsed / count * 1e3, queries)
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(10)
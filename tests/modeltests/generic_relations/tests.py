@@ -1,4 +1,5 @@
-from django.contrib.contenttypes.generic import generic_inlineformset_factory
+from django.contrib.contenttypes.generic import (generic_inlineformset_factory,
+    load_generic_foreign_keys)
 from django.contrib.contenttypes.models import ContentType
 from django.test import TestCase
 
@@ -194,6 +195,49 @@ class GenericRelationsTests(TestCase):
         )
         self.assertEqual(valuedtag.content_object, quartz)
 
+    def test_load_generic_foreign_keys(self):
+        lion = Animal.objects.create(common_name="Lion", latin_name="Panthera leo")
+        bacon = Vegetable.objects.create(name="Bacon", is_yucky=False)
+        eggplant = Vegetable.objects.create(name="Eggplant", is_yucky=True)
+        quartz = Mineral.objects.create(name="Quartz", hardness=7)
+        lion.tags.create(tag="hairy")
+        bacon.tags.create(tag="fatty")
+        eggplant.tags.create(tag="purple")
+        TaggedItem.objects.create(content_object=quartz, tag="shiny")
+        TaggedItem.objects.create(content_object=quartz, tag="clear")
+        gone = Mineral.objects.create(name="Gone", hardness=1)
+        TaggedItem.objects.create(content_object=gone, tag="lost")
+        gone.delete()
+
+        ContentType.objects.get_for_models(Animal, Vegetable, Mineral)
+        tags = []
+        def load():
+            tags.extend(load_generic_foreign_keys(TaggedItem.objects.all()))
+        # One query for the tags, and one for each of the three models.
+        self.assertNumQueries(4, load)
+        objects = {}
+        def access():
+            objects.update([(t.tag, t.content_object) for t in tags])
+        self.assertNumQueries(0, access)
+        self.assertEqual(objects, {
+            "clear": quartz,
+            "fatty": bacon,
+            "hairy": lion,
+            "lost": None,
+            "purple": eggplant,
+            "shiny": quartz,
+        })
+
+        # Only the named generic foreign keys are loaded.
+        Comparison.objects.create(first_obj=lion, other_obj=bacon,
+                                  comparative="tastier")
+        comparisons = load_generic_foreign_keys(Comparison.objects.all(), "other_obj")
+        self.assertNumQueries(0, lambda: comparisons[0].other_obj)
+        self.assertNumQueries(1, lambda: comparisons[0].first_obj)
+        self.assertEqual(comparisons[0].other_obj, bacon)
+
+        self.assertEqual(load_generic_foreign_keys(TaggedItem.objects.none()), [])
+
     def test_generic_inline_formsets(self):
         GenericFormSet = generic_inlineformset_factory(TaggedItem, extra=1)
         formset = GenericFormSet()
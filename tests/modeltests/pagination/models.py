@@ -15,3 +15,7 @@ class Article(models.Model):
 
     def __unicode__(self):
         return self.headline
+
+
+class Reading(models.Model):
+    value = models.FloatField()
@@ -1,10 +1,12 @@
 from datetime import datetime
 from operator import attrgetter
 
-from django.core.paginator import Paginator, InvalidPage, EmptyPage
+from django.core.paginator import (Paginator, EstimatedCountPaginator,
+    UncountedPaginator, KeysetPaginator, InvalidPage, InvalidCursor, EmptyPage)
+from django.core.exceptions import ImproperlyConfigured
 from django.test import TestCase
 
-from models import Article
+from models import Article, Reading
 
 
 class CountContainer(object):
@@ -15,6 +17,10 @@ class LenContainer(object):
     def __len__(self):
         return 42
 
+class FixedEstimatePaginator(EstimatedCountPaginator):
+    def get_estimate(self):
+        return 1000
+
 class PaginationTests(TestCase):
     def setUp(self):
         # Prepare a list of objects for pagination.
@@ -130,3 +136,164 @@ class PaginationTests(TestCase):
         self.assertEqual(42, paginator.count)
         self.assertEqual(5, paginator.num_pages)
         self.assertEqual([1, 2, 3, 4, 5], paginator.page_range)
+
+    def test_estimated_count(self):
+        # Without an estimate from the database, objects are counted.
+        paginator = EstimatedCountPaginator(Article.objects.all(), 5,
+                                            estimate_threshold=0)
+        self.assertEqual(None, paginator.get_estimate())
+        self.assertEqual(9, paginator.count)
+        self.assertFalse(paginator.is_estimate)
+
+        paginator = FixedEstimatePaginator(Article.objects.all(), 5,
+                                           estimate_threshold=500)
+        self.assertEqual(1000, paginator.count)
+        self.assertTrue(paginator.is_estimate)
+        self.assertEqual(200, paginator.num_pages)
+        paginator = FixedEstimatePaginator(Article.objects.all(), 5,
+                                           estimate_threshold=5000)
+        self.assertEqual(9, paginator.count)
+        self.assertFalse(paginator.is_estimate)
+
+        # Filtered or sliced querysets can't be estimated.
+        for object_list in (Article.objects.filter(headline='Article 1'),
+                            Article.objects.all()[:3],
+                            Article.objects.distinct(),
+                            range(10)):
+            paginator = EstimatedCountPaginator(object_list, 5)
+            self.assertEqual(None, paginator.get_estimate())
+
+    def test_uncounted(self):
+        paginator = UncountedPaginator(Article.objects.all(), 5)
+        self.assertEqual(None, paginator.count)
+        self.assertEqual(None, paginator.num_pages)
+        self.assertNumQueries(1, paginator.page, 1)
+        p = paginator.page(1)
+        self.assertEqual(u"<Page 1>", unicode(p))
+        # The page is a QuerySet that doesn't hit the database again.
+        self.assertNumQueries(0, list, p.object_list)
+        self.assertQuerysetEqual(p.object_list, [
+                "<Article: Article 1>",
+                "<Article: Article 2>",
+                "<Article: Article 3>",
+                "<Article: Article 4>",
+                "<Article: Article 5>"
+            ]
+        )
+        self.assertTrue(p.has_next())
+        self.assertFalse(p.has_previous())
+        self.assertEqual(1, p.start_index())
+        self.assertEqual(5, p.end_index())
+
+        p = paginator.page(2)
+        self.assertEqual(4, len(p.object_list))
+        self.assertFalse(p.has_next())
+        self.assertTrue(p.has_previous())
+        self.assertEqual(6, p.start_index())
+        self.assertEqual(9, p.end_index())
+        self.assertRaises(EmptyPage, paginator.page, 3)
+        self.assertRaises(EmptyPage, paginator.page, 0)
+        self.assertRaises(InvalidPage, paginator.page, 'abc')
+
+        # Orphans are added to the last page.
+        paginator = UncountedPaginator(Article.objects.all(), 5, orphans=4)
+        p = paginator.page(1)
+        self.assertEqual(9, len(p.object_list))
+        self.assertFalse(p.has_next())
+        paginator = UncountedPaginator(Article.objects.all(), 5, orphans=3)
+        self.assertTrue(paginator.page(1).has_next())
+
+        # Lists can be paginated too.
+        paginator = UncountedPaginator(range(1, 11), 5)
+        p = paginator.page(2)
+        self.assertEqual([6, 7, 8, 9, 10], p.object_list)
+        self.assertFalse(p.has_next())
+
+        paginator = UncountedPaginator([], 5)
+        p = paginator.page(1)
+        self.assertEqual(0, p.start_index())
+        self.assertEqual(0, p.end_index())
+        self.assertFalse(p.has_other_pages())
+        paginator = UncountedPaginator([], 5, allow_empty_first_page=False)
+        self.assertRaises(EmptyPage, paginator.page, 1)
+
+    def test_keyset(self):
+        # All the articles have the same date, so the primary key breaks ties.
+        paginator = KeysetPaginator(Article.objects.all(), 4, ordering=['-pub_date', 'pk'])
+        self.assertEqual(None, paginator.count)
+        self.assertEqual(None, paginator.num_pages)
+        p = paginator.page()
+        self.assertEqual(u"<Page 1>", unicode(p))
+        self.assertEqual([u"Article 1", u"Article 2", u"Article 3", u"Article 4"],
+                         [a.headline for a in p.object_list])
+        self.assertTrue(p.has_next())
+        self.assertFalse(p.has_previous())
+        self.assertEqual(None, p.previous_page_number())
+
+        self.assertNumQueries(1, paginator.page, p.next_page_number())
+        p = paginator.page(p.next_page_number())
+        self.assertEqual([u"Article 5", u"Article 6", u"Article 7", u"Article 8"],
+                         [a.headline for a in p.object_list])
+        self.assertTrue(p.has_next())
+        self.assertTrue(p.has_previous())
+        p = paginator.page(p.next_page_number())
+        self.assertEqual([u"Article 9"], [a.headline for a in p.object_list])
+        self.assertFalse(p.has_next())
+        self.assertEqual(None, p.next_page_number())
+
+        # Going back.
+        p = paginator.page(p.previous_page_number())
+        self.assertEqual([u"Article 5", u"Article 6", u"Article 7", u"Article 8"],
+                         [a.headline for a in p.object_list])
+        self.assertTrue(p.has_next())
+        self.assertTrue(p.has_previous())
+        p = paginator.page(p.previous_page_number())
+        self.assertEqual([u"Article 1", u"Article 2", u"Article 3", u"Article 4"],
+                         [a.headline for a in p.object_list])
+        self.assertFalse(p.has_previous())
+
+        # Every page can be reached from its cursor.
+        cursors = list(paginator.page_cursors())
+        self.assertEqual(3, len(cursors))
+        self.assertEqual([u"Article 1", u"Article 5", u"Article 9"],
+                         [paginator.page(c).object_list[0].headline for c in cursors])
+
+        # Descending on a unique field.
+        paginator = KeysetPaginator(Article.objects.all(), 5, ordering=['-headline'])
+        p = paginator.page(paginator.page(1).next_page_number())
+        self.assertEqual([u"Article 4", u"Article 3", u"Article 2", u"Article 1"],
+                         [a.headline for a in p.object_list])
+
+    def test_keyset_floats(self):
+        # These values only differ after the 12th significant digit.
+        for i in range(4):
+            Reading.objects.create(value=1 / 3.0 + i * 1e-13)
+        paginator = KeysetPaginator(Reading.objects.order_by('value'), 2)
+        first = paginator.page()
+        second = paginator.page(first.next_page_number())
+        self.assertEqual([r.value for r in list(first.object_list) + list(second.object_list)],
+                         sorted(Reading.objects.values_list('value', flat=True)))
+        self.assertEqual(list(first.object_list),
+                         list(paginator.page(second.previous_page_number()).object_list))
+
+    def test_keyset_invalid_ordering(self):
+        self.assertRaises(ImproperlyConfigured, KeysetPaginator,
+                          Article.objects.all(), 4, ordering=['headline__author'])
+        self.assertRaises(ImproperlyConfigured, KeysetPaginator,
+                          Article.objects.all(), 4, ordering=['author'])
+
+    def test_keyset_invalid_cursors(self):
+        paginator = KeysetPaginator(Article.objects.order_by('headline'), 4)
+        cursor = paginator.page().next_page_number()
+        payload, signature = cursor.split('.')
+        self.assertRaises(InvalidCursor, paginator.page, 'frog')
+        self.assertRaises(InvalidCursor, paginator.page, payload + '.' + '0' * 40)
+        self.assertRaises(InvalidCursor, paginator.page, u'\xe9')
+        # Cursors only work with the paginator ordering they were made by.
+        other = KeysetPaginator(Article.objects.order_by('pub_date'), 4)
+        self.assertRaises(InvalidCursor, other.page, cursor)
+
+        # The cursor of a page that became empty.
+        cursor = paginator.page(cursor).next_page_number()
+        Article.objects.filter(headline='Article 9').delete()
+        self.assertRaises(EmptyPage, paginator.page, cursor)
@@ -6,4 +6,7 @@ class Parent(models.Model):
 
 class Child(models.Model):
     parent = models.ForeignKey(Parent, editable=False)
-    name = models.CharField(max_length=30, blank=True)
\ No newline at end of file
+    name = models.CharField(max_length=30, blank=True)
+
+class Event(models.Model):
+    date = models.DateField()
@@ -1,8 +1,21 @@
+import warnings
+
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.filterspecs import FilterSpec
+from django.contrib.admin.templatetags.admin_list import (date_hierarchy,
+    items_for_result, result_columns)
+from django.contrib.admin.search import (PrefixSearch, MySQLFullTextSearch,
+    PostgreSQLFullTextSearch)
+from django.contrib.admin.util import queryset_cache_key
 from django.contrib.admin.views.main import ChangeList
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.paginator import UncountedPaginator
+from django.db import DatabaseError
 from django.template import Context, Template
 from django.test import TransactionTestCase
-from regressiontests.admin_changelist.models import Child, Parent
+from regressiontests.admin_changelist.models import Child, Event, Parent
 
 class ChangeListTests(TransactionTestCase):
     def test_select_related_preserved(self):
@@ -71,6 +84,367 @@ class ChangeListTests(TransactionTestCase):
         self.failIf('<td>%s</td>' % editable_name_field == -1,
             'Failed to find "name" list_editable field in: %s' % table_output)
 
+    def test_uncounted_paginator(self):
+        """
+        The changelist can be paginated without counting the objects.
+        """
+        parent = Parent.objects.create(name='parent')
+        for i in range(25):
+            Child.objects.create(name='name %s' % i, parent=parent)
+        m = ChildAdmin(Child, admin.site)
+        m.paginator = UncountedPaginator
+        m.list_per_page = 10
+
+        request = MockRequest()
+        request.GET = {'p': '1'}
+        def changelist():
+            return ChangeList(request, Child, m.list_display, m.list_display_links,
+                    m.list_filter, m.date_hierarchy, m.search_fields,
+                    m.list_select_related, m.list_per_page, m.list_editable, m)
+        # A single query fetches the page and tells whether there is another.
+        self.assertNumQueries(1, changelist)
+        cl = changelist()
+        self.assertEqual(cl.result_count, None)
+        self.assertEqual(cl.full_result_count, None)
+        self.assertEqual(len(cl.result_list), 10)
+        self.assertTrue(cl.multi_page)
+        self.assertTrue(cl.has_next_page)
+        self.assertFalse(cl.can_show_all)
+
+        template = Template('{% load admin_list %}{% pagination cl %}')
+        output = template.render(Context({'cl': cl}))
+        self.assertTrue('?p=0' in output)
+        self.assertTrue('<span class="this-page">2</span>' in output)
+        self.assertTrue('?p=2' in output)
+        self.assertFalse('?p=3' in output)
+        self.assertFalse('childs' in output)
+
+        request.GET = {'p': '2'}
+        cl = changelist()
+        self.assertEqual(len(cl.result_list), 5)
+        self.assertTrue(cl.multi_page)
+        self.assertFalse(cl.has_next_page)
+
+    def test_search_backends(self):
+        parent = Parent.objects.create(name='parent')
+        for name in ('apple', 'pineapple', 'apricot', 'banana'):
+            Child.objects.create(name=name, parent=parent)
+        m = ChildAdmin(Child, admin.site)
+        m.search_fields = ['name']
+
+        def search(query):
+            request = MockRequest()
+            request.GET = {'q': query}
+            cl = ChangeList(request, Child, m.list_display, m.list_display_links,
+                    m.list_filter, m.date_hierarchy, m.search_fields,
+                    m.list_select_related, m.list_per_page, m.list_editable, m)
+            return sorted([c.name for c in cl.result_list])
+
+        self.assertEqual(search('apple'), ['apple', 'pineapple'])
+        m.search_backend = PrefixSearch
+        self.assertEqual(search('ap'), ['apple', 'apricot'])
+        # Prefixes on search fields still select their lookup.
+        m.search_fields = ['=name']
+        self.assertEqual(search('ap'), [])
+        m.search_fields = ['name']
+
+        class LimitedSearch(PrefixSearch):
+            max_terms = 1
+            min_term_length = 2
+        m.search_backend = LimitedSearch
+        self.assertEqual(search('ap ri'), ['apple', 'apricot'])
+        self.assertEqual(search('a ap'), ['apple', 'apricot'])
+        self.assertEqual(len(search('a')), 4)
+
+    def test_full_text_search_backends(self):
+        m = ChildAdmin(Child, admin.site)
+        backend = MySQLFullTextSearch(m)
+        qs = backend.search(Child.objects.all(), ['name'], "app* +ban")
+        lookup = qs.query.where.children[0].children[0].children[0]
+        self.assertEqual((lookup[1], lookup[3]), ('search', u'+app* +ban*'))
+
+        backend = PostgreSQLFullTextSearch(m)
+        qs = backend.search(Child.objects.all(), ['name'], "app* ban")
+        where = qs.query.where.children[0]
+        self.assertTrue('to_tsvector(%s, coalesce("admin_changelist_child"."name", \'\')) @@ to_tsquery(%s, %s)' in where.sqls[0])
+        self.assertEqual(where.params, ['simple', 'simple', u'app:* & ban:*'])
+        backend.vector_column = 'search'
+        qs = backend.search(Child.objects.all(), ['name'], "ban")
+        self.assertTrue('"admin_changelist_child"."search" @@' in qs.query.where.children[0].sqls[0])
+        backend.vector_column = None
+        self.assertRaises(ImproperlyConfigured, backend.search,
+                          Child.objects.all(), ['parent__name'], "ban")
+
+    def test_search_timeout(self):
+        """
+        A search cancelled by its timeout shows an empty list.
+        """
+        parent = Parent.objects.create(name='parent')
+        Child.objects.create(name='name', parent=parent)
+        timeouts = []
+        class TimeoutSearch(PrefixSearch):
+            timeout = 1
+            def set_timeout(self, using, timeout):
+                timeouts.append(timeout)
+                return True
+            def is_timeout(self, using, exception):
+                return 'cancelled_by_timeout' in str(exception)
+            def filter(self, queryset, search_fields, terms):
+                # Fails like a cancelled query would.
+                return queryset.extra(where=['cancelled_by_timeout = 1'])
+        m = ChildAdmin(Child, admin.site)
+        m.search_fields = ['name']
+        m.search_backend = TimeoutSearch
+        request = MockRequest()
+        request.GET = {'q': 'name'}
+        cl = ChangeList(request, Child, m.list_display, m.list_display_links,
+                m.list_filter, m.date_hierarchy, m.search_fields,
+                m.list_select_related, m.list_per_page, m.list_editable, m)
+        self.assertTrue(cl.search_timed_out)
+        self.assertEqual(list(cl.result_list), [])
+        self.assertEqual(cl.result_count, 0)
+        self.assertEqual(timeouts, [1, None])
+
+        # Other errors aren't mistaken for a timeout.
+        TimeoutSearch.is_timeout = lambda self, using, exception: False
+        self.assertRaises(DatabaseError, ChangeList, request, Child, m.list_display,
+                m.list_display_links, m.list_filter, m.date_hierarchy, m.search_fields,
+                m.list_select_related, m.list_per_page, m.list_editable, m)
+        self.assertEqual(timeouts, [1, None, 1, None])
+
+    def test_related_filter_choices(self):
+        """
+        A related filter lists the related objects with a single query, or
+        only the ones that are referred to with list_filter_related_only, up
+        to list_filter_max_choices of them, and offers to filter on any other
+        value beyond that.
+        """
+        parents = [Parent.objects.create(name='parent %d' % i) for i in range(4)]
+        for parent in parents[:3]:
+            Child.objects.create(name='child', parent=parent)
+        m = ChildAdmin(Child, admin.site)
+        m.list_filter = ['parent']
+        request = MockRequest()
+        specs = []
+        def create_spec():
+            specs.append(FilterSpec.create(Child._meta.get_field('parent'),
+                request, {}, Child, m))
+        self.assertNumQueries(1, create_spec)
+        self.assertEqual(specs[-1].lookup_choices,
+                         [(p.pk, u'Parent object') for p in parents])
+
+        m.list_filter_related_only = True
+        self.assertNumQueries(1, create_spec)
+        spec = specs[-1]
+        self.assertEqual(spec.lookup_choices,
+                         [(p.pk, u'Parent object') for p in parents[:3]])
+        self.assertFalse(spec.has_more)
+
+        m.list_filter_max_choices = 2
+        request.GET = {'q': 'child'}
+        cl = ChangeList(request, Child, m.list_display, m.list_display_links,
+                m.list_filter, m.date_hierarchy, m.search_fields,
+                m.list_select_related, m.list_per_page, m.list_editable, m)
+        spec = cl.filter_specs[0]
+        self.assertEqual(len(spec.lookup_choices), 2)
+        self.assertTrue(spec.has_more)
+        self.assertTrue(spec.has_output())
+        more = spec.more(cl)
+        self.assertEqual(more['name'], 'parent__id__exact')
+        self.assertEqual(more['params'], [('q', 'child')])
+        self.assertEqual(more['lookup_url'], None)
+        output = Template('{% load admin_list %}{% admin_list_filter cl spec %}').render(
+            Context({'cl': cl, 'spec': spec}))
+        self.assertTrue('<input type="hidden" name="q" value="child" />' in output)
+        self.assertTrue('name="parent__id__exact" id="id_filter_parent__id__exact"' in output)
+
+    def test_filter_choices_cache(self):
+        """
+        The choices of the filters are cached for list_filter_cache_timeout
+        seconds, per query of the change list.
+        """
+        parent = Parent.objects.create(name='parent')
+        Child.objects.create(name='child', parent=parent)
+        m = ChildAdmin(Child, admin.site)
+        m.list_filter_cache_timeout = 60
+        field = Child._meta.get_field('name')
+        request = MockRequest()
+        specs = []
+        def create_spec():
+            specs.append(FilterSpec.create(field, request, {}, Child, m))
+        try:
+            self.assertNumQueries(1, create_spec)
+            Child.objects.create(name='other', parent=parent)
+            self.assertNumQueries(0, create_spec)
+            self.assertEqual(specs[-1].lookup_choices, [u'child'])
+            # Another query of the admin has its own choices.
+            m.queryset = lambda request: Child.objects.filter(parent=parent)
+            self.assertNumQueries(1, create_spec)
+            self.assertEqual(specs[-1].lookup_choices, [u'child', u'other'])
+            # The key of a query with non-ASCII parameters.
+            m.queryset = lambda request: Child.objects.exclude(name=u'caf\xe9')
+            self.assertNumQueries(1, create_spec)
+            self.assertNumQueries(0, create_spec)
+        finally:
+            cache.clear()
+
+    def test_result_columns(self):
+        """
+        The columns of the change list are planned once, and each kind of
+        column is displayed like before.
+        """
+        parent = Parent.objects.create(name='parent')
+        children = [Child.objects.create(name='<b>%d</b>' % i, parent=parent)
+                    for i in range(2)]
+        def has_name(obj):
+            return bool(obj.name)
+        has_name.boolean = True
+        class PlannedChildAdmin(ChildAdmin):
+            list_display = ['id', 'name', has_name, 'upper_name', '__str__']
+            def upper_name(self, obj):
+                return obj.name.upper()
+            upper_name.allow_tags = True
+        m = PlannedChildAdmin(Child, admin.site)
+        cl = ChangeList(MockRequest(), Child, m.list_display, m.list_display_links,
+                m.list_filter, m.date_hierarchy, m.search_fields,
+                m.list_select_related, m.list_per_page, m.list_editable, m)
+        columns = result_columns(cl)
+        self.assertTrue(result_columns(cl) is columns)
+        self.assertEqual([c.is_link for c in columns],
+                         [False, True, False, False, False, False])
+        row = list(items_for_result(cl, children[0], None))
+        self.assertEqual(row[1], u'<th><a href="%d/">%d</a></th>' % (children[0].pk, children[0].pk))
+        self.assertEqual(row[2], u'<td>&lt;b&gt;0&lt;/b&gt;</td>')
+        self.assertTrue('icon-yes.gif' in row[3])
+        self.assertEqual(row[4], u'<td><B>0</B></td>')
+        self.assertEqual(row[5], u'<td>Child object</td>')
+
+    def test_select_related_planning(self):
+        """
+        The change list selects the related objects that the rows display:
+        those of list_display and list_select_related_paths, and, with
+        list_select_related_learn, those that the rows of a previous change
+        list loaded one at a time.
+        """
+        parent = Parent.objects.create(name='parent')
+        for i in range(3):
+            Child.objects.create(name='child %d' % i, parent=parent)
+        class ParentNameAdmin(admin.ModelAdmin):
+            list_display = ['name', 'parent_name']
+            def parent_name(self, obj):
+                return obj.parent.name
+        m = ParentNameAdmin(Child, admin.site)
+        def change_list():
+            cl = ChangeList(MockRequest(), Child, m.list_display, m.list_display_links,
+                m.list_filter, m.date_hierarchy, m.search_fields,
+                m.list_select_related, m.list_per_page, m.list_editable, m)
+            cl.formset = None
+            return cl
+        cl = change_list()
+        self.assertFalse(cl.query_set.query.select_related)
+        render = Template('{% load admin_list %}{% result_list cl %}').render
+        def render_and_record():
+            cl = change_list()
+            render(Context({'cl': cl}))
+            cl.record_select_related()
+        old_debug = settings.DEBUG
+        settings.DEBUG = True
+        warnings.simplefilter('error', RuntimeWarning)
+        try:
+            self.assertRaises(RuntimeWarning, render_and_record)
+        finally:
+            settings.DEBUG = old_debug
+            warnings.resetwarnings()
+            warnings.simplefilter("ignore", PendingDeprecationWarning)
+        # Only a warning by default.
+        self.assertFalse(change_list().query_set.query.select_related)
+
+        # Learning doesn't override the select_related() of queryset(), even
+        # one that doesn't select the parents.
+        m.list_select_related_learn = True
+        m.queryset = lambda request: Child.objects.select_related('name')
+        render_and_record()
+        self.assertEqual(m._learned_select_related_paths, set())
+        del m.queryset
+        self.assertFalse(change_list().query_set.query.select_related)
+
+        # Once learned, the next change lists select the parents with the
+        # children.
+        render_and_record()
+        cl = change_list()
+        self.assertEqual(cl.query_set.query.select_related, {'parent': {}})
+        self.assertNumQueries(1, lambda: render(Context({'cl': cl})))
+
+        # A ForeignKey of list_display selects what select_related() would...
+        m = admin.ModelAdmin(Child, admin.site)
+        m.list_display = ['name', 'parent']
+        self.assertTrue(change_list().query_set.query.select_related is True)
+        # ... with the learned relations added to it...
+        m._learned_select_related_paths.add('parent__other')
+        self.assertEqual(change_list().get_select_related_paths(),
+                         ['parent', 'parent__other'])
+        # ... unless the relations to select are declared.
+        m = ChildAdmin(Child, admin.site)
+        m.list_select_related_paths = ['parent.parent']
+        self.assertEqual(change_list().get_select_related_paths(), ['parent', 'parent__parent'])
+
+    def test_queryset_cache_key(self):
+        key = queryset_cache_key('test', Child.objects.filter(name=u'caf\xe9'))
+        self.assertTrue(key.startswith('django.contrib.admin.test.admin_changelist.child.'))
+        self.assertNotEqual(key, queryset_cache_key('test', Child.objects.filter(name=u'cafe')))
+        self.assertEqual(key, queryset_cache_key('test', Child.objects.filter(name=u'caf\xe9')))
+        self.assertEqual(queryset_cache_key('test', Child.objects.filter(pk__in=[])), None)
+
+    def test_date_hierarchy(self):
+        """
+        The date hierarchy skips the levels with a single choice, and caches
+        the dates for date_hierarchy_cache_timeout seconds.
+        """
+        for date in ('2010-01-01', '2010-01-20', '2010-02-03'):
+            Event.objects.create(date=date)
+        m = EventAdmin(Event, admin.site)
+        request = MockRequest()
+        def hierarchy(GET):
+            request.GET = GET
+            cl = ChangeList(request, Event, m.list_display, m.list_display_links,
+                    m.list_filter, m.date_hierarchy, m.search_fields,
+                    m.list_select_related, m.list_per_page, m.list_editable, m)
+            result = []
+            def render():
+                result.append(date_hierarchy(cl))
+            return cl, render, result
+        # A single year: its months, from a single query.
+        cl, render, result = hierarchy({})
+        self.assertNumQueries(1, render)
+        self.assertEqual([c['title'] for c in result[0]['choices']],
+                         [u'January 2010', u'February 2010'])
+        # A single month: its days.
+        cl, render, result = hierarchy({'date__year': '2010', 'date__month': '1'})
+        self.assertNumQueries(1, render)
+        self.assertEqual([c['title'] for c in result[0]['choices']],
+                         [u'January 1', u'January 20'])
+        Event.objects.create(date='2011-05-05')
+        cl, render, result = hierarchy({})
+        render()
+        self.assertEqual([c['title'] for c in result[0]['choices']], ['2010', '2011'])
+        cl, render, result = hierarchy({'date__year': '2011'})
+        self.assertNumQueries(2, render)
+        self.assertEqual([c['title'] for c in result[0]['choices']], [u'May 5'])
+        self.assertTrue('date__day=5' in result[0]['choices'][0]['link'])
+
+        m.date_hierarchy_cache_timeout = 60
+        try:
+            cl, render, result = hierarchy({})
+            self.assertNumQueries(1, render)
+            Event.objects.create(date='2012-01-01')
+            self.assertNumQueries(0, render)
+            self.assertEqual(result[0], result[1])
+        finally:
+            cache.clear()
+
+class EventAdmin(admin.ModelAdmin):
+    date_hierarchy = 'date'
+
 class ChildAdmin(admin.ModelAdmin):
     list_display = ['name', 'parent']
     def queryset(self, request):
@@ -123,3 +123,20 @@ class InlineWeakness(admin.TabularInline):
     extra = 1
 
 admin.site.register(Fashionista, inlines=[InlineWeakness])
+
+# Models for paginated inlines
+
+class Shelf(models.Model):
+    name = models.CharField(max_length=50)
+
+class Volume(models.Model):
+    shelf = models.ForeignKey(Shelf)
+    title = models.CharField(max_length=50)
+    owner = models.ForeignKey(Person)
+
+class VolumeInline(admin.TabularInline):
+    model = Volume
+    per_page = 2
+    extra = 1
+
+admin.site.register(Shelf, inlines=[VolumeInline])
@@ -7,6 +7,7 @@ from models import Holder, Inner, InnerInline
 from models import Holder2, Inner2, Holder3, Inner3
 from models import Person, OutfitItem, Fashionista
 from models import Teacher, Parent, Child
+from models import Shelf, Volume
 
 
 class TestInline(TestCase):
@@ -69,6 +70,79 @@ class TestInline(TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertEqual(len(Fashionista.objects.filter(person__firstname='Imelda')), 1)
 
+class TestPaginatedInline(TestCase):
+    fixtures = ['admin-views-users.xml']
+
+    def setUp(self):
+        self.shelf = Shelf.objects.create(name='Fiction')
+        self.owner = Person.objects.create(firstname='Imelda')
+        self.volumes = [Volume.objects.create(shelf=self.shelf, owner=self.owner,
+                                              title='Volume %d' % i)
+                        for i in range(5)]
+        self.change_url = '/test_admin/admin/admin_inlines/shelf/%i/' % self.shelf.id
+        result = self.client.login(username='super', password='secret')
+        self.failUnlessEqual(result, True)
+
+    def tearDown(self):
+        self.client.logout()
+
+    def get_volumes(self, response):
+        formset = response.context['inline_admin_formsets'][0].formset
+        return [form.instance for form in formset.initial_forms]
+
+    def test_first_page(self):
+        "Only per_page objects of a paginated inline are edited at first."
+        response = self.client.get(self.change_url)
+        self.assertEqual(self.get_volumes(response), self.volumes[:2])
+        self.assertContains(response, '1-2 of 5')
+        self.assertContains(response, 'Show 2 more')
+        self.assertContains(response, 'href="?volume_set-offset=2"')
+        self.assertNotContains(response, 'Previous')
+
+    def test_other_pages(self):
+        response = self.client.get(self.change_url, {'volume_set-offset': 4})
+        self.assertEqual(self.get_volumes(response), self.volumes[4:])
+        self.assertContains(response, '5-5 of 5')
+        self.assertContains(response, 'href="?volume_set-offset=2"')
+        self.assertNotContains(response, 'Next')
+
+        response = self.client.get(self.change_url, {'volume_set-offset': 1, 'volume_set-limit': 3})
+        self.assertEqual(self.get_volumes(response), self.volumes[1:4])
+        self.assertContains(response, 'Show 1 more')
+
+        response = self.client.get(self.change_url, {'volume_set-offset': 'x'})
+        self.assertEqual(self.get_volumes(response), self.volumes[:2])
+
+    def test_post_page(self):
+        "The objects a page was rendered with are saved, even if the page moved since."
+        self.volumes[0].delete()
+        data = {
+            'name': 'Fiction',
+            'volume_set-TOTAL_FORMS': 2,
+            'volume_set-INITIAL_FORMS': 2,
+            'volume_set-MAX_NUM_FORMS': 0,
+            'volume_set-0-id': self.volumes[2].id,
+            'volume_set-0-shelf': self.shelf.id,
+            'volume_set-0-title': 'Third',
+            'volume_set-0-owner': self.owner.id,
+            'volume_set-1-id': self.volumes[3].id,
+            'volume_set-1-shelf': self.shelf.id,
+            'volume_set-1-title': 'Fourth',
+            'volume_set-1-owner': self.owner.id,
+        }
+        response = self.client.post(self.change_url + '?volume_set-offset=2', data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual([v.title for v in Volume.objects.order_by('id')],
+                         ['Volume 1', 'Third', 'Fourth', 'Volume 4'])
+
+        # An invalid primary key is a form error rather than a crash.
+        data['volume_set-0-id'] = 'x'
+        data['volume_set-0-title'] = 'Tampered'
+        response = self.client.post(self.change_url + '?volume_set-offset=2', data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Volume.objects.get(pk=self.volumes[2].pk).title, 'Third')
+
+
 class TestInlineMedia(TestCase):
     fixtures = ['admin-views-users.xml']
 
@@ -533,6 +533,11 @@ class Plot(models.Model):
     def __unicode__(self):
         return self.name
 
+class Reply(models.Model):
+    "A model with a ForeignKey to itself."
+    text = models.CharField(max_length=100)
+    reply_to = models.ForeignKey('self', null=True, related_name='replies')
+
 class PlotDetails(models.Model):
     details = models.CharField(max_length=100)
     plot = models.OneToOneField(Plot)
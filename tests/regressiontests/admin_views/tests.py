@@ -9,9 +9,10 @@ from django.contrib.auth.models import User, Permission, UNUSABLE_PASSWORD
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.admin.models import LogEntry, DELETION
 from django.contrib.admin.sites import LOGIN_FORM_KEY
-from django.contrib.admin.util import quote
+from django.contrib.admin.util import get_deleted_summary, quote
 from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
 from django.forms.util import ErrorList
+from django.http import HttpRequest
 import django.template.context
 from django.test import TestCase
 from django.utils import formats
@@ -26,7 +27,7 @@ from models import Article, BarAccount, CustomArticle, EmptyModel, \
     FooAccount, Gallery, ModelWithStringPrimaryKey, \
     Person, Persona, Picture, Podcast, Section, Subscriber, Vodcast, \
     Language, Collector, Widget, Grommet, DooHickey, FancyDoodad, Whatsit, \
-    Category, Post, Plot, FunkyTag
+    Category, Post, Plot, FunkyTag, ExternalSubscriber, Villain, Reply
 
 
 class AdminViewBasicTest(TestCase):
@@ -1480,6 +1481,100 @@ class AdminActionsTest(TestCase):
         response = self.client.post('/test_admin/admin/admin_views/subscriber/', delete_confirmation_data)
         self.failUnlessEqual(Subscriber.objects.count(), 0)
 
+    def test_model_admin_summarized_delete_action(self):
+        """
+        Above delete_selected_summary_threshold, the delete action shows how
+        many objects of each model will be deleted, and deletes the objects
+        in batches, with a query to log each batch.
+        """
+        from django.contrib.admin import site
+        model_admin = site._registry[Subscriber]
+        model_admin.delete_selected_summary_threshold = 1
+        model_admin.delete_selected_batch_size = 1
+        try:
+            action_data = {
+                ACTION_CHECKBOX_NAME: [1],
+                'action' : 'delete_selected',
+                'select_across': '1',
+                'index': 0,
+            }
+            confirmation = self.client.post('/test_admin/admin/admin_views/subscriber/', action_data)
+            self.assertContains(confirmation, "<li>Subscribers: 2</li>")
+            self.assertContains(confirmation, "<li>External subscriber: 1</li>")
+            self.assertContains(confirmation, '<input type="hidden" name="select_across" value="1" />')
+            # The whole queryset is selected, so only the selection of the
+            # page is posted back.
+            self.failUnless(confirmation.content.count(ACTION_CHECKBOX_NAME) == 1)
+            delete_confirmation_data = {
+                ACTION_CHECKBOX_NAME: [1],
+                'action' : 'delete_selected',
+                'select_across': '1',
+                'post': 'yes',
+            }
+            response = self.client.post('/test_admin/admin/admin_views/subscriber/', delete_confirmation_data)
+            self.assertRedirects(response, '/test_admin/admin/admin_views/subscriber/')
+            self.failUnlessEqual(Subscriber.objects.count(), 0)
+            self.failUnlessEqual(ExternalSubscriber.objects.count(), 0)
+            logged = LogEntry.objects.filter(action_flag=DELETION).order_by('object_id')
+            self.assertEqual([(e.object_id, e.object_repr) for e in logged],
+                             [(u'1', u'John Doe (john@example.org)'),
+                              (u'2', u'Max Mustermann (max@example.org)')])
+        finally:
+            del model_admin.delete_selected_summary_threshold
+            del model_admin.delete_selected_batch_size
+
+    def test_delete_in_batches(self):
+        """
+        Objects that nothing refers to are deleted by primary key, with a
+        transaction per batch.
+        """
+        from django.contrib.admin import site
+        from django.contrib.admin.actions import can_delete_directly, delete_in_batches
+        model_admin = site._registry[EmptyModel]
+        model_admin.delete_selected_batch_size = 2
+        for i in range(3):
+            EmptyModel.objects.create()
+        request = HttpRequest()
+        request.user = User.objects.get(username='super')
+        self.assertTrue(can_delete_directly(EmptyModel))
+        self.assertFalse(can_delete_directly(Subscriber))
+        try:
+            # Finding the objects, then loading, logging and deleting each
+            # batch.
+            self.assertNumQueries(7, delete_in_batches, model_admin, request,
+                                  EmptyModel.objects.all())
+        finally:
+            del model_admin.delete_selected_batch_size
+        self.assertEqual(EmptyModel.objects.count(), 0)
+        self.assertEqual(LogEntry.objects.filter(action_flag=DELETION).count(), 3)
+
+    def test_deleted_summary(self):
+        """
+        The summary of the delete action counts multi-table inheritance
+        parents and the objects of generic relations, and tells when a cycle
+        of relations makes its counts a lower bound.
+        """
+        from django.contrib.admin import site
+        user = User.objects.get(username='super')
+        def summary(queryset):
+            counts, perms_needed, complete = get_deleted_summary(queryset, user, site)
+            return [(model.__name__, count) for model, count in counts], complete
+
+        self.assertEqual(summary(ExternalSubscriber.objects.all()),
+                         ([('ExternalSubscriber', 1), ('Subscriber', 1)], True))
+
+        villain = Villain.objects.create(name='villain')
+        plot = Plot.objects.create(name='plot', team_leader=villain, contact=villain)
+        FunkyTag.objects.create(content_object=plot, name='tag')
+        FunkyTag.objects.create(content_object=villain, name='other')
+        self.assertEqual(summary(Plot.objects.all()),
+                         ([('Plot', 1), ('FunkyTag', 1)], True))
+
+        first = Reply.objects.create(text='first')
+        Reply.objects.create(text='second', reply_to=first)
+        self.assertEqual(summary(Reply.objects.filter(pk=first.pk)),
+                         ([('Reply', 1)], False))
+
     def test_custom_function_mail_action(self):
         "Tests a custom action defined in a function"
         action_data = {
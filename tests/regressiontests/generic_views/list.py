@@ -82,6 +82,31 @@ class ListViewTests(TestCase):
         res = self.client.get('/list/authors/paginated/?page=frog')
         self.assertEqual(res.status_code, 404)
 
+    def test_keyset_paginated_queryset(self):
+        self._make_authors(100)
+        res = self.client.get('/list/authors/keyset/')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.context['authors']), 30)
+        self.assertEqual(res.context['is_paginated'], True)
+        self.assertEqual(res.context['paginator'].num_pages, None)
+        self.assertEqual(res.context['authors'][0].name, 'Author 00')
+        page = res.context['page_obj']
+        self.assertFalse(page.has_previous())
+
+        res = self.client.get('/list/authors/keyset/', {'page': page.next_page_number()})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.context['authors'][0].name, 'Author 30')
+        self.assertEqual(res.context['authors'][29].name, 'Author 59')
+        page = res.context['page_obj']
+        self.assertTrue(page.has_previous())
+
+        res = self.client.get('/list/authors/keyset/', {'page': page.previous_page_number()})
+        self.assertEqual(res.context['authors'][0].name, 'Author 00')
+        self.assertFalse(res.context['page_obj'].has_previous())
+
+        res = self.client.get('/list/authors/keyset/', {'page': 'frog'})
+        self.assertEqual(res.status_code, 404)
+
     def test_allow_empty_false(self):
         res = self.client.get('/list/authors/notempty/')
         self.assertEqual(res.status_code, 200)
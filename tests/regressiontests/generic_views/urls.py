@@ -1,4 +1,5 @@
 from django.conf.urls.defaults import *
+from django.core.paginator import KeysetPaginator
 from django.views.generic import TemplateView
 
 import views
@@ -101,6 +102,8 @@ urlpatterns = patterns('',
         views.AuthorList.as_view(paginate_by=30)),
     (r'^list/authors/paginated/(?P<page>\d+)/$',
         views.AuthorList.as_view(paginate_by=30)),
+    (r'^list/authors/keyset/$',
+        views.AuthorList.as_view(paginate_by=30, paginator_class=KeysetPaginator)),
     (r'^list/authors/notempty/$',
         views.AuthorList.as_view(allow_empty=False)),
     (r'^list/authors/template_name/$',
@@ -1,7 +1,8 @@
 import copy
 import pickle
 
-from django.http import QueryDict, HttpResponse, CompatCookie, BadHeaderError
+from django.http import (QueryDict, HttpResponse, StreamingHttpResponse,
+    CompatCookie, BadHeaderError)
 from django.utils import unittest
 
 class QueryDictTests(unittest.TestCase):
@@ -232,6 +233,42 @@ class HttpResponseTests(unittest.TestCase):
         self.assertRaises(BadHeaderError, r.__setitem__, 'test\rstr', 'test')
         self.assertRaises(BadHeaderError, r.__setitem__, 'test\nstr', 'test')
 
+class StreamingHttpResponseTests(unittest.TestCase):
+    def test_streaming_response(self):
+        r = StreamingHttpResponse(iter(['hello', u'caf\xe9']))
+        self.assertTrue(r.streaming)
+        self.assertFalse(HttpResponse().streaming)
+
+        # There is no content attribute; the stream must not be consumed.
+        self.assertRaises(AttributeError, getattr, r, 'content')
+        self.assertRaises(AttributeError, setattr, r, 'content', 'x')
+
+        # Iterating yields encoded bytestrings.
+        self.assertEqual(list(r), ['hello', 'caf\xc3\xa9'])
+
+    def test_streaming_content_can_be_wrapped(self):
+        r = StreamingHttpResponse(iter(['abc', 'def']))
+        r.streaming_content = (chunk.upper() for chunk in r.streaming_content)
+        self.assertEqual(''.join(r), 'ABCDEF')
+
+    def test_not_writable(self):
+        r = StreamingHttpResponse(iter(['abc']))
+        self.assertRaises(Exception, r.write, 'def')
+        self.assertRaises(Exception, r.tell)
+
+    def test_close_reaches_original_iterator(self):
+        class Closable(object):
+            closed = False
+            def __iter__(self):
+                return iter(['abc'])
+            def close(self):
+                self.closed = True
+        source = Closable()
+        r = StreamingHttpResponse(source)
+        r.streaming_content = (chunk for chunk in r.streaming_content)
+        r.close()
+        self.assertTrue(source.closed)
+
 class CookieTests(unittest.TestCase):
     def test_encode(self):
         """
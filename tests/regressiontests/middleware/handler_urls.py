@@ -0,0 +1,9 @@
+from django.conf.urls.defaults import patterns
+from django.http import HttpResponse
+
+def view(request):
+    return HttpResponse('view')
+
+urlpatterns = patterns('',
+    (r'^view/$', view),
+)
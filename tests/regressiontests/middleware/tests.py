@@ -1,8 +1,20 @@
 # -*- coding: utf-8 -*-
 
+import gzip
+import logging
+import shutil
+import tempfile
+import time
+from StringIO import StringIO
+
 from django.test import TestCase
-from django.http import HttpRequest
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
 from django.middleware.common import CommonMiddleware
+from django.middleware.gzip import GZipMiddleware
+from django.middleware.http import ConditionalGetMiddleware
+from django.core.handlers.base import BaseHandler
+from django.core.management import call_command
+from django.middleware.profile import ProfileMiddleware, get_profile_token, load_stats
 from django.conf import settings
 
 class CommonMiddlewareTest(TestCase):
@@ -246,3 +258,273 @@ class CommonMiddlewareTest(TestCase):
       self.assertEquals(r.status_code, 301)
       self.assertEquals(r['Location'],
                         'http://www.testserver/middleware/customurlconf/slash/')
+
+
+class StreamingMiddlewareTest(TestCase):
+    """
+    Built-in response middleware must never buffer a streaming response.
+    """
+    def setUp(self):
+        self.etags = settings.USE_ETAGS
+        self.request = HttpRequest()
+        self.request.META = {
+            'SERVER_NAME': 'testserver',
+            'SERVER_PORT': 80,
+            'HTTP_ACCEPT_ENCODING': 'gzip, deflate',
+        }
+        self.request.path = self.request.path_info = '/middleware/stream/'
+        self.consumed = []
+
+    def tearDown(self):
+        settings.USE_ETAGS = self.etags
+
+    def _stream(self):
+        for i in range(50):
+            self.consumed.append(i)
+            yield 'line %d,some,csv,data\n' % i
+
+    def test_gzip_streaming(self):
+        response = StreamingHttpResponse(self._stream())
+        response = GZipMiddleware().process_response(self.request, response)
+        self.assertEqual(self.consumed, [])
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        body = ''.join(response)
+        self.assertEqual(gzip.GzipFile(fileobj=StringIO(body)).read(),
+                         ''.join(['line %d,some,csv,data\n' % i for i in range(50)]))
+
+    def test_gzip_regular_response(self):
+        response = HttpResponse('a' * 300)
+        response = GZipMiddleware().process_response(self.request, response)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(gzip.GzipFile(fileobj=StringIO(response.content)).read(), 'a' * 300)
+
+    def test_etag_skipped_for_streaming(self):
+        settings.USE_ETAGS = True
+        response = StreamingHttpResponse(self._stream())
+        response = CommonMiddleware().process_response(self.request, response)
+        self.assertEqual(self.consumed, [])
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_explicit_etag_honored_for_streaming(self):
+        settings.USE_ETAGS = True
+        self.request.META['HTTP_IF_NONE_MATCH'] = '"abc"'
+        response = StreamingHttpResponse(self._stream())
+        response['ETag'] = '"abc"'
+        response = CommonMiddleware().process_response(self.request, response)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.consumed, [])
+
+    def test_conditional_get_streaming(self):
+        response = StreamingHttpResponse(self._stream())
+        response = ConditionalGetMiddleware().process_response(self.request, response)
+        self.assertEqual(self.consumed, [])
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertTrue(response.has_header('Date'))
+
+
+class GZipMiddlewareTest(TestCase):
+    def setUp(self):
+        self.request = HttpRequest()
+        self.request.META = {'HTTP_ACCEPT_ENCODING': 'gzip'}
+        self.content = 'Lorem ipsum dolor sit amet. ' * 40
+
+    def test_compression_level(self):
+        fast = GZipMiddleware(compresslevel=1).process_response(
+            self.request, HttpResponse(self.content))
+        best = GZipMiddleware(compresslevel=9).process_response(
+            self.request, HttpResponse(self.content))
+        for response in (fast, best):
+            self.assertEqual(gzip.GzipFile(fileobj=StringIO(response.content)).read(),
+                             self.content)
+        self.assertTrue(len(best.content) <= len(fast.content))
+
+    def test_min_length(self):
+        response = GZipMiddleware(min_length=5000).process_response(
+            self.request, HttpResponse(self.content))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, self.content)
+
+    def test_compressed_content_types_skipped(self):
+        for content_type in ('image/png', 'application/zip', 'video/mp4; codecs="avc1"'):
+            response = GZipMiddleware().process_response(
+                self.request, HttpResponse(self.content, content_type=content_type))
+            self.assertFalse(response.has_header('Content-Encoding'))
+            self.assertFalse(response.has_header('Vary'))
+
+    def test_excluded_content_types_override(self):
+        response = GZipMiddleware(excluded_content_types=('text/',)).process_response(
+            self.request, HttpResponse(self.content, content_type='text/csv'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        response = GZipMiddleware(excluded_content_types=()).process_response(
+            self.request, HttpResponse(self.content, content_type='image/svg+xml'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+
+class ShortCircuitRequestMiddleware(object):
+    def process_request(self, request):
+        if 'request' in request.GET:
+            return HttpResponse('request middleware')
+
+class ShortCircuitViewMiddleware(object):
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if 'view' in request.GET:
+            return HttpResponse('view middleware')
+
+class AppendResponseMiddleware(object):
+    def process_response(self, request, response):
+        response.content += ' + response middleware'
+        return response
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+class MiddlewareHandlerTest(TestCase):
+    def setUp(self):
+        self.old_middleware = settings.MIDDLEWARE_CLASSES
+        self.old_timing = settings.MIDDLEWARE_TIMING
+        self.old_urlconf = settings.ROOT_URLCONF
+        settings.MIDDLEWARE_CLASSES = (
+            'regressiontests.middleware.tests.AppendResponseMiddleware',
+            'regressiontests.middleware.tests.ShortCircuitRequestMiddleware',
+            'regressiontests.middleware.tests.ShortCircuitViewMiddleware',
+        )
+        settings.ROOT_URLCONF = 'regressiontests.middleware.handler_urls'
+
+    def tearDown(self):
+        settings.MIDDLEWARE_CLASSES = self.old_middleware
+        settings.MIDDLEWARE_TIMING = self.old_timing
+        settings.ROOT_URLCONF = self.old_urlconf
+
+    def _get_response(self, handler, query=''):
+        request = HttpRequest()
+        request.path = request.path_info = '/view/'
+        if query:
+            request.GET = {query: ''}
+        response = handler.get_response(request)
+        return handler.apply_response_middleware(request, response)
+
+    def test_short_circuit(self):
+        handler = BaseHandler()
+        handler.load_middleware()
+        self.assertEqual(self._get_response(handler).content,
+                         'view + response middleware')
+        self.assertEqual(self._get_response(handler, 'request').content,
+                         'request middleware + response middleware')
+        self.assertEqual(self._get_response(handler, 'view').content,
+                         'view middleware + response middleware')
+
+    def test_timing(self):
+        settings.MIDDLEWARE_TIMING = True
+        recorder = RecordingHandler()
+        logger = logging.getLogger('django.middleware')
+        old_level = logger.level
+        logger.setLevel(logging.DEBUG)
+        logger.addHandler(recorder)
+        try:
+            handler = BaseHandler()
+            handler.load_middleware()
+            self.assertEqual(self._get_response(handler).content,
+                             'view + response middleware')
+        finally:
+            logger.removeHandler(recorder)
+            logger.setLevel(old_level)
+        self.assertEqual(len(recorder.records), 1)
+        names = [name for name, elapsed in recorder.records[0].timings]
+        self.assertEqual(names, [
+            'regressiontests.middleware.tests.ShortCircuitRequestMiddleware.process_request',
+            'regressiontests.middleware.tests.ShortCircuitViewMiddleware.process_view',
+            'regressiontests.middleware.tests.AppendResponseMiddleware.process_response',
+        ])
+
+
+def profiled_view(request):
+    return HttpResponse(''.join([str(i) for i in range(100)]))
+
+class ProfileMiddlewareTest(TestCase):
+    def setUp(self):
+        self.old_rate = settings.PROFILE_SAMPLE_RATE
+        self.old_dir = settings.PROFILE_STATS_DIR
+        settings.PROFILE_STATS_DIR = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(settings.PROFILE_STATS_DIR)
+        settings.PROFILE_SAMPLE_RATE = self.old_rate
+        settings.PROFILE_STATS_DIR = self.old_dir
+
+    def _request(self, middleware, **meta):
+        request = HttpRequest()
+        request.path = '/profiled/'
+        request.META = meta
+        self.assertEqual(middleware.process_request(request), None)
+        middleware.process_view(request, profiled_view, (), {})
+        response = profiled_view(request)
+        return middleware.process_response(request, response)
+
+    def test_sampling(self):
+        settings.PROFILE_SAMPLE_RATE = 1
+        middleware = ProfileMiddleware()
+        self._request(middleware)
+        self._request(middleware)
+        stats = load_stats()
+        self.assertEqual(stats.keys(), ['regressiontests.middleware.tests.profiled_view'])
+
+    def test_write_interval(self):
+        "Stats are written at most once per write_interval, and on flush()."
+        settings.PROFILE_SAMPLE_RATE = 1
+        middleware = ProfileMiddleware()
+        self._request(middleware)
+        calls = load_stats().values()[0].total_calls
+        self._request(middleware)
+        self.assertEqual(load_stats().values()[0].total_calls, calls)
+        middleware.flush()
+        self.assertTrue(load_stats().values()[0].total_calls > calls)
+
+    def test_sampling_disabled(self):
+        settings.PROFILE_SAMPLE_RATE = 0
+        self._request(ProfileMiddleware())
+        self.assertEqual(load_stats(), {})
+
+    def test_signed_header(self):
+        settings.PROFILE_SAMPLE_RATE = 0
+        middleware = ProfileMiddleware()
+        self._request(middleware, HTTP_X_DJANGO_PROFILE='bogus')
+        self.assertEqual(load_stats(), {})
+        self._request(middleware, HTTP_X_DJANGO_PROFILE=get_profile_token('/other/'))
+        self.assertEqual(load_stats(), {})
+        expired = int(time.time()) - settings.PROFILE_TOKEN_MAX_AGE - 1
+        self._request(middleware, HTTP_X_DJANGO_PROFILE=get_profile_token('/profiled/', expired))
+        self.assertEqual(load_stats(), {})
+        self._request(middleware, HTTP_X_DJANGO_PROFILE=get_profile_token('/profiled/'))
+        self.assertEqual(len(load_stats()), 1)
+
+    def test_profilestats_command(self):
+        settings.PROFILE_SAMPLE_RATE = 1
+        self._request(ProfileMiddleware())
+        out = StringIO()
+        call_command('profilestats', stdout=out)
+        self.assertTrue('regressiontests.middleware.tests.profiled_view' in out.getvalue())
+        self.assertTrue('function calls' in out.getvalue())
+
+        call_command('profilestats', clear=True)
+        self.assertEqual(load_stats(), {})
+
+    def test_clear_resets_running_processes(self):
+        settings.PROFILE_SAMPLE_RATE = 1
+        middleware = ProfileMiddleware()
+        self._request(middleware)
+        calls = load_stats().values()[0].total_calls
+        self._request(middleware)
+        call_command('profilestats', clear=True)
+        # Stats collected before clearing aren't written back...
+        middleware.flush()
+        self.assertEqual(load_stats(), {})
+        # ... nor added to the ones collected afterwards.
+        self._request(middleware)
+        self.assertEqual(load_stats().values()[0].total_calls, calls)
@@ -1,5 +1,6 @@
 from django import forms
-from django.forms.models import modelform_factory, inlineformset_factory, modelformset_factory
+from django.forms.models import (modelform_factory, inlineformset_factory,
+    modelformset_factory, ModelChoiceCache)
 from django.test import TestCase
 
 from models import User, UserSite, Restaurant, Manager
@@ -168,6 +169,90 @@ class InlineFormsetTests(TestCase):
             self.assertEqual(len(form.fields), 1)
 
 
+class ChoiceSharingTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create(username='alice', serial=1)
+        self.bob = User.objects.create(username='bob', serial=2)
+
+    def test_choices_evaluated_once(self):
+        "The forms of a model formset evaluate the choices of a ModelChoiceField once."
+        FormSet = modelformset_factory(UserSite, extra=3)
+        formset = FormSet(queryset=UserSite.objects.none())
+        rendered = []
+        self.assertNumQueries(1, lambda: rendered.append(unicode(formset)))
+        self.assertEqual(rendered[0].count('<option value="alice">'), 3)
+        self.assertEqual(rendered[0].count('<option value="bob">'), 3)
+
+    def test_choices_of_other_querysets(self):
+        "A form that changes the queryset of a field keeps its own choices."
+        class SerialUserSiteForm(forms.ModelForm):
+            class Meta:
+                model = UserSite
+
+            def __init__(self, *args, **kwargs):
+                super(SerialUserSiteForm, self).__init__(*args, **kwargs)
+                if self.prefix.endswith('-1'):
+                    self.fields['user'].queryset = User.objects.filter(serial=2)
+
+        FormSet = modelformset_factory(UserSite, form=SerialUserSiteForm, extra=2)
+        formset = FormSet(queryset=UserSite.objects.none())
+        self.assertTrue('alice' in unicode(formset.forms[0]['user']))
+        self.assertFalse('alice' in unicode(formset.forms[1]['user']))
+        self.assertTrue('bob' in unicode(formset.forms[1]['user']))
+
+    def test_queryset_changed_after_construction(self):
+        "A queryset changed once the formset is built doesn't use the shared choices."
+        FormSet = modelformset_factory(UserSite, extra=3)
+        formset = FormSet(queryset=UserSite.objects.none())
+        field = formset.forms[1].fields['user']
+        field.queryset = User.objects.filter(serial=2)
+        self.assertFalse(field.cache_choices)
+        self.assertTrue('alice' in unicode(formset.forms[0]['user']))
+        self.assertFalse('alice' in unicode(formset.forms[1]['user']))
+        self.assertTrue('bob' in unicode(formset.forms[1]['user']))
+        # The other forms still share their choices.
+        self.assertTrue(formset.forms[0].fields['user'].choice_cache is
+                        formset.forms[2].fields['user'].choice_cache)
+
+    def test_choices_of_equal_querysets(self):
+        "Querysets with the same SQL share their choices, across formsets given the same choice caches."
+        class NewQuerysetForm(forms.ModelForm):
+            class Meta:
+                model = UserSite
+
+            def __init__(self, *args, **kwargs):
+                super(NewQuerysetForm, self).__init__(*args, **kwargs)
+                self.fields['user'].queryset = User.objects.all()
+
+        FormSet = modelformset_factory(UserSite, form=NewQuerysetForm, extra=2)
+        choice_caches = {}
+        formsets = [FormSet(queryset=UserSite.objects.none(), choice_caches=choice_caches),
+                    FormSet(queryset=UserSite.objects.none(), prefix='other',
+                            choice_caches=choice_caches)]
+        rendered = []
+        self.assertNumQueries(1, lambda: rendered.extend([unicode(f) for f in formsets]))
+        self.assertEqual(''.join(rendered).count('<option value="bob">'), 4)
+        # The shared dictionary only holds the choices.
+        self.assertEqual([c.__class__ for c in choice_caches.values()], [ModelChoiceCache])
+
+    def test_shared_options_selection(self):
+        "The options rendered for a formset select the value of each form."
+        UserSite.objects.create(user=self.alice, data=1)
+        UserSite.objects.create(user=self.bob, data=2)
+        FormSet = modelformset_factory(UserSite, extra=1)
+        formset = FormSet(queryset=UserSite.objects.order_by('data'))
+        self.assertTrue('<option value="alice" selected="selected">User object</option>'
+                        in unicode(formset.forms[0]['user']))
+        self.assertTrue('<option value="bob">User object</option>'
+                        in unicode(formset.forms[0]['user']))
+        self.assertTrue('<option value="bob" selected="selected">User object</option>'
+                        in unicode(formset.forms[1]['user']))
+        self.assertTrue('<option value="" selected="selected">---------</option>'
+                        in unicode(formset.forms[2]['user']))
+        self.assertFalse('selected' in unicode(formset.forms[2]['user']).replace(
+            '<option value="" selected="selected">', ''))
+
+
 class CustomWidget(forms.CharField):
     pass
 
@@ -687,6 +687,26 @@ ImproperlyConfigured: 'ValidationTestModelAdmin.list_filter[0]' refers to field
 ...     list_filter = ('is_active',)
 >>> validate(ValidationTestModelAdmin, ValidationTestModel)
 
+# list_select_related_paths
+
+>>> class ValidationTestModelAdmin(ModelAdmin):
+...     list_select_related_paths = 'band'
+>>> validate(ValidationTestModelAdmin, ValidationTestModel)
+Traceback (most recent call last):
+...
+ImproperlyConfigured: 'ValidationTestModelAdmin.list_select_related_paths' must be a list or tuple.
+
+>>> class ValidationTestModelAdmin(ModelAdmin):
+...     list_select_related_paths = ('band.name',)
+>>> validate(ValidationTestModelAdmin, ValidationTestModel)
+Traceback (most recent call last):
+...
+ImproperlyConfigured: 'ValidationTestModelAdmin.list_select_related_paths[0]' refers to 'band.name', which isn't a path of ForeignKeys from model 'ValidationTestModel'.
+
+>>> class ValidationTestModelAdmin(ModelAdmin):
+...     list_select_related_paths = ('band',)
+>>> validate(ValidationTestModelAdmin, ValidationTestModel)
+
 # list_per_page
 
 >>> class ValidationTestModelAdmin(ModelAdmin):
@@ -45,6 +45,58 @@ class RequestsTests(unittest.TestCase):
         self.assertEqual(request.COOKIES.keys(), [])
         self.assertEqual(request.META.keys(), [])
 
+    def test_wsgirequest_headers(self):
+        request = WSGIRequest({
+            'PATH_INFO': '/',
+            'REQUEST_METHOD': 'get',
+            'CONTENT_TYPE': 'text/html; charset=UTF-8',
+            'CONTENT_LENGTH': '100',
+            'HTTP_USER_AGENT': 'python-requests/1.2.0',
+            'HTTP_X_FORWARDED_FOR': '10.0.0.1',
+            'SERVER_NAME': 'testserver',
+        })
+        self.assertEqual(sorted(request.headers.keys()),
+            ['Content-Length', 'Content-Type', 'User-Agent', 'X-Forwarded-For'])
+        self.assertEqual(request.headers['User-Agent'], 'python-requests/1.2.0')
+        self.assertEqual(request.headers['user-agent'], 'python-requests/1.2.0')
+        self.assertEqual(request.headers['X_FORWARDED_FOR'], '10.0.0.1')
+        self.assertTrue('content-type' in request.headers)
+        self.assertFalse('Server-Name' in request.headers)
+        self.assertEqual(request.headers.get('Referer'), None)
+        # The mapping is built once per request.
+        self.assertTrue(request.headers is request.headers)
+
+    def test_content_type_and_params(self):
+        request = HttpRequest()
+        request.META = {'CONTENT_TYPE': 'Text/Plain; charset=latin-1'}
+        self.assertEqual(request.content_type, 'text/plain')
+        self.assertEqual(request.content_params, {'charset': 'latin-1'})
+        self.assertEqual(HttpRequest().content_type, '')
+
+    def test_cached_derived_attributes(self):
+        request = HttpRequest()
+        request.META = {
+            'HTTP_HOST': 'example.com',
+            'HTTP_ACCEPT_LANGUAGE': 'de;q=0.5, fr',
+        }
+        self.assertEqual(request.get_host(), 'example.com')
+        self.assertEqual(request.scheme, 'http')
+        self.assertEqual(request.accepted_languages, [('fr', 1.0), ('de', 0.5)])
+
+        # Derived values follow the headers they're derived from, even when
+        # META is changed in place...
+        request.META['HTTP_HOST'] = 'other.example.com'
+        self.assertEqual(request.get_host(), 'other.example.com')
+        request.META['HTTP_X_FORWARDED_HOST'] = 'proxied.example.com'
+        self.assertEqual(request.get_host(), 'proxied.example.com')
+        request.META['HTTP_ACCEPT_LANGUAGE'] = 'en'
+        self.assertEqual(request.accepted_languages, [('en', 1.0)])
+
+        # ... or replaced.
+        request.META = {'HTTP_HOST': 'other.example.com'}
+        self.assertEqual(request.get_host(), 'other.example.com')
+        self.assertEqual(request.accepted_languages, [])
+
     def test_parse_cookie(self):
         self.assertEqual(parse_cookie('invalid:key=true'), {})
 
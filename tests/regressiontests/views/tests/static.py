@@ -69,3 +69,26 @@ class StaticTests(TestCase):
         self.assertEquals(len(response.content),
                           int(response['Content-Length']))
 
+    def test_precompressed_variant(self):
+        "A precompressed .gz file is served when the browser accepts gzip"
+        response = self.client.get('/views/site_media_gz/file.txt',
+                                   HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEquals(open(path.join(media_dir, 'file.txt.gz'), 'rb').read(),
+                          response.content)
+        self.assertEquals('gzip', response['Content-Encoding'])
+        self.assertEquals('text/plain', response['Content-Type'])
+        self.assertEquals('Accept-Encoding', response['Vary'])
+
+    def test_precompressed_variant_not_accepted(self):
+        "The original file is served when the browser doesn't accept gzip"
+        response = self.client.get('/views/site_media_gz/file.txt')
+        self.assertEquals(open(path.join(media_dir, 'file.txt')).read(),
+                          response.content)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEquals('Accept-Encoding', response['Vary'])
+
+    def test_precompressed_variant_missing(self):
+        "Files without a .gz variant are served as usual"
+        response = self.client.get('/views/site_media_gz/file.unknown',
+                                   HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
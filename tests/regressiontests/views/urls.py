@@ -61,6 +61,7 @@ urlpatterns = patterns('',
 
     # Static views
     (r'^site_media/(?P<path>.*)$', 'django.views.static.serve', {'document_root': media_dir}),
+    (r'^site_media_gz/(?P<path>.*)$', 'django.views.static.serve', {'document_root': media_dir, 'precompressed': True}),
 
     # Special URLs for particular regression cases.
     url(u'^中文/$', 'regressiontests.views.views.redirect'),